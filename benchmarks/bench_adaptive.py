@@ -0,0 +1,70 @@
+"""Сколько запросов экономит адаптивный интервал за неделю.
+
+Модель: студент сдаёт работу раз в два дня, ревьюер берёт её через
+6 часов 7 минут и проверяет за 41 минуту. Сравнение с опросом раз в RETRY_PERIOD.
+Запуск: python benchmarks/bench_adaptive.py
+"""
+import bisect
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.adaptive import AdaptiveInterval  # noqa: E402
+
+RETRY_PERIOD = 600
+WEEK = 7 * 24 * 3600
+SUBMIT_EVERY = 2 * 24 * 3600
+REVIEW_STARTS = 6 * 3600 + 7 * 60
+REVIEW_TAKES = 41 * 60
+
+
+def status_at(moment: float) -> str:
+    offset = moment % SUBMIT_EVERY
+    if offset < REVIEW_STARTS:
+        return 'submitted'
+    if offset < REVIEW_STARTS + REVIEW_TAKES:
+        return 'reviewing'
+    return 'approved'
+
+
+def transitions():
+    moments = []
+    for cycle_start in range(0, WEEK, SUBMIT_EVERY):
+        moments.append(cycle_start + REVIEW_STARTS)
+        moments.append(cycle_start + REVIEW_STARTS + REVIEW_TAKES)
+    return [moment for moment in moments if moment < WEEK]
+
+
+def simulate(policy=None):
+    moment = 0.0
+    polls = []
+    last_status = None
+    while moment < WEEK:
+        polls.append(moment)
+        status = status_at(moment)
+        changed = status != last_status
+        last_status = status
+        if policy is None:
+            interval = RETRY_PERIOD
+        else:
+            interval = policy.next_interval(status == 'reviewing', changed)
+        moment += interval
+    delays = [
+        polls[bisect.bisect_left(polls, moment)] - moment
+        for moment in transitions()
+        if bisect.bisect_left(polls, moment) < len(polls)
+    ]
+    return len(polls), sum(delays) / len(delays)
+
+
+if __name__ == '__main__':
+    fixed_calls, fixed_delay = simulate()
+    policy = AdaptiveInterval(base=RETRY_PERIOD, fast=60, max_interval=3600)
+    adaptive_calls, adaptive_delay = simulate(policy)
+    print(f'fixed:    calls={fixed_calls:5d} '
+          f'mean notice delay={fixed_delay:6.0f} s')
+    print(f'adaptive: calls={adaptive_calls:5d} '
+          f'mean notice delay={adaptive_delay:6.0f} s')
+    print(f'saved calls: {fixed_calls - adaptive_calls} '
+          f'({1 - adaptive_calls / fixed_calls:.0%})')
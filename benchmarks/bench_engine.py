@@ -0,0 +1,46 @@
+"""Сколько пользователей в секунду опрашивает PollingEngine.
+
+Запуск: python benchmarks/bench_engine.py [число_пользователей]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+from homework_bot.engine import PollingEngine, Tenant  # noqa: E402
+from stub_api import start_stub  # noqa: E402
+
+
+def main():
+    tenants_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    server, url = start_stub(latency=0.005)
+    homework.ENDPOINT = url
+    tenants = [
+        Tenant(token=f'token{index}', chat_ids=[str(index)])
+        for index in range(tenants_count)
+    ]
+    for concurrency in (1, 10, 50, 100, 200):
+        homework.TRANSPORT.open_pool(concurrency)
+        engine = PollingEngine(
+            fetch=homework.request_statuses,
+            check=homework.check_response,
+            render=homework.parse_status,
+            concurrency=concurrency,
+        )
+        started = time.perf_counter()
+        asyncio.run(engine.poll_all(tenants))
+        elapsed = time.perf_counter() - started
+        engine.close()
+        homework.TRANSPORT.close()
+        print(
+            f'concurrency={concurrency:<4} tenants={tenants_count} '
+            f'failed={engine.failed} {tenants_count / elapsed:9.1f} tenants/s'
+        )
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Хвостовые задержки запросов с хеджированием и без.
+
+Заглушка отвечает за 5 мс, но каждый двадцатый ответ задерживается
+на 300 мс. Сравниваются обычный запрос, второй запрос после p95 и
+второй запрос через фиксированные 20 мс.
+Запуск: python benchmarks/bench_hedging.py
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.transport import Transport  # noqa: E402
+from stub_api import start_stub  # noqa: E402
+
+REQUESTS = 400
+
+
+def latency():
+    return 0.3 if random.random() < 0.05 else 0.005
+
+
+def run(url, **kwargs):
+    transport = Transport(pool_size=8, deadline=5, **kwargs)
+    timings = []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        transport.get(url, {}, {'from_date': 0}).close()
+        timings.append(time.perf_counter() - started)
+    transport.close()
+    timings.sort()
+    return timings, transport.stats
+
+
+def main():
+    random.seed(1)
+    server, url = start_stub(latency=latency)
+    variants = [
+        ('no hedge', {}),
+        ('hedge at p95', {'hedge': True}),
+        ('hedge at 20ms', {'hedge': True, 'hedge_after': 0.02}),
+    ]
+    for name, kwargs in variants:
+        timings, stats = run(url, **kwargs)
+        p50 = statistics.median(timings)
+        p95 = timings[int(0.95 * len(timings))]
+        p99 = timings[int(0.99 * len(timings))]
+        print(f'{name:<14} p50={p50 * 1000:6.1f} ms p95={p95 * 1000:6.1f} ms '
+              f'p99={p99 * 1000:6.1f} ms hedged={stats.hedged:<3} '
+              f'wins={stats.hedge_wins}')
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Стоимость разбора ответа API на длинной истории домашек.
+
+Сравнивает прежний двойной вызов response.json(), однократный разбор
+стандартным json и однократный разбор orjson, если он установлен.
+Запуск: python benchmarks/bench_json.py
+"""
+import json
+import os
+import sys
+import timeit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot import jsoncodec  # noqa: E402
+from stub_api import make_payload  # noqa: E402
+
+
+def make_response(payload: bytes) -> requests.Response:
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = payload
+    return response
+
+
+def double_json(response):
+    response.json()
+    return response.json()
+
+
+def stdlib_once(response):
+    return json.loads(response.content)
+
+
+def main():
+    for count in (10, 1000, 10000):
+        payload = make_payload(count)
+        response = make_response(payload)
+        variants = [('json() x2', double_json), ('json once', stdlib_once)]
+        if jsoncodec.orjson is not None:
+            variants.append(('orjson once', jsoncodec.decode_response))
+        for name, decode in variants:
+            number = max(1, 2000 // count)
+            seconds = timeit.timeit(lambda: decode(response), number=number)
+            print(f'homeworks={count:<6} size={len(payload) / 1024:8.1f} KiB '
+                  f'{name:<12} {seconds / number * 1000:8.3f} ms/poll')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Цена логирования одного цикла опроса для вызывающего потока.
+
+Цикл пишет те же записи, что main(): запрос, проверку ответа, смену
+статуса и отправку. Сравниваются прежняя схема (f-строки с заголовками
+и синхронный FileHandler) и очередь с ротацией на уровнях DEBUG и INFO,
+в том числе когда каждая запись на диск занимает 1 мс.
+Запуск: python benchmarks/bench_logging.py
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+import timeit
+from logging.handlers import RotatingFileHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.logsetup import make_log_queue  # noqa: E402
+
+FORMAT = '%(asctime)s, %(levelname)s, %(funcName)s, %(message)s'
+URL = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+HEADERS = {'Authorization': 'OAuth ' + 'x' * 40}
+PAYLOAD = {'from_date': 1700000000}
+CYCLES = 5000
+
+
+class SlowFileHandler(RotatingFileHandler):
+    """Файл на медленном диске: каждая запись стоит 1 мс."""
+
+    def emit(self, record):
+        time.sleep(0.001)
+        super().emit(record)
+
+
+def old_cycle(logger):
+    request_message = (
+        f'Запрос по ссылке {URL}, с headers {HEADERS}, cо значениями {PAYLOAD}'
+    )
+    status_message = (
+        f'Ошибка статуса по ссылке {URL}, с headers {HEADERS},'
+        f'c значениями {PAYLOAD}.'
+    )
+    logger.debug(request_message)
+    del status_message
+    logger.debug('Проверка ответа API')
+    logger.debug('Проверка существования новой домашки')
+    logger.info('Изменился статус домашки')
+    logger.info('Отправка сообщения')
+    logger.debug('Сообщение отправлено успешно')
+
+
+def new_cycle(logger):
+    logger.debug('Запрос по ссылке %s cо значениями %s', URL, PAYLOAD)
+    logger.debug('Проверка ответа API')
+    logger.debug('Проверка существования новой домашки')
+    logger.info('Изменился статус домашки')
+    logger.info('Отправка сообщения')
+    logger.debug('Сообщение отправлено успешно')
+
+
+def measure(name, cycle, handler, level, listener=None, cycles=CYCLES):
+    logger = logging.getLogger(f'bench.{name}')
+    logger.propagate = False
+    logger.setLevel(level)
+    logger.addHandler(handler)
+    if listener is not None:
+        listener.start()
+    seconds = timeit.timeit(lambda: cycle(logger), number=cycles)
+    if listener is not None:
+        listener.stop()
+    handler.close()
+    print(f'{name:<28} {seconds / cycles * 1e6:8.1f} us/cycle')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bot.log')
+        for handler_class, cycles in ((RotatingFileHandler, CYCLES),
+                                      (SlowFileHandler, 100)):
+            disk = 'slow disk' if handler_class is SlowFileHandler else ''
+            handler = handler_class(path, encoding='UTF-8')
+            handler.setFormatter(logging.Formatter(FORMAT))
+            measure(f'sync DEBUG {disk}', old_cycle, handler,
+                    logging.DEBUG, cycles=cycles)
+            for level in (logging.DEBUG, logging.INFO):
+                handler, listener = make_log_queue(
+                    [handler_class(path, encoding='UTF-8',
+                                   maxBytes=5 * 1024 * 1024,
+                                   backupCount=3)],
+                    secrets=[HEADERS['Authorization']], fmt=FORMAT)
+                measure(f'queue {logging.getLevelName(level)} {disk}',
+                        new_cycle, handler, level, listener, cycles=cycles)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Цена записи метрик на горячем пути.
+
+Сравнивает голый вызов функции, отдельные observe/inc и вызов через
+декораторы timed, in_flight и выключенный traced.
+Запуск: python benchmarks/bench_metrics.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.metrics import Registry, in_flight, timed  # noqa: E402
+from homework_bot.tracing import Tracer  # noqa: E402
+
+NUMBER = 200000
+
+
+def work():
+    return None
+
+
+def main():
+    registry = Registry()
+    histogram = registry.histogram('seconds', 'Время.', label='function')
+    errors = registry.counter('errors_total', 'Ошибки.', label='type')
+    gauge = registry.gauge('in_flight', 'Сейчас.')
+    timed_work = timed(histogram, 'work', errors)(work)
+    tracked_work = in_flight(gauge)(timed_work)
+    traced_work = Tracer().traced('work')(timed_work)
+    variants = [
+        ('bare call', work),
+        ('observe', lambda: histogram.observe(0.02, 'work')),
+        ('counter inc', lambda: errors.inc(label='ValueError')),
+        ('timed call', timed_work),
+        ('timed+in_flight', tracked_work),
+        ('timed+traced', traced_work),
+    ]
+    baseline = None
+    for name, run in variants:
+        seconds = min(timeit.repeat(run, number=NUMBER, repeat=5)) / NUMBER
+        baseline = seconds if baseline is None else baseline
+        print(f'{name:<16} {seconds * 1e9:7.0f} ns/op '
+              f'(+{(seconds - baseline) * 1e9:5.0f} ns)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Устойчивая скорость отправки и число ответов 429 при разных лимитах.
+
+Модель телеграма: не больше 30 сообщений за любую секунду на бота и
+не больше 1 сообщения в секунду в чат в среднем с всплеском до 3.
+Время моделируется, поэтому замер идёт мгновенно.
+Запуск: python benchmarks/bench_ratelimit.py
+"""
+import collections
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.ratelimit import SendRateLimiter  # noqa: E402
+
+MESSAGES = 6000
+CHATS = 500
+
+
+class FakeTelegram:
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = collections.deque()
+        self.per_chat = collections.defaultdict(collections.deque)
+        self.rejected = 0
+
+    def send(self, chat_id):
+        now = self.clock.now
+        for window in (self.sent, self.per_chat[chat_id]):
+            while window and window[0] <= now - 1:
+                window.popleft()
+        chat_window = self.per_chat[chat_id]
+        if len(self.sent) >= 30 or len(chat_window) >= 3:
+            self.rejected += 1
+            return False
+        self.sent.append(now)
+        chat_window.append(now)
+        return True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def run(global_rate, global_burst=1):
+    clock = FakeClock()
+    telegram = FakeTelegram(clock)
+    limiter = None
+    if global_rate:
+        limiter = SendRateLimiter(global_rate=global_rate,
+                                  global_burst=global_burst, clock=clock,
+                                  sleep=clock.sleep)
+    for number in range(MESSAGES):
+        chat_id = number % CHATS
+        while True:
+            if limiter is not None:
+                limiter.acquire(chat_id)
+            else:
+                clock.sleep(0.001)
+            if telegram.send(chat_id):
+                break
+            if limiter is not None:
+                limiter.pause(1)
+            else:
+                clock.sleep(1)
+    label = (f'{global_rate:>4}/s burst={global_burst:<3}' if global_rate
+             else 'none            ')
+    print(f'limit={label} sustained={MESSAGES / clock.now:6.1f} msg/s '
+          f'429s={telegram.rejected}')
+
+
+if __name__ == '__main__':
+    run(0)
+    for rate, burst in ((20, 1), (25, 5), (29, 1), (30, 1), (30, 30),
+                        (35, 1), (40, 1)):
+        run(rate, burst)
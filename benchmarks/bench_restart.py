@@ -0,0 +1,90 @@
+"""Остановка и тёплый запуск с состоянием 100k пользователей.
+
+Остановка: запись курсоров, 1% изменившихся статусов и очереди
+сообщений поверх уже сохранённого состояния. Запуск:
+открытие состояния, курсоры и индексы всех пользователей и возврат
+сохранённых сообщений в очередь.
+
+Запуск: python benchmarks/bench_restart.py [число_пользователей]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.checkpoint import Checkpoint  # noqa: E402
+from homework_bot.engine import PollingEngine, Tenant  # noqa: E402
+from homework_bot.outbox import Delivery, Outbox  # noqa: E402
+from homework_bot.store import SqliteStore  # noqa: E402
+
+UNSENT = 1000
+CHANGED = 0.01
+
+
+def make_tenants(tenants_count: int) -> list:
+    tenants = []
+    for number in range(tenants_count):
+        tenant = Tenant(f'token{number}', [str(number)], timestamp=1000)
+        tenant.index.seed(
+            {'id': number * 3 + homework, 'homework_name': 'hw',
+             'status': 'reviewing', 'date_updated': '2022-01-01'}
+            for homework in range(3)
+        )
+        tenant.next_due = time.time() + random.uniform(0, 600)
+        tenants.append(tenant)
+    return tenants
+
+
+def bench(name: str, state_factory, tenants: list) -> None:
+    engine = PollingEngine(fetch=None, check=None, render=None,
+                           checkpoint=state_factory())
+    engine.save_cursors(tenants)
+    for tenant in tenants:
+        tenant.timestamp = 2000
+        if random.random() < CHANGED:
+            tenant.index.seed([{'id': int(tenant.token[5:]) * 3,
+                                'homework_name': 'hw', 'status': 'approved',
+                                'date_updated': '2022-01-02'}])
+            tenant.next_due = time.time() + 600
+    outbox = Outbox(lambda chat_id, text: None, workers=0)
+    unsent = [Delivery(str(number), 'text', f'event{number}')
+              for number in range(UNSENT)]
+
+    started = time.perf_counter()
+    engine.save_cursors(tenants)
+    engine.checkpoint.set_outbox(outbox.snapshot(unsent))
+    engine.checkpoint.save()
+    engine.checkpoint.close()
+    stopped = time.perf_counter() - started
+    engine.close()
+
+    started = time.perf_counter()
+    state = state_factory()
+    for tenant in tenants:
+        tenant.timestamp = state.cursor(tenant.key, 0)
+        tenant.index = state.index(tenant.key)
+    restored = Outbox(lambda chat_id, text: None, workers=0).restore(
+        state.outbox())
+    booted = time.perf_counter() - started
+    state.close()
+    print(f'{name:<18} остановка {stopped:6.2f} s   '
+          f'запуск {booted:6.2f} s   сообщений восстановлено {restored}')
+
+
+def main():
+    tenants_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f'пользователей: {tenants_count}, сообщений в очереди: {UNSENT}')
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'state.db')
+        bench('SqliteStore', lambda: SqliteStore(database),
+              make_tenants(tenants_count))
+        path = os.path.join(directory, 'state.json')
+        bench('Checkpoint (json)', lambda: Checkpoint(path),
+              make_tenants(tenants_count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Стоимость операций планировщика на 10k и 100k пользователей.
+
+Запуск: python benchmarks/bench_scheduler.py
+"""
+import collections
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.scheduler import Scheduler  # noqa: E402
+
+PERIOD = 600
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def bench(tenants_count: int) -> None:
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    started = time.perf_counter()
+    scheduler.spread(range(tenants_count), PERIOD)
+    spread_time = time.perf_counter() - started
+
+    per_second = collections.Counter()
+    dispatched = 0
+    started = time.perf_counter()
+    for second in range(1, 2 * PERIOD + 1):
+        clock.now = second
+        due = scheduler.pop_due()
+        per_second[second] += len(due)
+        dispatched += len(due)
+        for key in due:
+            scheduler.schedule_in(key, PERIOD)
+    loop_time = time.perf_counter() - started
+
+    load = [per_second[second] for second in range(PERIOD + 1, 2 * PERIOD)]
+    print(
+        f'tenants={tenants_count:<7} '
+        f'spread={spread_time * 1000:8.1f} ms '
+        f'dispatch+reschedule={loop_time / dispatched * 1e6:6.2f} us/op '
+        f'polls/s mean={sum(load) / len(load):7.1f} '
+        f'max={max(load):5d} min={min(load):5d}'
+    )
+
+
+if __name__ == '__main__':
+    for count in (10_000, 100_000):
+        bench(count)
@@ -0,0 +1,108 @@
+"""Запись и чтение состояния 100k пользователей: SQLite против json.
+
+Запуск: python benchmarks/bench_store.py [число_пользователей]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.checkpoint import Checkpoint  # noqa: E402
+from homework_bot.status_index import StatusIndex  # noqa: E402
+from homework_bot.store import SqliteStore  # noqa: E402
+
+HOMEWORKS = 3
+CHANGED = 0.01
+STATUSES = ('reviewing', 'approved', 'rejected')
+
+
+def make_indexes(tenants_count: int) -> dict:
+    indexes = {}
+    for tenant in range(tenants_count):
+        index = StatusIndex()
+        index.seed(
+            {'id': tenant * HOMEWORKS + number, 'homework_name': 'hw',
+             'status': 'reviewing', 'date_updated': '2022-01-01'}
+            for number in range(HOMEWORKS)
+        )
+        indexes[f'tenant{tenant}'] = index
+    return indexes
+
+
+def timed(label: str, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    print(f'  {label:<34} {time.perf_counter() - started:8.3f} s')
+    return result
+
+
+def fill(state, indexes: dict) -> None:
+    now = time.time()
+    for key, index in indexes.items():
+        state.set_cursor(key, 1000)
+        state.set_index(key, index)
+        state.set_next_due(key, now + random.uniform(0, 600))
+    state.save()
+
+
+def cycle(state, indexes: dict, cursor: int) -> None:
+    """Один цикл: все курсоры сдвинулись, у 1% домашек новый статус."""
+    now = time.time()
+    for key, index in indexes.items():
+        if random.random() < CHANGED:
+            number = int(key[6:]) * HOMEWORKS
+            index.seed([{'id': number, 'homework_name': 'hw',
+                         'status': random.choice(STATUSES),
+                         'date_updated': str(cursor)}])
+            state.set_next_due(key, now + 600)
+        state.set_cursor(key, cursor)
+        state.set_index(key, index)
+    state.save()
+
+
+def load(state, indexes: dict) -> None:
+    for key in indexes:
+        state.cursor(key, 0)
+        state.index(key)
+
+
+def bench(name: str, state_factory, indexes: dict) -> None:
+    print(f'{name}:')
+    state = timed('первая запись', lambda: fill(state_factory(), indexes))
+    state = timed('открытие', state_factory)
+    timed('загрузка курсоров и индексов', load, state, indexes)
+    for number in range(3):
+        timed(f'цикл {number + 1}: запись изменений', cycle, state,
+              indexes, 2000 + number)
+    if isinstance(state, SqliteStore):
+        now = time.time()
+        started = time.perf_counter()
+        for _ in range(1000):
+            state.due(now + 1, limit=100)
+        elapsed = (time.perf_counter() - started) / 1000
+        print(f'  {"due(now, limit=100)":<34} {elapsed * 1e6:8.1f} us')
+    state.close()
+
+
+def main():
+    tenants_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f'пользователей: {tenants_count}, домашек у каждого: {HOMEWORKS}')
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'state.db')
+        bench('SqliteStore', lambda: SqliteStore(database),
+              make_indexes(tenants_count))
+        size = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory))
+        print(f'  размер базы {size / 2 ** 20:.1f} MiB')
+        path = os.path.join(directory, 'state.json')
+        bench('Checkpoint (json)', lambda: Checkpoint(path),
+              make_indexes(tenants_count))
+        print(f'  размер файла {os.path.getsize(path) / 2 ** 20:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
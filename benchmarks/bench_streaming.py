@@ -0,0 +1,71 @@
+"""Пик памяти при разборе истории целиком и потоком.
+
+whole и streamed прогоняют домашки через StatusIndex, который сам растёт
+с числом домашек; parse_only показывает память одного разбора.
+
+Запуск: python benchmarks/bench_streaming.py
+"""
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.status_index import StatusIndex  # noqa: E402
+from homework_bot.streaming import HomeworkStream  # noqa: E402
+from homework_bot.validator import validate_response  # noqa: E402
+
+CHUNK_SIZE = 64 * 1024
+
+
+def homework(index):
+    return {
+        'id': index,
+        'status': ('approved', 'reviewing', 'rejected')[index % 3],
+        'homework_name': f'user__hw{index}.zip',
+        'reviewer_comment': 'Всё нравится',
+        'date_updated': '2020-02-13T14:40:57Z',
+        'lesson_name': 'Итоговый проект',
+    }
+
+
+def body(count):
+    """Тело ответа по кускам, не собирая его целиком."""
+    buffer = '{"homeworks": ['
+    for index in range(count):
+        buffer += ('' if index == 0 else ', ') + json.dumps(homework(index))
+        if len(buffer) >= CHUNK_SIZE:
+            yield buffer.encode()
+            buffer = ''
+    yield (buffer + '], "current_date": 1}').encode()
+
+
+def whole(count):
+    raw = b''.join(body(count))
+    homeworks = validate_response(json.loads(raw))
+    return sum(1 for _ in StatusIndex().diff(homeworks))
+
+
+def streamed(count):
+    return sum(1 for _ in StatusIndex().diff(HomeworkStream(body(count))))
+
+
+def parse_only(count):
+    return sum(1 for _ in HomeworkStream(body(count)))
+
+
+def measure(func, count):
+    tracemalloc.start()
+    events = func(count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return events, peak / 1024 / 1024
+
+
+if __name__ == '__main__':
+    for count in (1000, 10000, 100000):
+        for func in (whole, streamed, parse_only):
+            events, peak = measure(func, count)
+            print(f'homeworks={count:<7} {func.__name__:<10} '
+                  f'events={events:<7} peak={peak:8.1f} MiB')
@@ -0,0 +1,45 @@
+"""Сравнение времени запроса с пулом соединений и без него.
+
+Запуск: python benchmarks/bench_transport.py [число_запросов] [url]
+Без url запросы идут в локальную заглушку, где нет TLS, поэтому
+экономия на реальном https-эндпоинте будет заметно больше.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework_bot.transport import Transport  # noqa: E402
+from stub_api import start_stub  # noqa: E402
+
+
+def measure(transport: Transport, url: str, requests_count: int) -> None:
+    for index in range(requests_count):
+        transport.get(url, headers={'Authorization': 'OAuth bench'},
+                      params={'from_date': index})
+    stats = transport.stats
+    print(
+        f'pooled={transport.session is not None!s:<5} '
+        f'first={stats.first * 1000:7.2f} ms '
+        f'last={stats.last * 1000:7.2f} ms '
+        f'mean={stats.mean * 1000:7.2f} ms'
+    )
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    server = None
+    if len(sys.argv) > 2:
+        url = sys.argv[2]
+    else:
+        server, url = start_stub()
+    measure(Transport(pool_size=0), url, requests_count)
+    pooled = Transport(pool_size=4)
+    measure(pooled, url, requests_count)
+    pooled.close()
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Стоимость отрисовки сообщений о смене статуса при рассылке.
+
+Сравнивает прежнюю сборку f-строки на каждый вызов с рендером из
+реестра шаблонов (с кэшем и без) и пакетным render_many.
+Запуск: python benchmarks/bench_verdicts.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homework import HOMEWORK_VERDICTS, VERDICTS  # noqa: E402
+
+
+def fstring(homework):
+    verdict = HOMEWORK_VERDICTS[homework['status']]
+    name = homework['homework_name']
+    return f'Изменился статус проверки работы "{name}". {verdict}'
+
+
+def registry(homework):
+    return VERDICTS.render(homework['homework_name'], homework['status'])
+
+
+def registry_uncached(homework):
+    return VERDICTS._render(homework['homework_name'], homework['status'])
+
+
+def main():
+    statuses = list(HOMEWORK_VERDICTS)
+    for names in (10, 10000):
+        homeworks = [
+            {'homework_name': f'homework {index % names}',
+             'status': statuses[index % len(statuses)]}
+            for index in range(10000)
+        ]
+        variants = [
+            ('f-string', lambda: [fstring(hw) for hw in homeworks]),
+            ('registry', lambda: [registry(hw) for hw in homeworks]),
+            ('no cache', lambda: [registry_uncached(hw) for hw in homeworks]),
+            ('render_many', lambda: VERDICTS.render_many(homeworks)),
+        ]
+        for name, run in variants:
+            seconds = min(timeit.repeat(run, number=5, repeat=3)) / 5
+            print(f'names={names:<6} {name:<12} '
+                  f'{seconds / len(homeworks) * 1e9:7.0f} ns/message')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Локальная заглушка API Практикума для бенчмарков."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_payload(homeworks_count: int = 1) -> bytes:
+    """Собрать тело ответа с заданным числом домашек."""
+    homeworks = [
+        {
+            'id': index,
+            'status': ('approved', 'reviewing', 'rejected')[index % 3],
+            'homework_name': f'user__hw{index}.zip',
+            'reviewer_comment': 'Всё нравится',
+            'date_updated': '2020-02-13T14:40:57Z',
+            'lesson_name': 'Итоговый проект',
+        }
+        for index in range(homeworks_count)
+    ]
+    return json.dumps(
+        {'homeworks': homeworks, 'current_date': int(time.time())}
+    ).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Отвечает одинаковым json на любой GET-запрос."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    payload = make_payload()
+    latency = 0.0
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        if 'from_date' not in query:
+            self.send_error(400)
+            return
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(payload: bytes = None, latency=0.0):
+    """Запустить заглушку в фоновом потоке. Вернуть сервер и адрес.
+
+    latency — задержка ответа в секундах или функция, которая
+    возвращает задержку для каждого запроса.
+    """
+    handler = type('Handler', (StubHandler,), {
+        'payload': payload or StubHandler.payload,
+        'latency': staticmethod(latency) if callable(latency) else latency,
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}/api/user_api/homework_statuses/'
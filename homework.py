@@ -1,7 +1,12 @@
 from telegram import TelegramError
 import telegram
 
+import asyncio
+import atexit
+import json
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from logging.handlers import RotatingFileHandler
 import sys
 import time
 import os
@@ -10,22 +15,186 @@ import requests
 
 from dotenv import load_dotenv
 
+from homework_bot.adaptive import AdaptiveInterval
+from homework_bot.breaker import (CircuitBreaker, CircuitOpenError,
+                                  UpstreamThrottled, UpstreamUnavailable)
+from homework_bot.checkpoint import Checkpoint, tenant_key
+from homework_bot.coalesce import Coalescer
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.errorstorm import ErrorStorm
+from homework_bot.jsoncodec import decode_response
+from homework_bot.logsetup import make_log_queue
+from homework_bot.metrics import (LagMeter, Registry, in_flight,
+                                  start_metrics_server, timed)
+from homework_bot.outbox import Outbox
+from homework_bot.ratelimit import (RequestBudget, RequestDeferred,
+                                    SendRateLimiter, parse_retry_after,
+                                    retry_after)
+from homework_bot.shutdown import GracefulExit, Shutdown
+from homework_bot.singleflight import SingleFlight
+from homework_bot.status_index import StatusIndex, event_key
+from homework_bot.store import SqliteStore
+from homework_bot.streaming import HomeworkStream
+from homework_bot.tracing import Tracer
+from homework_bot.transport import Transport
+from homework_bot.validator import ValidationError, validate_response
+from homework_bot.verdicts import VerdictRegistry
+
 
 load_dotenv()
 
 PRACTICUM_TOKEN = os.getenv('PR_TOKEN')
 TELEGRAM_TOKEN = os.getenv('T_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('CHAT_ID')
+EXTRA_CHAT_IDS = os.getenv('EXTRA_CHAT_IDS', '')
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+POLL_CONCURRENCY = int(os.getenv('POLL_CONCURRENCY', 100))
+POOL_SIZE = int(os.getenv('PRACTICUM_POOL_SIZE', 0))
+CONNECT_TIMEOUT = float(os.getenv('PRACTICUM_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.getenv('PRACTICUM_READ_TIMEOUT', 30))
+REQUEST_DEADLINE = float(os.getenv('PRACTICUM_DEADLINE', 45)) or None
+HEDGE_REQUESTS = os.getenv('PRACTICUM_HEDGE', '') == '1'
+HEDGE_AFTER = float(os.getenv('PRACTICUM_HEDGE_AFTER', 0)) or None
+FAST_PERIOD = float(os.getenv('POLL_FAST_PERIOD', 60))
+MAX_PERIOD = float(os.getenv('POLL_MAX_PERIOD', 3600))
+DAILY_BUDGET = int(os.getenv('POLL_DAILY_BUDGET', 0))
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', 0))
+OUTBOX_SIZE = int(os.getenv('OUTBOX_SIZE', 1000))
+COALESCE_WINDOW = float(os.getenv('COALESCE_WINDOW', 2))
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 29))
+TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+STREAM_CHUNK_SIZE = 64 * 1024
+BACKFILL_CHUNK = int(os.getenv('BACKFILL_CHUNK', 500))
+VERDICT_LOCALE = os.getenv('VERDICT_LOCALE', 'ru')
+VERDICT_FALLBACK = os.getenv('VERDICT_FALLBACK')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+TRACE_FILE = os.getenv('TRACE_FILE')
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+SLOW_CYCLE = float(os.getenv('SLOW_CYCLE_SECONDS', 0)) or None
+PROFILE_SAMPLE = float(os.getenv('PROFILE_SAMPLE', 0))
+ERROR_WINDOW = float(os.getenv('ERROR_WINDOW', 3600))
+BREAKER_THRESHOLD = int(os.getenv('BREAKER_THRESHOLD', 5))
+BREAKER_RESET = float(os.getenv('BREAKER_RESET', 30))
+BREAKER_MAX_RESET = float(os.getenv('BREAKER_MAX_RESET', 600))
+PRACTICUM_RATE = float(os.getenv('PRACTICUM_RATE', 10))
+PRACTICUM_BURST = float(os.getenv('PRACTICUM_BURST', 10))
+PRACTICUM_TOKEN_PERIOD = float(os.getenv('PRACTICUM_TOKEN_PERIOD', 30))
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG').upper()
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 5 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 3))
+STATE_FILE = os.getenv(
+    'STATE_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 'homework_state.json'),
+)
+STATE_DB = os.getenv('STATE_DB')
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 20))
 
 RETRY_PERIOD = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
+TRANSPORT = Transport(
+    pool_size=POOL_SIZE,
+    connect_timeout=CONNECT_TIMEOUT,
+    read_timeout=READ_TIMEOUT,
+    deadline=REQUEST_DEADLINE,
+    hedge=HEDGE_REQUESTS,
+    hedge_after=HEDGE_AFTER,
+    workers=2 * POLL_CONCURRENCY,
+    allow_hedge=lambda headers: BUDGET.reserve(headers['Authorization']) == 0,
+    inline=lambda: TRACER.profiling,
+)
+
+FLIGHTS = SingleFlight()
+BREAKER = CircuitBreaker(
+    failure_threshold=BREAKER_THRESHOLD,
+    reset_timeout=BREAKER_RESET,
+    max_reset_timeout=BREAKER_MAX_RESET,
+)
+BUDGET = RequestBudget(
+    global_rate=PRACTICUM_RATE,
+    global_burst=PRACTICUM_BURST,
+    token_rate=1 / PRACTICUM_TOKEN_PERIOD,
+)
+
+METRICS = Registry()
+CALL_SECONDS = METRICS.histogram(
+    'homework_bot_call_seconds', 'Время вызовов бота по функциям.',
+    label='function')
+ERRORS = METRICS.counter(
+    'homework_bot_errors_total', 'Исключения по типу.', label='type')
+LOOP_LAG = METRICS.gauge(
+    'homework_bot_loop_lag_seconds', 'Опоздание цикла опроса.')
+TENANTS_IN_FLIGHT = METRICS.gauge(
+    'homework_bot_tenants_in_flight', 'Пользователи, опрашиваемые сейчас.')
+METRICS.collect(
+    'homework_bot_hedged_requests_total', 'Отправленные вторые запросы.',
+    lambda: TRANSPORT.stats.hedged, kind='counter')
+METRICS.collect(
+    'homework_bot_hedge_wins_total', 'Вторые запросы, ответившие первыми.',
+    lambda: TRANSPORT.stats.hedge_wins, kind='counter')
+METRICS.collect(
+    'homework_bot_deadline_exceeded_total',
+    'Запросы, не уложившиеся в общий дедлайн.',
+    lambda: TRANSPORT.stats.deadline_exceeded, kind='counter')
+
+OUTBOX = None
+
+
+def outbox_metric(read):
+    """Значение из текущей очереди сообщений или 0, пока её нет."""
+    return lambda: 0 if OUTBOX is None else read(OUTBOX)
+
+
+METRICS.collect(
+    'homework_bot_outbox_depth', 'Сообщения, ждущие отправки.',
+    outbox_metric(lambda outbox: outbox.depth))
+METRICS.collect(
+    'homework_bot_outbox_delivered_total', 'Доставленные сообщения.',
+    outbox_metric(lambda outbox: outbox.stats.delivered), kind='counter')
+METRICS.collect(
+    'homework_bot_outbox_failed_total', 'Сообщения, ушедшие в dead letter.',
+    outbox_metric(lambda outbox: outbox.stats.failed), kind='counter')
+METRICS.collect(
+    'homework_bot_outbox_latency_mean_seconds',
+    'Средняя задержка от постановки в очередь до доставки.',
+    outbox_metric(lambda outbox: outbox.stats.latency_mean))
+METRICS.collect(
+    'homework_bot_outbox_latency_max_seconds',
+    'Наибольшая задержка от постановки в очередь до доставки.',
+    outbox_metric(lambda outbox: outbox.stats.latency_max))
+
+TRACER = Tracer(
+    path=TRACE_FILE,
+    profile_dir=PROFILE_DIR,
+    slow_threshold=SLOW_CYCLE,
+    sample_rate=PROFILE_SAMPLE,
+)
+
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+HOMEWORK_VERDICTS_EN = {
+    'approved': 'The work has been reviewed: the reviewer liked it. Hooray!',
+    'reviewing': 'The work has been taken for review.',
+    'rejected': 'The work has been reviewed: the reviewer has remarks.'
+}
+REVIEWING_STATUS = 'reviewing'
+
+VERDICTS = VerdictRegistry(default_locale='ru', fallback=VERDICT_FALLBACK)
+VERDICTS.register(
+    'ru', 'Изменился статус проверки работы "{name}". {verdict}',
+    HOMEWORK_VERDICTS)
+VERDICTS.register(
+    'en', 'The review status of "{name}" has changed. {verdict}',
+    HOMEWORK_VERDICTS_EN)
+
+
+class SendMessageError(Exception):
+    """Сообщение не удалось отправить в телеграм."""
 
 
 def check_tokens() -> bool:
@@ -34,71 +203,268 @@ def check_tokens() -> bool:
     return all(tokens)
 
 
-def send_message(bot, message: str) -> None:
-    """Отправить сообщение в телеграм."""
+@TRACER.traced('send_message')
+@timed(CALL_SECONDS, 'send_message', ERRORS)
+def send_to_chat(bot, chat_id: str, message: str) -> None:
+    """Отправить сообщение в указанный чат телеграма."""
     logging.info('Отправка сообщения')
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        bot.send_message(chat_id, message)
         logging.debug('Сообщение отправлено успешно')
-    except TelegramError:
+    except TelegramError as error:
         logging.error('Сообщение не было отправлено.')
-        raise()
+        raise SendMessageError(error) from error
 
 
-def get_api_answer(timestamp: int) -> dict:
-    """Сделать запрос к API."""
+def send_message(bot, message: str) -> None:
+    """Отправить сообщение в телеграм."""
+    send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_to_subscriber(bot, chat_id: str, message: str) -> None:
+    """Отправить сообщение основному или дополнительному подписчику."""
+    if chat_id == TELEGRAM_CHAT_ID:
+        send_message(bot, message)
+    else:
+        send_to_chat(bot, chat_id, message)
+
+
+def subscribers() -> list:
+    """Чаты, куда main() рассылает уведомления."""
+    extra = [chat_id.strip() for chat_id in EXTRA_CHAT_IDS.split(',')]
+    return [TELEGRAM_CHAT_ID] + [
+        chat_id for chat_id in extra
+        if chat_id and chat_id != TELEGRAM_CHAT_ID
+    ]
+
+
+@in_flight(TENANTS_IN_FLIGHT)
+@timed(CALL_SECONDS, 'get_api_answer', ERRORS)
+def request_statuses(headers: dict, timestamp: int) -> dict:
+    """Сделать запрос к API с заголовками конкретного пользователя.
+
+    Одинаковые запросы с тем же токеном и from_date, пришедшие
+    одновременно, выполняются одним обращением к API.
+    """
+    return FLIGHTS.do(
+        (headers['Authorization'], timestamp),
+        budgeted_fetch, headers, timestamp,
+    )
+
+
+def budgeted_fetch(headers: dict, timestamp: int) -> dict:
+    """Запросить статусы с учётом бюджета и автомата защиты."""
+    return budgeted_call(fetch_statuses, headers, timestamp)
+
+
+def budgeted_call(func, headers: dict, *args):
+    """Вызвать func(headers, *args), если его пропускают бюджет и автомат.
+
+    Без бюджета или при разомкнутом BREAKER запрос не отправляется, а
+    вызывающий получает RequestDeferred с паузой до следующей попытки.
+    Запрос, не пропущенный автоматом, возвращается в бюджет.
+    Retry-After из ответа 429 или 503 останавливает все запросы.
+    """
+    auth = headers['Authorization']
+    wait = BUDGET.reserve(auth)
+    if wait > 0:
+        raise RequestDeferred(
+            f'Бюджет запросов исчерпан, повтор через {wait:.1f} с', wait)
+    try:
+        return BREAKER.call(func, headers, *args)
+    except CircuitOpenError:
+        BUDGET.refund(auth)
+        raise
+    except (UpstreamThrottled, UpstreamUnavailable) as error:
+        if error.retry_after:
+            logging.warning('API просит подождать %.0f с', error.retry_after)
+            BUDGET.pause(error.retry_after)
+        raise
+
+
+def raise_for_status(response) -> None:
+    """Поднять исключение для ответа API с кодом, отличным от 200."""
+    status = response.status_code
+    message = f'Ошибка статуса {status}'
+    headers = getattr(response, 'headers', None) or {}
+    wait = parse_retry_after(headers.get('Retry-After'))
+    if status == 429:
+        raise UpstreamThrottled(message, wait)
+    if status >= 500:
+        raise UpstreamUnavailable(message, wait)
+    raise RuntimeError(message)
+
+
+def fetch_statuses(headers: dict, timestamp: int) -> dict:
+    """Выполнить запрос к API."""
     url = ENDPOINT
-    headers = HEADERS
     payload = {'from_date': timestamp}
-    request_message = (
-        f'Запрос по ссылке {url}, с headers {headers}, cо значениями {payload}'
-    )
-    request_status_message = (
-        f'Ошибка статуса по ссылке {url}, с headers {headers},'
-        f'c значениями {payload}.'
-    )
     try:
-        response = requests.get(url, headers=headers, params=payload)
-        logging.debug(request_message)
+        with TRACER.span('http'):
+            response = TRANSPORT.get(url, headers=headers, params=payload)
+        logging.debug('Запрос по ссылке %s cо значениями %s', url, payload)
+        if response.status_code != 200:
+            logging.error('Ошибка статуса %s по ссылке %s c значениями %s.',
+                          response.status_code, url, payload)
+            raise_for_status(response)
+        with TRACER.span('decode'):
+            answer = decode_response(response)
+    except requests.exceptions.RequestException as error:
+        raise UpstreamUnavailable(type(error).__name__) from error
+    except ValueError as error:
+        logging.error('Вернулся не json')
+        raise UpstreamUnavailable('Вернулся не json') from error
+    if not answer:
+        logging.error('Вернулся пустой ответ')
+    return answer
+
+
+def stream_api_answer(headers: dict, timestamp: int) -> HomeworkStream:
+    """Запросить историю домашек и отдавать их по мере чтения ответа.
+
+    Подходит для выгрузки всей истории с from_date=0: домашки не
+    собираются в один список, а проверяются и отдаются по одной.
+    Запрос проходит через общий бюджет и автомат защиты.
+    """
+    return budgeted_call(open_stream, headers, timestamp)
+
+
+def open_stream(headers: dict, timestamp: int) -> HomeworkStream:
+    """Отправить запрос истории и вернуть поток домашек из ответа."""
+    payload = {'from_date': timestamp}
+    try:
+        response = TRANSPORT.get(
+            ENDPOINT, headers=headers, params=payload, stream=True)
         if response.status_code != 200:
-            logging.error(request_status_message)
-            raise RuntimeError()
-        if not response.json():
-            logging.error('Вернулся не json')
-    except requests.exceptions.RequestException:
-        raise RuntimeError()
-    return response.json()
+            logging.error('Ошибка статуса %s при выгрузке истории',
+                          response.status_code)
+            response.close()
+            raise_for_status(response)
+    except requests.exceptions.RequestException as error:
+        raise UpstreamUnavailable(type(error).__name__) from error
+    return HomeworkStream(response.iter_content(STREAM_CHUNK_SIZE))
 
 
+@TRACER.traced('get_api_answer')
+def get_api_answer(timestamp: int) -> dict:
+    """Сделать запрос к API."""
+    return request_statuses(HEADERS, timestamp)
+
+
+@TRACER.traced('check_response')
+@timed(CALL_SECONDS, 'check_response', ERRORS)
 def check_response(response: dict) -> list:
     """Проверить ответ. Получить список домашек."""
     logging.debug('Проверка ответа сервера')
-    if not isinstance(response, dict):
-        logging.error('Ответ не в виде словаря')
-        raise TypeError()
-    # if 'homeworks' not in response and 'current_date' not in response:
-    #     raise KeyError()
-    if missed_keys := {'homeworks', 'current_date'} - response.keys():
-        logging.error(f'В ответе API нет ожидаемых ключей: {missed_keys}')
-        raise KeyError()
-    if not isinstance(response.get('homeworks'), list):
-        raise TypeError()
-    return response['homeworks']
+    try:
+        return validate_response(response)
+    except ValidationError as error:
+        logging.error('Некорректный ответ API: %s', error)
+        raise
 
 
+@TRACER.traced('parse_status')
+@timed(CALL_SECONDS, 'parse_status', ERRORS)
 def parse_status(homework: dict) -> str:
     """Получить информацию о статусе домашки."""
     logging.debug('Получение статуса домашки')
     try:
         status = homework['status']
-        verdict = HOMEWORK_VERDICTS[status]
         name = homework['homework_name']
-        return f'Изменился статус проверки работы "{name}". {verdict}'
+        return VERDICTS.render(name, status, VERDICT_LOCALE)
     except KeyError:
         logging.error('Неожиданный статус работы')
         raise KeyError()
 
 
+def make_interval_policy() -> AdaptiveInterval:
+    """Создать адаптивный интервал опроса с настройками из окружения."""
+    return AdaptiveInterval(
+        base=RETRY_PERIOD,
+        fast=FAST_PERIOD,
+        max_interval=MAX_PERIOD,
+        daily_budget=DAILY_BUDGET or None,
+    )
+
+
+def open_state():
+    """Открыть состояние: базу SQLite из STATE_DB или json-файл STATE_FILE."""
+    if STATE_DB:
+        return SqliteStore(STATE_DB)
+    return Checkpoint(STATE_FILE)
+
+
+def restore_outbox(checkpoint, outbox: Outbox) -> None:
+    """Вернуть в очередь сообщения, сохранённые при прошлой остановке."""
+    restored = outbox.restore(checkpoint.outbox())
+    if restored or outbox.dead_letters:
+        logging.info('Восстановлено сообщений: %s, недоставленных: %s',
+                     restored, len(outbox.dead_letters))
+        checkpoint.set_outbox({})
+        checkpoint.save()
+
+
+def save_on_shutdown(checkpoint, outbox: Outbox, timeout: float) -> None:
+    """Дослать сообщения не дольше timeout и записать состояние."""
+    unsent = outbox.drain(timeout)
+    checkpoint.set_outbox(outbox.snapshot(unsent))
+    checkpoint.save()
+    checkpoint.close()
+    logging.info('Состояние сохранено, неотправленных сообщений: %s',
+                 len(unsent))
+
+
+def make_outbox(send, workers: int) -> Outbox:
+    """Создать очередь сообщений с ограничением частоты отправки.
+
+    Метрики очереди на METRICS берутся из последней созданной очереди.
+    """
+    global OUTBOX
+    limiter = SendRateLimiter(
+        global_rate=TELEGRAM_GLOBAL_RATE,
+        chat_rate=TELEGRAM_CHAT_RATE,
+    )
+    outbox = Outbox(send, maxsize=OUTBOX_SIZE, workers=workers,
+                    limiter=limiter)
+    outbox.start()
+    OUTBOX = outbox
+    return outbox
+
+
+def make_error_storm(outbox: Outbox) -> ErrorStorm:
+    """Создать подавление повторных сбоев с уведомлениями в TELEGRAM_CHAT_ID.
+
+    Уведомления идут через outbox, поэтому сбой телеграма не выходит
+    за пределы обработчика ошибок цикла.
+    """
+    alert = None
+    if TELEGRAM_CHAT_ID:
+        def alert(text: str, key: str) -> None:
+            outbox.put(TELEGRAM_CHAT_ID, text, key=key)
+    return ErrorStorm(alert=alert, window=ERROR_WINDOW)
+
+
+def serve_metrics() -> None:
+    """Отдавать метрики на METRICS_PORT, если порт задан."""
+    if METRICS_PORT:
+        start_metrics_server(METRICS, METRICS_PORT)
+        logging.info('Метрики на порту %s', METRICS_PORT)
+
+
+def queue_changes(index: StatusIndex, homeworks: list,
+                  coalescer: Coalescer, key: str) -> bool:
+    """Поставить в очередь сообщения о сменах статуса. True, если были."""
+    changed = False
+    for homework in index.diff(homeworks):
+        logging.info('Изменился статус домашки')
+        message = parse_status(homework)
+        for chat_id in subscribers():
+            coalescer.add(chat_id, message,
+                          key=f'{key}:{event_key(homework)}')
+        changed = True
+    return changed
+
+
 def main():
     """Основная логика работы бота."""
     logging.info('Запуск Бота')
@@ -108,38 +474,239 @@ def main():
         sys.exit(1)
 
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    checkpoint = open_state()
+    key = tenant_key(PRACTICUM_TOKEN)
+    timestamp = checkpoint.cursor(key, int(time.time()))
+    index = checkpoint.index(key)
+    policy = make_interval_policy()
+    outbox = make_outbox(
+        lambda chat_id, text: send_to_subscriber(bot, chat_id, text),
+        max(OUTBOX_WORKERS, 1),
+    )
+    restore_outbox(checkpoint, outbox)
+    coalescer = Coalescer(outbox.put, window=COALESCE_WINDOW)
+    errors = make_error_storm(outbox)
+    lag = LagMeter(LOOP_LAG)
+    serve_metrics()
+    TRACER.install_signal()
+    shutdown = Shutdown()
+    shutdown.install()
+
+    try:
+        while not shutdown.requested:
+            lag.wake()
+            interval = RETRY_PERIOD
+            with TRACER.cycle():
+                try:
+                    response = get_api_answer(timestamp)
+                    homeworks = check_response(response)
+                    logging.debug('Проверка существования новой домашки')
+                    if not homeworks:
+                        logging.debug('Новых домашек еще не было')
+                    changed = queue_changes(
+                        index, homeworks, coalescer, key)
+                    with TRACER.span('flush'):
+                        coalescer.flush_all()
+                    timestamp = response['current_date']
+                    with TRACER.span('checkpoint'):
+                        checkpoint.set_index(key, index)
+                        checkpoint.advance(key, timestamp)
+                    interval = policy.next_interval(
+                        index.count(REVIEWING_STATUS) > 0, changed)
+                    errors.success()
+                    logging.debug(
+                        'Следующий запрос через %.0f с, '
+                        'сэкономлено запросов: %.0f',
+                        interval, policy.saved_calls(RETRY_PERIOD))
+
+                except RequestDeferred as error:
+                    logging.debug('Запрос отложен: %s', error)
+                    interval = max(interval, error.retry_after)
+                except Exception as error:
+                    errors.failure(error)
+                    interval = max(interval, retry_after(error) or 0)
+            lag.expect(interval)
+            with shutdown.interruptible():
+                time.sleep(interval)
+    except GracefulExit:
+        logging.info('Остановка по сигналу %s', shutdown.signum)
+    finally:
+        shutdown.uninstall()
+        coalescer.flush_all()
+        checkpoint.set_cursor(key, timestamp)
+        checkpoint.set_index(key, index)
+        save_on_shutdown(checkpoint, outbox, SHUTDOWN_TIMEOUT)
+
+
+def load_tenants(path: str) -> list:
+    """Прочитать список пользователей из json-файла.
+
+    У пользователя может быть один чат в поле chat_id или несколько
+    в поле chat_ids: все они получают одни и те же уведомления. Записи
+    с одним токеном объединяются в одного пользователя со всеми их
+    чатами: токен опрашивается один раз.
+    """
+    with open(path, encoding='UTF-8') as file:
+        items = json.load(file)
+    chats_by_token: dict = {}
+    for position, item in enumerate(items):
+        chat_ids = item.get('chat_ids')
+        if chat_ids is None and item.get('chat_id') is not None:
+            chat_ids = [item['chat_id']]
+        if not chat_ids:
+            raise ValueError(
+                f'{path}: у пользователя №{position} нет chat_id или '
+                f'chat_ids')
+        if not isinstance(chat_ids, list):
+            raise ValueError(
+                f'{path}: у пользователя №{position} chat_ids должен быть '
+                f'списком, получен {type(chat_ids).__name__}')
+        chats = chats_by_token.setdefault(item['token'], {})
+        if chats:
+            logging.info('%s: запись №%s повторяет токен, её чаты '
+                         'добавлены к первой записи', path, position)
+        chats.update(dict.fromkeys(str(chat_id) for chat_id in chat_ids))
+    return [
+        Tenant(token=token, chat_ids=list(chats))
+        for token, chats in chats_by_token.items()
+    ]
+
+
+def run_tenants():
+    """Опрос множества пользователей из файла TENANTS_FILE."""
+    logging.info('Запуск Бота для множества пользователей')
+    if not TELEGRAM_TOKEN:
+        logging.critical("Нет токена телеграма")
+        sys.exit(1)
+    tenants = load_tenants(TENANTS_FILE)
+    if TRANSPORT.session is None:
+        TRANSPORT.open_pool(POLL_CONCURRENCY)
+    checkpoint = open_state()
+    bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    outbox = make_outbox(
+        lambda chat_id, text: send_to_chat(bot, chat_id, text),
+        OUTBOX_WORKERS or 8,
+    )
+    restore_outbox(checkpoint, outbox)
+    coalescer = Coalescer(outbox.put, window=COALESCE_WINDOW)
+    coalescer.start()
+    engine = PollingEngine(
+        fetch=request_statuses,
+        check=check_response,
+        render=parse_status,
+        notify=coalescer.add,
+        concurrency=POLL_CONCURRENCY,
+        checkpoint=checkpoint,
+        reviewing_status=REVIEWING_STATUS,
+        lag_meter=LagMeter(LOOP_LAG),
+        errors=make_error_storm(outbox),
+    )
     timestamp = int(time.time())
-    previos_homework = None
+    for tenant in tenants:
+        tenant.timestamp = checkpoint.cursor(tenant.key, timestamp)
+        tenant.index = checkpoint.index(tenant.key)
+        tenant.policy = make_interval_policy()
+    serve_metrics()
+    engine.drain_timeout = SHUTDOWN_TIMEOUT / 2
+    shutdown = Shutdown()
+    shutdown.subscribe(engine.stop)
+    shutdown.install()
+    try:
+        asyncio.run(engine.run(tenants, RETRY_PERIOD))
+    except GracefulExit:
+        logging.info('Остановка по сигналу %s', shutdown.signum)
+    finally:
+        shutdown.uninstall()
+        engine.close()
+        engine.save_cursors(tenants)
+        coalescer.close()
+        save_on_shutdown(checkpoint, outbox, SHUTDOWN_TIMEOUT / 2)
+        TRANSPORT.close()
 
-    while True:
+
+def backfill_tenant(tenant: Tenant) -> int:
+    """Загрузить всю историю пользователя в его индекс без уведомлений.
+
+    Если бюджет или автомат защиты откладывают запрос, поток ждёт.
+    """
+    stream = None
+    while stream is None:
         try:
-            response = get_api_answer(timestamp)
-            homeworks = check_response(response)
-            logging.debug('Проверка существования новой домашки')
-            if homeworks:
-                logging.info('Найденa домашка')
-                if homeworks[0] != previos_homework:
-                    logging.info('Есть новая домашка')
-                    send_message(bot, parse_status(homeworks[0]))
-                    previos_homework = homeworks[0]
-            else:
-                logging.debug('Новых домашек еще не было')
-
-        except TelegramError as error:
-            message = f'Сбой отправки сообщения: {error}'
-            logging.exception(message)
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            logging.error(message)
-        time.sleep(RETRY_PERIOD)
+            stream = stream_api_answer(tenant.headers, 0)
+        except RequestDeferred as error:
+            logging.debug('Выгрузка истории отложена: %s', error)
+            time.sleep(error.retry_after)
+    transitions = tenant.index.seed(stream)
+    tenant.timestamp = stream.current_date
+    return transitions
+
+
+def backfill():
+    """Заполнить индексы статусов и курсоры до запуска опроса.
+
+    История выгружается параллельно, пользователи обрабатываются пачками
+    по BACKFILL_CHUNK, и каждая пачка записывается в состояние одной
+    атомарной записью. Сообщения в телеграм не отправляются.
+    """
+    logging.info('Загрузка истории домашек')
+    if TENANTS_FILE:
+        tenants = load_tenants(TENANTS_FILE)
+    elif PRACTICUM_TOKEN:
+        tenants = [Tenant(PRACTICUM_TOKEN, [TELEGRAM_CHAT_ID])]
+    else:
+        logging.critical("Нет токенов")
+        sys.exit(1)
+    checkpoint = open_state()
+    if TRANSPORT.session is None:
+        TRANSPORT.open_pool(POLL_CONCURRENCY)
+    try:
+        loaded = failed = 0
+        with ThreadPoolExecutor(max_workers=POLL_CONCURRENCY) as executor:
+            for start in range(0, len(tenants), BACKFILL_CHUNK):
+                chunk = tenants[start:start + BACKFILL_CHUNK]
+                futures = [
+                    executor.submit(backfill_tenant, tenant)
+                    for tenant in chunk
+                ]
+                for tenant, future in zip(chunk, futures):
+                    try:
+                        future.result()
+                    except Exception as error:
+                        failed += 1
+                        logging.error('Сбой загрузки истории: %s', error)
+                        continue
+                    loaded += 1
+                    checkpoint.set_cursor(tenant.key, tenant.timestamp)
+                    checkpoint.set_index(tenant.key, tenant.index)
+                    tenant.index = StatusIndex()
+                checkpoint.save()
+                logging.info('Загружено %s из %s пользователей',
+                             loaded, len(tenants))
+    finally:
+        checkpoint.close()
+        TRANSPORT.close()
+    logging.info('История загружена: %s успешно, %s с ошибкой',
+                 loaded, failed)
 
 
 if __name__ == '__main__':
     FORMAT = ('%(asctime)s, %(levelname)s, %(funcName)s, %(message)s')
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format=FORMAT,
-        handlers=[
-            logging.FileHandler(__file__ + '.log', encoding='UTF-8', mode='w'),
-            logging.StreamHandler(sys.stdout)])
-    main()
+    log_handler, log_listener = make_log_queue(
+        [
+            RotatingFileHandler(
+                __file__ + '.log', encoding='UTF-8',
+                maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT),
+            logging.StreamHandler(sys.stdout),
+        ],
+        secrets=[PRACTICUM_TOKEN, TELEGRAM_TOKEN],
+        fmt=FORMAT,
+    )
+    logging.basicConfig(level=LOG_LEVEL, handlers=[log_handler])
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    if sys.argv[1:] == ['backfill']:
+        backfill()
+    elif TENANTS_FILE:
+        run_tenants()
+    else:
+        main()
@@ -0,0 +1 @@
+"""Компоненты бота для опроса множества пользователей."""
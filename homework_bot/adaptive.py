@@ -0,0 +1,51 @@
+"""Адаптивный интервал опроса API."""
+from typing import Optional
+
+SECONDS_PER_DAY = 86400
+
+
+class AdaptiveInterval:
+    """Выбирает паузу до следующего запроса по состоянию домашек.
+
+    Пока работа на проверке, опрос идёт с коротким интервалом. После
+    смены статуса интервал возвращается к базовому, а в простое растёт
+    экспоненциально до max_interval. Дневной бюджет запросов задаёт
+    нижнюю границу интервала.
+    """
+
+    def __init__(self, base: float, fast: float, max_interval: float,
+                 factor: float = 2.0,
+                 daily_budget: Optional[int] = None) -> None:
+        self.base = base
+        self.fast = fast
+        self.max_interval = max_interval
+        self.factor = factor
+        self.min_interval = (
+            SECONDS_PER_DAY / daily_budget if daily_budget else 0.0
+        )
+        self.idle_cycles = 0
+        self.calls = 0
+        self.elapsed = 0.0
+
+    def next_interval(self, reviewing: bool, changed: bool) -> float:
+        """Интервал до следующего запроса после очередного опроса."""
+        if reviewing:
+            self.idle_cycles = 0
+            interval = self.fast
+        elif changed:
+            self.idle_cycles = 0
+            interval = self.base
+        else:
+            interval = self.base * self.factor ** self.idle_cycles
+            if interval >= self.max_interval:
+                interval = self.max_interval
+            else:
+                self.idle_cycles += 1
+        interval = max(interval, self.min_interval)
+        self.calls += 1
+        self.elapsed += interval
+        return interval
+
+    def saved_calls(self, fixed_period: float) -> float:
+        """Сколько запросов сэкономлено против опроса раз в fixed_period."""
+        return self.elapsed / fixed_period - self.calls
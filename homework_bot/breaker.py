@@ -0,0 +1,128 @@
+"""Автомат защиты для запросов к API Практикума."""
+import threading
+import time
+from typing import Callable, Optional, Tuple, Type
+
+from homework_bot.ratelimit import RequestDeferred
+
+
+class UpstreamUnavailable(RuntimeError):
+    """API не ответило: таймаут, обрыв соединения или ошибка 5xx."""
+
+    def __init__(self, message: str = '',
+                 retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UpstreamThrottled(RuntimeError):
+    """API ответило 429: запросов слишком много."""
+
+    def __init__(self, message: str = '',
+                 retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RequestDeferred):
+    """Запрос не отправлен: автомат разомкнут после серии сбоев."""
+
+
+class CircuitBreaker:
+    """Размыкает цепь после failure_threshold сбоев подряд.
+
+    В разомкнутом состоянии вызовы сразу получают CircuitOpenError.
+    Через reset_timeout секунд пропускается ровно один пробный вызов:
+    его успех замыкает цепь, сбой размыкает её снова, а пауза до
+    следующей пробы удваивается до max_reset_timeout. Сбоем считаются
+    только исключения из failures: любое другое исключение значит, что
+    API ответило, и цепь остаётся замкнутой. Например, ошибка
+    авторизации одного пользователя не отключает опрос всех остальных.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 600.0,
+                 failures: Tuple[Type[BaseException], ...] = (
+                     UpstreamUnavailable,),
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.failures = failures
+        self.clock = clock
+        self.state = self.CLOSED
+        self.rejected = 0
+        self.opened_at: Optional[float] = None
+        self._consecutive = 0
+        self._timeout = reset_timeout
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """Через сколько секунд будет пробный вызов, 0 если цепь замкнута.
+
+        Пока идёт пробный вызов, остальным предлагается подождать ещё
+        одну паузу: иначе они перепланировались бы без задержки.
+        """
+        if self.state == self.CLOSED or self.opened_at is None:
+            return 0.0
+        if self.state == self.HALF_OPEN:
+            return self._timeout
+        return max(0.0, self.opened_at + self._timeout - self.clock())
+
+    def allow(self) -> bool:
+        """Можно ли сделать вызов прямо сейчас."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if (self.state == self.OPEN
+                    and self.clock() >= self.opened_at + self._timeout):
+                self.state = self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """Успешный вызов замыкает цепь."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.opened_at = None
+            self._consecutive = 0
+            self._timeout = self.reset_timeout
+
+    def record_failure(self) -> None:
+        """Сбой вызова: размыкает цепь после порога или неудачной пробы."""
+        with self._lock:
+            self._consecutive += 1
+            if self.state == self.HALF_OPEN:
+                self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif (self.state == self.CLOSED
+                  and self._consecutive >= self.failure_threshold):
+                self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+
+    def call(self, func: Callable, *args):
+        """Вызвать func(*args) через автомат."""
+        if not self.allow():
+            wait = self.retry_in()
+            raise CircuitOpenError(
+                f'API недоступно, следующая попытка через {wait:.0f} с',
+                wait)
+        try:
+            result = func(*args)
+        except self.failures:
+            self.record_failure()
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        self.record_success()
+        return result
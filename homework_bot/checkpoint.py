@@ -0,0 +1,108 @@
+"""Сохранение курсоров опроса и индексов статусов на диск."""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+from homework_bot.status_index import StatusIndex
+
+
+def tenant_key(token: str) -> str:
+    """Ключ пользователя в состоянии без хранения самого токена."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+class Checkpoint:
+    """Состояние бота в json-файле.
+
+    Файл перезаписывается атомарно: данные пишутся во временный файл
+    рядом и подменяют старый через os.replace, поэтому после падения
+    на диске остаётся либо прежнее, либо новое состояние целиком.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.state = self._read()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, encoding='UTF-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logging.error('Не удалось прочитать состояние %s: %s',
+                          self.path, error)
+            return {}
+
+    def cursor(self, key: str, default: int) -> int:
+        """Курсор from_date пользователя или default, если его нет."""
+        return self.state.get('cursors', {}).get(key, default)
+
+    def set_cursor(self, key: str, value: int) -> bool:
+        """Запомнить курсор. Вернуть True, если он изменился."""
+        cursors = self.state.setdefault('cursors', {})
+        if cursors.get(key) == value:
+            return False
+        cursors[key] = value
+        return True
+
+    def index(self, key: str) -> StatusIndex:
+        """Сохранённый индекс статусов пользователя."""
+        return StatusIndex.from_dict(
+            self.state.get('statuses', {}).get(key, {}))
+
+    def set_index(self, key: str, index: StatusIndex) -> bool:
+        """Запомнить индекс статусов. Вернуть True, если он изменился."""
+        statuses = self.state.setdefault('statuses', {})
+        data = index.to_dict()
+        if statuses.get(key) == data:
+            return False
+        statuses[key] = data
+        return True
+
+    def set_next_due(self, key: str, when: float) -> None:
+        """Запомнить время следующего опроса пользователя (unix time)."""
+        self.state.setdefault('due', {})[key] = when
+
+    def due(self, until: float,
+            limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Пользователи со временем опроса не позже until, ранние первыми."""
+        due = sorted(
+            (when, key) for key, when in self.state.get('due', {}).items()
+            if when <= until)
+        return [(key, when) for when, key in due[:limit]]
+
+    def outbox(self) -> dict:
+        """Сохранённые при остановке сообщения очереди отправки."""
+        return self.state.get('outbox', {})
+
+    def set_outbox(self, snapshot: dict) -> None:
+        """Запомнить сообщения очереди отправки до следующей записи."""
+        self.state['outbox'] = snapshot
+
+    def advance(self, key: str, value: int) -> None:
+        """Сдвинуть курсор пользователя и сразу записать состояние."""
+        if self.set_cursor(key, value):
+            self.save()
+
+    def save(self) -> None:
+        """Атомарно записать состояние на диск."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix='.state-', suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='UTF-8') as file:
+                json.dump(self.state, file, separators=(',', ':'))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def close(self) -> None:
+        """Файл не держится открытым, закрывать нечего."""
@@ -0,0 +1,112 @@
+"""Склейка нескольких уведомлений для одного чата в одно сообщение."""
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+SEPARATOR = '\n\n'
+
+
+def join_messages(texts: Iterable[str],
+                  limit: int = TELEGRAM_MESSAGE_LIMIT) -> List[str]:
+    """Упаковать тексты в наименьшее число сообщений не длиннее limit."""
+    messages: List[str] = []
+    current = ''
+    for text in texts:
+        while len(text) > limit:
+            if current:
+                messages.append(current)
+                current = ''
+            messages.append(text[:limit])
+            text = text[limit:]
+        if not current:
+            current = text
+        elif len(current) + len(SEPARATOR) + len(text) <= limit:
+            current = f'{current}{SEPARATOR}{text}'
+        else:
+            messages.append(current)
+            current = text
+    if current:
+        messages.append(current)
+    return messages
+
+
+class Coalescer:
+    """Копит уведомления по чатам и отправляет их пачкой.
+
+    Первое уведомление открывает для чата окно window секунд. Всё, что
+    пришло в этот чат до закрытия окна, уходит одним сообщением, если
+    оно укладывается в лимит длины телеграма.
+    """
+
+    def __init__(self, send: Callable[[str, str, str], object],
+                 window: float = 2.0, limit: int = TELEGRAM_MESSAGE_LIMIT,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.send = send
+        self.window = window
+        self.limit = limit
+        self.clock = clock
+        self.merged = 0
+        self._pending: Dict[Hashable, list] = {}
+        self._opened: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, chat_id: str, text: str, key: Optional[str] = None) -> None:
+        """Добавить уведомление для чата."""
+        if key is None:
+            key = hashlib.sha1(text.encode()).hexdigest()
+        with self._lock:
+            if chat_id not in self._pending:
+                self._pending[chat_id] = []
+                self._opened[chat_id] = self.clock()
+            self._pending[chat_id].append((key, text))
+
+    def _take(self, due_before: Optional[float]) -> dict:
+        with self._lock:
+            chats = [
+                chat_id for chat_id, opened in self._opened.items()
+                if due_before is None or opened <= due_before
+            ]
+            taken = {chat_id: self._pending.pop(chat_id) for chat_id in chats}
+            for chat_id in chats:
+                del self._opened[chat_id]
+        return taken
+
+    def _send(self, taken: dict) -> None:
+        for chat_id, items in taken.items():
+            texts = [text for _, text in items]
+            batch_key = hashlib.sha1(
+                '|'.join(key for key, _ in items).encode()).hexdigest()
+            messages = join_messages(texts, self.limit)
+            self.merged += len(texts) - len(messages)
+            for number, message in enumerate(messages):
+                self.send(chat_id, message, f'{batch_key}:{number}')
+
+    def flush_due(self) -> None:
+        """Отправить чаты, у которых закрылось окно."""
+        self._send(self._take(self.clock() - self.window))
+
+    def flush_all(self) -> None:
+        """Отправить всё накопленное, не дожидаясь окон."""
+        self._send(self._take(None))
+
+    def start(self) -> None:
+        """Запустить фоновый поток, закрывающий окна."""
+        self._thread = threading.Thread(
+            target=self._work, name='coalescer', daemon=True)
+        self._thread.start()
+
+    def _work(self) -> None:
+        while not self._stopping.wait(self.window / 2):
+            self.flush_due()
+
+    def close(self) -> None:
+        """Остановить поток и отправить остаток."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush_all()
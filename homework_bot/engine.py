@@ -0,0 +1,275 @@
+"""Асинхронный опрос API Практикума для множества пользователей."""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from homework_bot.adaptive import AdaptiveInterval
+from homework_bot.checkpoint import Checkpoint, tenant_key
+from homework_bot.errorstorm import ErrorStorm
+from homework_bot.metrics import LagMeter
+from homework_bot.ratelimit import RequestDeferred, retry_after
+from homework_bot.scheduler import Scheduler
+from homework_bot.status_index import StatusIndex, event_key
+
+
+@dataclass
+class Tenant:
+    """Токен Практикума и чаты телеграма, куда уходят уведомления."""
+
+    token: str
+    chat_ids: Tuple[str, ...]
+    timestamp: int = 0
+    interval: Optional[float] = None
+    deferred: Optional[float] = None
+    next_due: Optional[float] = None
+    policy: Optional[AdaptiveInterval] = field(default=None, repr=False)
+    index: StatusIndex = field(default_factory=StatusIndex, repr=False)
+    headers: dict = field(init=False, repr=False)
+    key: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        """Привести чаты к кортежу и посчитать заголовки и ключ."""
+        if isinstance(self.chat_ids, str):
+            self.chat_ids = (self.chat_ids,)
+        self.chat_ids = tuple(self.chat_ids)
+        self.headers = {'Authorization': f'OAuth {self.token}'}
+        self.key = tenant_key(self.token)
+
+
+class PollingEngine:
+    """Опрашивает API для множества пользователей из одного процесса.
+
+    Блокирующие запросы выполняются в пуле потоков, а число одновременно
+    опрашиваемых пользователей ограничено семафором. В режиме run()
+    пользователи опрашиваются по своим дедлайнам из Scheduler. Каждая
+    домашка запрашивается и рендерится один раз, после чего сообщение
+    параллельно уходит во все чаты пользователя.
+    """
+
+    tick = 1.0
+    flush_interval = 5.0
+    flush_share = 0.05
+    drain_timeout = 10.0
+
+    def __init__(self, fetch: Callable, check: Callable, render: Callable,
+                 notify: Optional[Callable] = None,
+                 concurrency: int = 100,
+                 checkpoint: Optional[Checkpoint] = None,
+                 jitter: float = 0.1,
+                 reviewing_status: str = 'reviewing',
+                 lag_meter: Optional[LagMeter] = None,
+                 errors: Optional[ErrorStorm] = None) -> None:
+        self.fetch = fetch
+        self.check = check
+        self.render = render
+        self.notify = notify
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+        self.reviewing_status = reviewing_status
+        self.lag_meter = lag_meter
+        self.errors = errors
+        self.scheduler = Scheduler(jitter=jitter)
+        self.polled = 0
+        self.failed = 0
+        self.skipped = 0
+        self.stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore = None
+        self._tasks: set = set()
+
+    async def _run_blocking(self, func: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def poll(self, tenant: Tenant) -> List[str]:
+        """Опросить API для одного пользователя и разослать изменения.
+
+        Сообщение рендерится до того, как у индекса запрошен следующий
+        переход: индекс запоминает домашку в этот момент. Если рендер
+        упал на одной из домашек, уже готовые сообщения всё равно
+        уходят, а упавшая домашка выдаётся снова при следующем опросе.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        messages: List[tuple] = []
+        async with self._semaphore:
+            try:
+                response = await self._run_blocking(
+                    self.fetch, tenant.headers, tenant.timestamp)
+                for homework in tenant.index.diff(self.check(response)):
+                    messages.append((f'{tenant.key}:{event_key(homework)}',
+                                     self.render(homework)))
+                tenant.timestamp = response['current_date']
+                if tenant.policy is not None:
+                    tenant.interval = tenant.policy.next_interval(
+                        tenant.index.count(self.reviewing_status) > 0,
+                        bool(messages),
+                    )
+            except RequestDeferred as error:
+                self.skipped += 1
+                tenant.deferred = error.retry_after
+                logging.debug('Опрос для чатов %s отложен: %s',
+                              tenant.chat_ids, error)
+            except Exception as error:
+                self._fail(tenant, error)
+            else:
+                self.polled += 1
+                if self.errors is not None:
+                    self.errors.success(tenant.key)
+        if self.notify is not None:
+            await asyncio.gather(*(
+                self._deliver(chat_id, message, key)
+                for key, message in messages
+                for chat_id in tenant.chat_ids
+            ))
+        return [message for _, message in messages]
+
+    def _fail(self, tenant: Tenant, error: Exception) -> None:
+        self.failed += 1
+        tenant.deferred = retry_after(error)
+        if self.errors is not None:
+            self.errors.failure(error, tenant.key)
+        else:
+            logging.error(
+                'Сбой опроса для чатов %s: %s', tenant.chat_ids, error)
+
+    async def _deliver(self, chat_id: str, message: str, key: str) -> None:
+        try:
+            await self._run_blocking(self.notify, chat_id, message, key)
+        except Exception as error:
+            logging.error(
+                'Сбой отправки сообщения в чат %s: %s', chat_id, error)
+
+    async def poll_all(self, tenants: Iterable[Tenant]) -> int:
+        """Опросить всех пользователей один раз. Вернуть число сообщений."""
+        tenants = list(tenants)
+        results = await asyncio.gather(*(self.poll(t) for t in tenants))
+        self.save_cursors(tenants)
+        return sum(len(messages) for messages in results)
+
+    def save_cursors(self, tenants: Iterable[Tenant]) -> None:
+        """Записать курсоры, индексы и расписание одной записью."""
+        if self.checkpoint is None:
+            return
+        changed = False
+        for tenant in tenants:
+            changed |= self.checkpoint.set_cursor(tenant.key, tenant.timestamp)
+            changed |= self.checkpoint.set_index(tenant.key, tenant.index)
+            if tenant.next_due is not None:
+                self.checkpoint.set_next_due(tenant.key, tenant.next_due)
+                tenant.next_due = None
+                changed = True
+        if changed:
+            self.checkpoint.save()
+
+    async def _poll_scheduled(self, tenant: Tenant, period: float) -> None:
+        try:
+            await self.poll(tenant)
+        finally:
+            if tenant.deferred is not None:
+                due = self.scheduler.schedule_after(
+                    tenant.key, tenant.deferred)
+                tenant.deferred = None
+            else:
+                due = self.scheduler.schedule_in(
+                    tenant.key, tenant.interval or period)
+            tenant.next_due = time.time() + due - self.scheduler.clock()
+
+    def resume(self, tenants: dict, period: float) -> int:
+        """Восстановить сохранённое расписание опросов в пределах периода.
+
+        Пользователи без сохранённого времени или с уже наступившим
+        временем равномерно распределяются по периоду, как при первом
+        запуске. Вернуть число пользователей со своим временем.
+        """
+        now = time.time()
+        start = self.scheduler.clock()
+        resumed = set()
+        if self.checkpoint is not None:
+            for key, when in self.checkpoint.due(now + period):
+                if when > now and key in tenants:
+                    self.scheduler.schedule(key, start + when - now)
+                    resumed.add(key)
+        self.scheduler.spread(
+            (key for key in tenants if key not in resumed), period)
+        return len(resumed)
+
+    def dispatch_due(self, tenants: dict, period: float) -> int:
+        """Запустить опрос пользователей, чей дедлайн наступил."""
+        due = self.scheduler.pop_due()
+        for key in due:
+            task = asyncio.ensure_future(
+                self._poll_scheduled(tenants[key], period))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(due)
+
+    async def run(self, tenants: List[Tenant], period: float) -> None:
+        """Опрашивать пользователей по расписанию бесконечно.
+
+        Сохранённое расписание восстанавливается, остальные первые
+        опросы равномерно распределяются по периоду, дальше
+        каждый пользователь перепланируется на свой интервал с разбросом,
+        чтобы запросы не собирались в пики. После stop() новые опросы
+        не начинаются, начатые ждутся не дольше drain_timeout, и
+        состояние записывается перед выходом.
+
+        Запись состояния идёт в потоке цикла и останавливает его. Пауза
+        между записями растёт вместе со временем записи, чтобы при
+        большом числе пользователей запись занимала не больше
+        flush_share времени цикла.
+        """
+        by_key = {tenant.key: tenant for tenant in tenants}
+        if len(by_key) < len(tenants):
+            logging.warning(
+                'У %s пользователей повторяется токен, опрашивается '
+                'только последняя запись', len(tenants) - len(by_key))
+        self.resume(by_key, period)
+        last_flush = time.monotonic()
+        flush_every = self.flush_interval
+        while not self.stopping:
+            self.dispatch_due(by_key, period)
+            if time.monotonic() - last_flush >= flush_every:
+                started = time.monotonic()
+                self.save_cursors(by_key.values())
+                last_flush = time.monotonic()
+                flush_every = max(
+                    self.flush_interval,
+                    (last_flush - started) / self.flush_share)
+            next_due = self.scheduler.next_due()
+            delay = self.tick
+            if next_due is not None:
+                delay = min(delay, next_due - self.scheduler.clock())
+            delay = max(0.0, delay)
+            if self.lag_meter is not None:
+                self.lag_meter.expect(delay)
+            await asyncio.sleep(delay)
+            if self.lag_meter is not None:
+                self.lag_meter.wake()
+        await self.drain(by_key.values())
+
+    def stop(self) -> None:
+        """Не начинать новые опросы и выйти из run()."""
+        self.stopping = True
+
+    async def drain(self, tenants: Iterable[Tenant]) -> int:
+        """Дождаться начатых опросов и записать состояние.
+
+        Вернуть число опросов, которые не успели за drain_timeout.
+        """
+        pending = set()
+        if self._tasks:
+            _, pending = await asyncio.wait(
+                set(self._tasks), timeout=self.drain_timeout)
+        if pending:
+            logging.warning('Не дождались %s опросов при остановке',
+                            len(pending))
+        self.save_cursors(tenants)
+        return len(pending)
+
+    def close(self) -> None:
+        """Остановить пул потоков."""
+        self._executor.shutdown(wait=False)
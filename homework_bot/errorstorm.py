@@ -0,0 +1,124 @@
+"""Подавление повторяющихся сбоев и сводные уведомления о них."""
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Optional, Set
+
+ERROR_PREFIX = 'Сбой в работе программы'
+
+
+def error_signature(error: BaseException) -> str:
+    """Одинаковые сбои дают одинаковую подпись: тип и текст ошибки."""
+    return f'{type(error).__name__}: {error}'
+
+
+@dataclass
+class Outage:
+    """Один продолжающийся сбой с одной подписью."""
+
+    signature: str
+    started: float
+    last_report: float
+    count: int = 1
+    suppressed: int = 0
+    sources: Set[Hashable] = field(default_factory=set)
+
+    @property
+    def key(self) -> str:
+        """Ключ уведомлений об этом сбое для дедупликации в очереди."""
+        digest = hashlib.sha1(self.signature.encode()).hexdigest()[:12]
+        return f'error:{digest}:{self.started:.0f}'
+
+
+class ErrorStorm:
+    """Схлопывает одинаковые сбои в одно сообщение на время сбоя.
+
+    Первый сбой с новой подписью пишется в лог и уходит одним
+    уведомлением в alert. Повторы только считаются, и раз в window
+    секунд в лог пишется одна строка с числом повторов. Сбой считается
+    закончившимся, когда все источники, на которых он случился, снова
+    отработали успешно; тогда отправляется уведомление о восстановлении
+    с общим числом сбоев и длительностью. Смена одной ошибки на другую
+    восстановлением не считается.
+    """
+
+    def __init__(self, alert: Optional[Callable[[str, str], object]] = None,
+                 window: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.alert = alert
+        self.window = window
+        self.clock = clock
+        self.alerts = 0
+        self._outages: Dict[str, Outage] = {}
+        self._sources: Dict[Hashable, Set[str]] = {}
+
+    def active(self) -> Dict[str, int]:
+        """Продолжающиеся сбои и сколько раз каждый повторился."""
+        return {
+            signature: outage.count
+            for signature, outage in self._outages.items()
+        }
+
+    def failure(self, error: BaseException, source: Hashable = '') -> bool:
+        """Учесть сбой источника. True, если сбой новый и о нём сообщено."""
+        signature = error_signature(error)
+        self._sources.setdefault(source, set()).add(signature)
+        now = self.clock()
+        outage = self._outages.get(signature)
+        if outage is not None:
+            outage.count += 1
+            outage.suppressed += 1
+            outage.sources.add(source)
+            if now - outage.last_report >= self.window:
+                logging.error('%s: %s (повторов за %.0f с: %s)',
+                              ERROR_PREFIX, error, now - outage.last_report,
+                              outage.suppressed)
+                outage.last_report = now
+                outage.suppressed = 0
+            return False
+        outage = Outage(signature, started=now, last_report=now,
+                        sources={source})
+        self._outages[signature] = outage
+        logging.error('%s: %s', ERROR_PREFIX, error)
+        self._send(f'{ERROR_PREFIX}: {error}', outage.key)
+        return True
+
+    def success(self, source: Hashable = '') -> bool:
+        """Учесть успешную работу источника. True, если сбой закончился.
+
+        Только успех закрывает сбои источника: если ошибка источника
+        сменилась на другую, прежний сбой продолжается до успеха.
+        """
+        signatures = self._sources.pop(source, None)
+        if not signatures:
+            return False
+        recovered = False
+        for signature in signatures:
+            outage = self._outages[signature]
+            outage.sources.discard(source)
+            if not outage.sources:
+                del self._outages[signature]
+                self._recover(outage)
+                recovered = True
+        return recovered
+
+    def _recover(self, outage: Outage) -> None:
+        minutes = (self.clock() - outage.started) / 60
+        message = (
+            f'Работа восстановлена. Сбой «{outage.signature}» '
+            f'повторился {outage.count} раз за {minutes:.0f} мин.'
+        )
+        logging.info(message)
+        self._send(message, f'{outage.key}:recovered')
+
+    def _send(self, text: str, key: str) -> None:
+        if self.alert is None:
+            return
+        try:
+            self.alert(text, key)
+        except Exception as error:
+            logging.error('Не удалось отправить уведомление о сбое: %s',
+                          error)
+            return
+        self.alerts += 1
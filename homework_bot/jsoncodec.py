@@ -0,0 +1,32 @@
+"""Разбор json-ответов API ровно один раз.
+
+Если установлен orjson, тело ответа разбирается им, иначе модулем json
+из стандартной библиотеки. Оба бросают ValueError на битом json.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def loads(data):
+    """Разобрать json из bytes или str доступным декодером."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_response(response):
+    """Разобрать тело ответа requests.
+
+    Берётся уже скачанное тело response.content, что обходит декодирование
+    в текст внутри requests. У ответов без content вызывается json().
+    """
+    content = getattr(response, 'content', None)
+    if isinstance(content, (bytes, str)) and content:
+        return loads(content)
+    return response.json()
@@ -0,0 +1,85 @@
+"""Логирование через очередь: запись в файл не тормозит цикл опроса."""
+import logging
+import queue
+import re
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable, List, Optional, Tuple
+
+MASK = '***'
+SECRET_PATTERNS = (
+    re.compile(r'(OAuth\s+)[^\s\'",}]+'),
+    re.compile(r'\d{6,}:[\w-]{30,}'),
+)
+
+
+class RedactingFilter(logging.Filter):
+    """Заменяет токены в тексте записи на ***.
+
+    Скрываются переданные значения секретов, а также всё, что похоже на
+    заголовок OAuth или токен бота телеграма. Фильтр ставится на
+    конечные обработчики, поэтому работает в потоке слушателя очереди.
+    """
+
+    def __init__(self, secrets: Iterable[Optional[str]] = ()) -> None:
+        super().__init__()
+        self.secrets = sorted(
+            {secret for secret in secrets if secret}, key=len, reverse=True)
+
+    def redact(self, text: str) -> str:
+        """Вернуть текст со скрытыми токенами."""
+        for secret in self.secrets:
+            text = text.replace(secret, MASK)
+        for pattern in SECRET_PATTERNS:
+            text = pattern.sub(
+                lambda match: (match.group(1) if match.groups() else '')
+                + MASK, text)
+        return text
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Скрыть токены в сообщении записи."""
+        message = record.getMessage()
+        redacted = self.redact(message)
+        if redacted != message:
+            record.msg = redacted
+            record.args = None
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Кладёт запись в очередь, оставляя оформление строки слушателю.
+
+    В вызывающем потоке аргументы подставляются в сообщение, чтобы
+    запись не зависела от изменяемых объектов, а время, уровень и имя
+    функции добавляет форматтер конечного обработчика.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Подставить аргументы в сообщение и убрать трейсбек-объект."""
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def make_log_queue(handlers: List[logging.Handler],
+                   secrets: Iterable[Optional[str]] = (),
+                   fmt: Optional[str] = None
+                   ) -> Tuple[QueueHandler, QueueListener]:
+    """Собрать обработчик-очередь и слушателя для конечных обработчиков.
+
+    Обработчик-очередь только кладёт запись в неограниченную очередь,
+    поэтому вызов логгера никогда не ждёт диска. Записи ниже уровня
+    логгера не форматируются вовсе; оформление по fmt, маскировка
+    токенов и запись выполняются в фоновом потоке слушателя.
+    """
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    redacting = RedactingFilter(secrets)
+    for handler in handlers:
+        handler.addFilter(redacting)
+        if fmt is not None:
+            handler.setFormatter(logging.Formatter(fmt))
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    return DeferredQueueHandler(records), listener
@@ -0,0 +1,331 @@
+"""Метрики работы бота в текстовом формате Prometheus."""
+import bisect
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence
+
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    30.0,
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _labels(label_name: Optional[str], label: str, extra: str = '') -> str:
+    pairs = []
+    if label_name is not None:
+        pairs.append(f'{label_name}="{label}"')
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """Общая часть метрик: имя, описание и необязательная метка.
+
+    Запись значений идёт без блокировки: под GIL операция `x += 1`
+    над элементом списка не прерывается другим потоком на CPython, а
+    блокировка стоила бы дороже самой записи. Блокировка нужна только
+    при создании ряда для новой метки.
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str,
+                 label: Optional[str] = None) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[str]:
+        """Строки со значениями метрики."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Отрисовать метрику с заголовками HELP и TYPE."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик, по одному значению на метку."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str,
+                 label: Optional[str] = None) -> None:
+        super().__init__(name, documentation, label)
+        self._values: Dict[str, list] = {}
+
+    def _cell(self, label: str) -> list:
+        with self._lock:
+            return self._values.setdefault(label, [0.0])
+
+    def inc(self, amount: float = 1.0, label: str = '') -> None:
+        """Увеличить счётчик метки на amount."""
+        cell = self._values.get(label)
+        if cell is None:
+            cell = self._cell(label)
+        cell[0] += amount
+
+    def value(self, label: str = '') -> float:
+        """Текущее значение счётчика метки."""
+        cell = self._values.get(label)
+        return cell[0] if cell is not None else 0.0
+
+    def samples(self) -> List[str]:
+        """Строки со значениями по меткам."""
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f'{self.name}{_labels(self.label, label)} {cell[0]}'
+            for label, cell in values
+        ]
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и убывать."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        """Установить значение."""
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Увеличить значение на amount."""
+        self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Уменьшить значение на amount."""
+        self._value -= amount
+
+    def value(self) -> float:
+        """Текущее значение."""
+        return self._value
+
+    def samples(self) -> List[str]:
+        """Строка с текущим значением."""
+        return [f'{self.name} {self._value}']
+
+
+class Histogram(Metric):
+    """Распределение значений по фиксированным корзинам.
+
+    Запись значения стоит одного bisect и двух сложений, накопительные
+    суммы по корзинам считаются только при выгрузке.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str,
+                 label: Optional[str] = None,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, label)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[str, list] = {}
+
+    def series(self, label: str = '') -> list:
+        """Ряд метки: [счётчики по корзинам, сумма значений]."""
+        series = self._series.get(label)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(
+                    label, [[0] * (len(self.buckets) + 1), 0.0])
+        return series
+
+    def observe(self, value: float, label: str = '') -> None:
+        """Записать значение в корзину метки."""
+        series = self._series.get(label)
+        if series is None:
+            series = self.series(label)
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, label: str = '') -> int:
+        """Сколько значений записано для метки."""
+        series = self._series.get(label)
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> List[str]:
+        """Накопительные корзины, сумма и число значений по меткам."""
+        with self._lock:
+            series = {
+                label: (list(counts), total)
+                for label, (counts, total) in self._series.items()
+            }
+        lines = []
+        for label, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _labels(self.label, label, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _labels(self.label, label)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Collected(Metric):
+    """Значение, которое берётся из func в момент выгрузки.
+
+    Подходит для счётчиков, которые уже ведёт другой объект: на горячем
+    пути ничего дополнительно не записывается.
+    """
+
+    def __init__(self, name: str, documentation: str,
+                 func: Callable[[], float], kind: str = 'gauge') -> None:
+        super().__init__(name, documentation)
+        self.func = func
+        self.kind = kind
+
+    def samples(self) -> List[str]:
+        """Строка со значением func()."""
+        return [f'{self.name} {self.func()}']
+
+
+class Registry:
+    """Набор метрик, который отдаётся одной страницей."""
+
+    def __init__(self) -> None:
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Добавить метрику в выгрузку."""
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str,
+                label: Optional[str] = None) -> Counter:
+        """Создать и зарегистрировать счётчик."""
+        return self.register(Counter(name, documentation, label))
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        """Создать и зарегистрировать значение."""
+        return self.register(Gauge(name, documentation))
+
+    def histogram(self, name: str, documentation: str,
+                  label: Optional[str] = None,
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Создать и зарегистрировать гистограмму."""
+        return self.register(Histogram(name, documentation, label, buckets))
+
+    def collect(self, name: str, documentation: str,
+                func: Callable[[], float], kind: str = 'gauge') -> Collected:
+        """Зарегистрировать метрику, значение которой вернёт func."""
+        return self.register(Collected(name, documentation, func, kind))
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+def timed(histogram: Histogram, label: str,
+          errors: Optional[Counter] = None) -> Callable:
+    """Декоратор: записать длительность вызова и тип упавшего исключения.
+
+    Ряд гистограммы выбирается один раз при декорировании, поэтому
+    запись стоит двух вызовов perf_counter, одного bisect и двух
+    сложений.
+    """
+    def decorator(func: Callable) -> Callable:
+        series = histogram.series(label)
+        counts = series[0]
+        buckets = histogram.buckets
+        clock = time.perf_counter
+        bisect_left = bisect.bisect_left
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error:
+                elapsed = clock() - start
+                counts[bisect_left(buckets, elapsed)] += 1
+                series[1] += elapsed
+                if errors is not None:
+                    errors.inc(label=type(error).__name__)
+                raise
+            elapsed = clock() - start
+            counts[bisect_left(buckets, elapsed)] += 1
+            series[1] += elapsed
+            return result
+        return wrapper
+    return decorator
+
+
+def in_flight(gauge: Gauge) -> Callable:
+    """Декоратор: держать в gauge число вызовов, которые сейчас идут."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            gauge.inc()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                gauge.dec()
+        return wrapper
+    return decorator
+
+
+class LagMeter:
+    """Опоздание цикла: насколько позже плана он проснулся."""
+
+    def __init__(self, gauge: Gauge,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.gauge = gauge
+        self.clock = clock
+        self._planned: Optional[float] = None
+
+    def expect(self, delay: float) -> None:
+        """Запомнить, когда цикл должен проснуться."""
+        self._planned = self.clock() + delay
+
+    def wake(self) -> float:
+        """Записать опоздание относительно плана и вернуть его."""
+        if self._planned is None:
+            return 0.0
+        lag = max(0.0, self.clock() - self._planned)
+        self.gauge.set(lag)
+        self._planned = None
+        return lag
+
+
+def start_metrics_server(registry: Registry, port: int,
+                         host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Отдавать метрики на http://host:port/metrics в фоновом потоке."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True)
+    thread.start()
+    return server
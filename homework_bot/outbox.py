@@ -0,0 +1,295 @@
+"""Очередь исходящих сообщений в телеграм."""
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional
+
+from homework_bot.ratelimit import SendRateLimiter, retry_after
+
+
+@dataclass
+class Delivery:
+    """Сообщение, ожидающее отправки."""
+
+    chat_id: str
+    text: str
+    key: str
+    enqueued: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+    def to_dict(self) -> dict:
+        """Данные сообщения для сохранения до перезапуска."""
+        return {'chat_id': self.chat_id, 'text': self.text,
+                'key': self.key, 'attempts': self.attempts}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Delivery':
+        """Восстановить сообщение из сохранённых данных."""
+        return cls(data['chat_id'], data['text'], data['key'],
+                   attempts=data.get('attempts', 0))
+
+
+class OutboxStats:
+    """Счётчики доставки и задержка от постановки в очередь до отправки."""
+
+    def __init__(self) -> None:
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.duplicates = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record_delivery(self, latency: float) -> None:
+        """Учесть успешную доставку."""
+        self.delivered += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def latency_mean(self) -> float:
+        """Средняя задержка доставки в секундах."""
+        return self.latency_total / self.delivered if self.delivered else 0.0
+
+
+class DeliveryTracker:
+    """Результат доставки каждого сообщения в каждый чат."""
+
+    PENDING = 'pending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+
+    def __init__(self, remember: int = 10000) -> None:
+        self.remember = remember
+        self.per_chat: dict = defaultdict(Counter)
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, chat_id: str, key: str, status: str) -> None:
+        """Запомнить состояние доставки сообщения key в чат chat_id."""
+        with self._lock:
+            self._results[(chat_id, key)] = status
+            self._results.move_to_end((chat_id, key))
+            if len(self._results) > self.remember:
+                self._results.popitem(last=False)
+            if status != self.PENDING:
+                self.per_chat[chat_id][status] += 1
+
+    def status(self, chat_id: str, key: str) -> Optional[str]:
+        """Состояние доставки или None, если сообщение неизвестно."""
+        return self._results.get((chat_id, key))
+
+    def chats(self, key: str) -> dict:
+        """Состояние доставки сообщения key по всем чатам."""
+        with self._lock:
+            return {
+                chat_id: status
+                for (chat_id, item_key), status in self._results.items()
+                if item_key == key
+            }
+
+
+class Outbox:
+    """Ограниченная очередь сообщений, которую разбирает пул потоков.
+
+    Опрос API только кладёт сообщение в очередь и не ждёт телеграм.
+    Каждое сообщение несёт ключ идемпотентности: повторная постановка
+    того же ключа в тот же чат игнорируется. Неудачная отправка повторяется с
+    экспоненциальной паузой, а после всех попыток сообщение попадает
+    в dead_letters. При workers=0 сообщения отправляются сразу в put()
+    в вызывающем потоке: этот режим нужен только тестам.
+    При остановке drain() возвращает неотправленные сообщения, а
+    snapshot() и restore() переносят их и dead_letters через перезапуск.
+    Если задан limiter, каждая отправка ждёт его разрешения, а ответ
+    с retry_after ставит отправки на паузу и не тратит попытку.
+    """
+
+    def __init__(self, send: Callable[[str, str], None],
+                 maxsize: int = 1000, workers: int = 4, retries: int = 3,
+                 backoff: float = 1.0, put_timeout: float = 1.0,
+                 remember: int = 10000,
+                 limiter: Optional[SendRateLimiter] = None,
+                 tracker: Optional[DeliveryTracker] = None) -> None:
+        self.send = send
+        self.limiter = limiter
+        self.tracker = tracker or DeliveryTracker(remember)
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.put_timeout = put_timeout
+        self.remember = remember
+        self.stats = OutboxStats()
+        self.dead_letters: deque = deque(maxlen=maxsize)
+        self._unsent: deque = deque()
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._keys: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def depth(self) -> int:
+        """Сколько сообщений ждут отправки."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Запустить потоки отправки."""
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f'outbox-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _claim(self, chat_id: str, key: str) -> bool:
+        with self._lock:
+            if (chat_id, key) in self._keys:
+                self.stats.duplicates += 1
+                return False
+            self._keys[(chat_id, key)] = None
+            if len(self._keys) > self.remember:
+                self._keys.popitem(last=False)
+            return True
+
+    def put(self, chat_id: str, text: str,
+            key: Optional[str] = None) -> bool:
+        """Поставить сообщение в очередь. False для повторного ключа."""
+        if key is None:
+            key = hashlib.sha1(f'{chat_id}:{text}'.encode()).hexdigest()
+        if not self._claim(chat_id, key):
+            logging.debug('Сообщение %s уже отправлялось', key)
+            return False
+        delivery = Delivery(chat_id, text, key)
+        self.tracker.record(chat_id, key, DeliveryTracker.PENDING)
+        if not self.workers:
+            self._deliver(delivery)
+            return True
+        try:
+            self._queue.put(delivery, timeout=self.put_timeout)
+        except queue.Full:
+            logging.error('Очередь сообщений переполнена')
+            self.tracker.record(chat_id, key, DeliveryTracker.FAILED)
+            self.dead_letters.append(delivery)
+            return False
+        return True
+
+    def _work(self) -> None:
+        while True:
+            delivery = self._queue.get()
+            if delivery is None:
+                self._queue.task_done()
+                return
+            try:
+                if self._stopping.is_set():
+                    self._unsent.append(delivery)
+                else:
+                    self._deliver(delivery)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, delivery: Delivery) -> None:
+        while True:
+            delivery.attempts += 1
+            try:
+                if self.limiter is not None:
+                    self.limiter.acquire(delivery.chat_id)
+                self.send(delivery.chat_id, delivery.text)
+            except Exception as error:
+                pause = retry_after(error)
+                if pause is not None and self.limiter is not None:
+                    logging.warning(
+                        'Телеграм ограничил отправку на %s с', pause)
+                    self.limiter.pause(pause)
+                    delivery.attempts -= 1
+                    continue
+                if delivery.attempts > self.retries:
+                    self.stats.failed += 1
+                    self.tracker.record(
+                        delivery.chat_id, delivery.key,
+                        DeliveryTracker.FAILED)
+                    self.dead_letters.append(delivery)
+                    logging.error(
+                        'Сообщение не доставлено после %s попыток: %s',
+                        delivery.attempts, error)
+                    return
+                if self._stopping.wait(
+                        self.backoff * 2 ** (delivery.attempts - 1)):
+                    self._unsent.append(delivery)
+                    return
+                self.stats.retried += 1
+                continue
+            latency = time.monotonic() - delivery.enqueued
+            self.stats.record_delivery(latency)
+            self.tracker.record(
+                delivery.chat_id, delivery.key, DeliveryTracker.DELIVERED)
+            logging.debug(
+                'Сообщение доставлено за %.1f мс, в очереди %s',
+                latency * 1000, self.depth)
+            return
+
+    def join(self) -> None:
+        """Дождаться отправки всех сообщений из очереди."""
+        self._queue.join()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Отправить оставшиеся сообщения и остановить потоки."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def _take_queued(self) -> None:
+        while True:
+            try:
+                delivery = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if delivery is not None:
+                self._unsent.append(delivery)
+            self._queue.task_done()
+
+    def drain(self, timeout: float) -> List[Delivery]:
+        """Отправлять сообщения не дольше timeout и вернуть неотправленные.
+
+        По истечении timeout потоки перестают брать сообщения из очереди
+        и повторять неудачные отправки. Отправка, которая уже идёт,
+        не прерывается, но и не ожидается.
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            for _ in self._threads:
+                self._queue.put(
+                    None, timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Full:
+            pass
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._stopping.set()
+        self._take_queued()
+        for thread in self._threads:
+            if thread.is_alive():
+                self._queue.put_nowait(None)
+        self._threads.clear()
+        unsent = list(self._unsent)
+        self._unsent.clear()
+        return unsent
+
+    def snapshot(self, unsent: Iterable[Delivery] = ()) -> dict:
+        """Неотправленные сообщения и dead_letters для сохранения."""
+        return {
+            'pending': [delivery.to_dict() for delivery in unsent],
+            'dead': [delivery.to_dict() for delivery in self.dead_letters],
+        }
+
+    def restore(self, snapshot: dict) -> int:
+        """Вернуть сохранённые сообщения в очередь. Вернуть их число."""
+        for data in snapshot.get('dead', ()):
+            self.dead_letters.append(Delivery.from_dict(data))
+        restored = 0
+        for data in snapshot.get('pending', ()):
+            restored += self.put(data['chat_id'], data['text'], data['key'])
+        return restored
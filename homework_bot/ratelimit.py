@@ -0,0 +1,226 @@
+"""Ограничение частоты запросов алгоритмом token bucket."""
+import email.utils
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+EPSILON = 1e-9
+
+
+class RequestDeferred(RuntimeError):
+    """Запрос не отправлен сейчас и должен быть повторён через retry_after."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str],
+                      now: Callable[[], float] = time.time
+                      ) -> Optional[float]:
+    """Пауза в секундах из заголовка Retry-After: число или HTTP-дата."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment is None:
+        return None
+    return max(0.0, moment.timestamp() - now())
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Пауза, которую попросил сервер, из ошибки или её причины."""
+    while error is not None:
+        value = getattr(error, 'retry_after', None)
+        if value is not None:
+            return float(value)
+        error = error.__cause__
+    return None
+
+
+class TokenBucket:
+    """Корзина на capacity токенов, пополняемая со скоростью rate в секунду."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate,
+            )
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Сколько ждать до появления токена."""
+        self._refill(now)
+        if self.tokens >= 1 - EPSILON:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        """Забрать один токен."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def give_back(self, now: float) -> None:
+        """Вернуть токен, занятый под несостоявшееся действие."""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def is_full(self, now: float) -> bool:
+        """Корзина полна, и её состояние можно забыть."""
+        self._refill(now)
+        return self.tokens >= self.capacity - EPSILON
+
+
+class SendRateLimiter:
+    """Общая корзина на все отправки и отдельная корзина на каждый чат.
+
+    Корзина со скоростью rate и ёмкостью burst пропускает за любую
+    секунду до rate + burst сообщений. Значения по умолчанию держат
+    бота в пределах ограничений Telegram Bot API: 30 сообщений
+    в секунду на бота и в среднем одно сообщение в секунду в чат.
+    Ответ 429 с retry_after приостанавливает все отправки на эту паузу.
+    """
+
+    def __init__(self, global_rate: float = 29.0, global_burst: float = 1.0,
+                 chat_rate: float = 1.0, chat_burst: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 max_chats: int = 10000) -> None:
+        self.clock = clock
+        self.sleep = sleep
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self.throttled = 0
+        self._global = TokenBucket(global_rate, global_burst, clock())
+        self._chats: Dict[Hashable, TokenBucket] = {}
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _chat_bucket(self, chat_id: Hashable, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chats:
+                self._forget_idle(now)
+            bucket = TokenBucket(self.chat_rate, self.chat_burst, now)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _forget_idle(self, now: float) -> None:
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items()
+                        if bucket.is_full(now)]:
+            del self._chats[chat_id]
+
+    def acquire(self, chat_id: Hashable) -> float:
+        """Дождаться права на отправку в чат. Вернуть время ожидания."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                chat = self._chat_bucket(chat_id, now)
+                wait = max(
+                    self._paused_until - now,
+                    self._global.delay(now),
+                    chat.delay(now),
+                )
+                if wait <= 0:
+                    self._global.consume(now)
+                    chat.consume(now)
+                    return waited
+            self.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """Остановить все отправки на seconds секунд."""
+        with self._lock:
+            self.throttled += 1
+            self._paused_until = max(
+                self._paused_until, self.clock() + seconds)
+
+
+class RequestBudget:
+    """Общий бюджет запросов к API и отдельный бюджет на каждый токен.
+
+    В отличие от SendRateLimiter не ждёт, а сразу говорит, через сколько
+    секунд запрос можно будет сделать: опрос переносится в расписании,
+    и вместо него идут опросы других пользователей, у которых бюджет
+    есть. Ответ 429 или 503 с Retry-After приостанавливает все запросы,
+    потому что все пользователи ходят в API с одного адреса.
+    """
+
+    def __init__(self, global_rate: float = 10.0, global_burst: float = 10.0,
+                 token_rate: float = 1 / 30, token_burst: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 max_tokens: int = 100000) -> None:
+        self.clock = clock
+        self.token_rate = token_rate
+        self.token_burst = token_burst
+        self.max_tokens = max_tokens
+        self.deferred = 0
+        self.throttled = 0
+        self._global = TokenBucket(global_rate, global_burst, clock())
+        self._tokens: Dict[Hashable, TokenBucket] = {}
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _token_bucket(self, key: Hashable, now: float) -> TokenBucket:
+        bucket = self._tokens.get(key)
+        if bucket is None:
+            if len(self._tokens) >= self.max_tokens:
+                for idle in [idle for idle, bucket in self._tokens.items()
+                             if bucket.is_full(now)]:
+                    del self._tokens[idle]
+            bucket = TokenBucket(self.token_rate, self.token_burst, now)
+            self._tokens[key] = bucket
+        return bucket
+
+    def reserve(self, key: Hashable) -> float:
+        """Занять запрос для токена key. 0, если можно идти сейчас.
+
+        Иначе ничего не занимается и возвращается пауза до момента,
+        когда запрос будет разрешён.
+        """
+        with self._lock:
+            now = self.clock()
+            bucket = self._token_bucket(key, now)
+            wait = max(
+                self._paused_until - now,
+                self._global.delay(now),
+                bucket.delay(now),
+            )
+            if wait > 0:
+                self.deferred += 1
+                return wait
+            self._global.consume(now)
+            bucket.consume(now)
+            return 0.0
+
+    def refund(self, key: Hashable) -> None:
+        """Вернуть запрос токена key, который так и не был отправлен."""
+        with self._lock:
+            now = self.clock()
+            self._global.give_back(now)
+            bucket = self._tokens.get(key)
+            if bucket is not None:
+                bucket.give_back(now)
+
+    def pause(self, seconds: float) -> None:
+        """Не разрешать запросы seconds секунд."""
+        with self._lock:
+            self.throttled += 1
+            self._paused_until = max(
+                self._paused_until, self.clock() + seconds)
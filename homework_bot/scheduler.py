@@ -0,0 +1,99 @@
+"""Планировщик опросов пользователей по времени следующего запроса."""
+import heapq
+import itertools
+import random
+import time
+from typing import Callable, Hashable, Iterable, List, Optional
+
+
+class Scheduler:
+    """Куча дедлайнов: каждый пользователь хранится со временем опроса.
+
+    Добавление и извлечение стоят O(log n). Перепланирование не ищет
+    старую запись в куче: она помечается устаревшей и пропускается при
+    извлечении.
+    """
+
+    def __init__(self, jitter: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic,
+                 rng: Callable[[], float] = random.random) -> None:
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng
+        self._heap: list = []
+        self._entries: dict = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        """Сколько пользователей в расписании."""
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Есть ли пользователь в расписании."""
+        return key in self._entries
+
+    def schedule(self, key: Hashable, due: float) -> None:
+        """Назначить опрос пользователя на момент due."""
+        entry = next(self._counter)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, (due, entry, key))
+
+    def schedule_in(self, key: Hashable, interval: float) -> float:
+        """Назначить опрос через interval секунд с учётом разброса.
+
+        Вернуть назначенное время по часам clock.
+        """
+        spread = 1 + self.jitter * (2 * self.rng() - 1)
+        due = self.clock() + interval * spread
+        self.schedule(key, due)
+        return due
+
+    def schedule_after(self, key: Hashable, delay: float) -> float:
+        """Назначить опрос не раньше чем через delay секунд.
+
+        Разброс только увеличивает паузу, чтобы отложенные опросы
+        не пришли раньше срока и не собрались в один момент.
+        """
+        spread = 1 + self.jitter * self.rng()
+        due = self.clock() + delay * spread
+        self.schedule(key, due)
+        return due
+
+    def spread(self, keys: Iterable[Hashable], period: float) -> None:
+        """Равномерно распределить первые опросы по периоду."""
+        keys = list(keys)
+        if not keys:
+            return
+        now = self.clock()
+        step = period / len(keys)
+        for position, key in enumerate(keys):
+            self.schedule(key, now + step * (position + self.rng()))
+
+    def remove(self, key: Hashable) -> None:
+        """Убрать пользователя из расписания."""
+        self._entries.pop(key, None)
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap and self._entries.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[float]:
+        """Время ближайшего опроса или None, если расписание пусто."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None,
+                limit: Optional[int] = None) -> List[Hashable]:
+        """Извлечь пользователей, чей опрос уже наступил."""
+        if now is None:
+            now = self.clock()
+        due = []
+        while limit is None or len(due) < limit:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            del self._entries[key]
+            due.append(key)
+        return due
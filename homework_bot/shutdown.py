@@ -0,0 +1,71 @@
+"""Плавная остановка бота по SIGTERM."""
+import contextlib
+import signal
+import threading
+from typing import Callable, Iterable, List, Optional
+
+
+class GracefulExit(SystemExit):
+    """Сигнал остановки пришёл, пока бот ждал следующего цикла."""
+
+
+class Shutdown:
+    """Флаг остановки, который выставляют SIGTERM и SIGINT.
+
+    Обработчик сигнала только выставляет флаг и вызывает подписчиков,
+    поэтому начатый цикл опроса доходит до конца. Если сигнал пришёл,
+    пока бот ждёт внутри interruptible(), ожидание сразу прерывается
+    исключением GracefulExit. Повторный сигнал прерывает работу в любом
+    месте.
+    """
+
+    def __init__(self) -> None:
+        self.requested = False
+        self.signum: Optional[int] = None
+        self._callbacks: List[Callable[[], object]] = []
+        self._waiting = False
+        self._previous: dict = {}
+
+    def subscribe(self, callback: Callable[[], object]) -> None:
+        """Вызвать callback при первом запросе остановки."""
+        self._callbacks.append(callback)
+
+    def request(self, signum: Optional[int] = None, frame=None) -> None:
+        """Запросить остановку. Подходит как обработчик сигнала."""
+        repeated = self.requested
+        self.requested = True
+        self.signum = signum
+        if not repeated:
+            for callback in self._callbacks:
+                callback()
+        if repeated or self._waiting:
+            self._waiting = False
+            raise GracefulExit(0)
+
+    def install(self, signums: Optional[Iterable[int]] = None) -> bool:
+        """Поставить обработчик на сигналы, по умолчанию SIGTERM и SIGINT."""
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        if signums is None:
+            signums = (signal.SIGTERM, signal.SIGINT)
+        for signum in signums:
+            self._previous[signum] = signal.signal(signum, self.request)
+        return True
+
+    def uninstall(self) -> None:
+        """Вернуть обработчики сигналов, стоявшие до install()."""
+        while self._previous:
+            signum, handler = self._previous.popitem()
+            signal.signal(
+                signum, signal.SIG_DFL if handler is None else handler)
+
+    @contextlib.contextmanager
+    def interruptible(self):
+        """Контекст ожидания, которое сигнал остановки прерывает сразу."""
+        if self.requested:
+            raise GracefulExit(0)
+        self._waiting = True
+        try:
+            yield
+        finally:
+            self._waiting = False
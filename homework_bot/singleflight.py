@@ -0,0 +1,42 @@
+"""Склейка одновременных одинаковых запросов."""
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable
+
+
+class SingleFlight:
+    """Выполняет одновременные вызовы с одним ключом только один раз.
+
+    Первый вызов с ключом делает запрос, остальные ждут и получают тот
+    же результат или то же исключение. Результат общий для всех, поэтому
+    вызывающие не должны его изменять.
+    """
+
+    def __init__(self) -> None:
+        self.shared = 0
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable, *args):
+        """Вызвать func(*args) или дождаться такого же вызова."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
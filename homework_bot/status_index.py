@@ -0,0 +1,80 @@
+"""Индекс последних известных статусов домашек."""
+from collections import Counter
+from typing import Dict, ItemsView, Iterable, Iterator, Optional, Tuple
+
+
+def homework_key(homework: dict) -> str:
+    """Ключ домашки в индексе: id, а если его нет, то название."""
+    if homework.get('id') is not None:
+        return str(homework['id'])
+    return homework['homework_name']
+
+
+def event_key(homework: dict) -> str:
+    """Ключ перехода домашки в новый статус."""
+    return '{}:{}:{}'.format(
+        homework_key(homework), homework['status'],
+        homework.get('date_updated'))
+
+
+class StatusIndex:
+    """Хранит для каждой домашки только статус и время обновления."""
+
+    __slots__ = ('_seen', '_counts')
+
+    def __init__(self,
+                 seen: Optional[Dict[str, Tuple[str, str]]] = None) -> None:
+        self._seen: Dict[str, Tuple[str, Optional[str]]] = dict(seen or {})
+        self._counts = Counter(state[0] for state in self._seen.values())
+
+    def __len__(self) -> int:
+        """Сколько домашек в индексе."""
+        return len(self._seen)
+
+    def status(self, key: str) -> Optional[str]:
+        """Последний известный статус домашки."""
+        seen = self._seen.get(key)
+        return seen[0] if seen else None
+
+    def count(self, status: str) -> int:
+        """Сколько домашек сейчас в статусе status."""
+        return self._counts[status]
+
+    def items(self) -> ItemsView:
+        """Пары (домашка, (статус, время обновления)) без копирования."""
+        return self._seen.items()
+
+    def diff(self, homeworks: Iterable[dict]) -> Iterator[dict]:
+        """Вернуть домашки, у которых сменился статус, за один проход.
+
+        Домашка попадает в индекс, когда потребитель запросил следующее
+        событие. Повторно выдаётся только переход, после которого
+        потребитель прервал проход, например исключением. Бот ставит
+        сообщение в очередь отправки и сразу идёт дальше, поэтому
+        сообщение, которое очередь потом не смогла доставить и убрала
+        в dead letters, заново не выдаётся.
+        """
+        for homework in homeworks:
+            key = homework_key(homework)
+            state = (homework['status'], homework.get('date_updated'))
+            previous = self._seen.get(key)
+            if previous == state:
+                continue
+            yield homework
+            if previous is not None:
+                self._counts[previous[0]] -= 1
+            self._counts[state[0]] += 1
+            self._seen[key] = state
+
+    def seed(self, homeworks: Iterable[dict]) -> int:
+        """Запомнить статусы без выдачи событий. Вернуть число переходов."""
+        return sum(1 for _ in self.diff(homeworks))
+
+    def to_dict(self) -> dict:
+        """Данные индекса для сохранения в json."""
+        return {key: list(state) for key, state in self._seen.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'StatusIndex':
+        """Восстановить индекс из сохранённых данных."""
+        return cls({key: tuple(state) for key, state in data.items()})
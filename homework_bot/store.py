@@ -0,0 +1,198 @@
+"""Состояние бота в SQLite: курсоры, расписание, статусы и очередь."""
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from homework_bot.status_index import StatusIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenants (
+    key TEXT PRIMARY KEY,
+    cursor INTEGER,
+    next_due REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tenants_next_due ON tenants (next_due)
+    WHERE next_due IS NOT NULL;
+CREATE TABLE IF NOT EXISTS statuses (
+    tenant TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    status TEXT NOT NULL,
+    date_updated TEXT,
+    PRIMARY KEY (tenant, homework)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox (
+    position INTEGER PRIMARY KEY,
+    chat_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    key TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    dead INTEGER NOT NULL
+);
+"""
+UPSERT_CURSOR = (
+    'INSERT INTO tenants (key, cursor) VALUES (?, ?) '
+    'ON CONFLICT (key) DO UPDATE SET cursor = excluded.cursor'
+)
+UPSERT_DUE = (
+    'INSERT INTO tenants (key, next_due) VALUES (?, ?) '
+    'ON CONFLICT (key) DO UPDATE SET next_due = excluded.next_due'
+)
+UPSERT_STATUS = (
+    'INSERT INTO statuses (tenant, homework, status, date_updated) '
+    'VALUES (?, ?, ?, ?) ON CONFLICT (tenant, homework) DO UPDATE SET '
+    'status = excluded.status, date_updated = excluded.date_updated'
+)
+INSERT_OUTBOX = (
+    'INSERT INTO outbox (chat_id, text, key, attempts, dead) '
+    'VALUES (:chat_id, :text, :key, :attempts, :dead)'
+)
+SELECT_DUE = (
+    'SELECT key, next_due FROM tenants '
+    'WHERE next_due IS NOT NULL AND next_due <= ? '
+    'ORDER BY next_due LIMIT ?'
+)
+
+
+class SqliteStore:
+    """Состояние бота в базе SQLite с тем же интерфейсом, что Checkpoint.
+
+    База работает в режиме WAL: чтение не ждёт записи, а фиксация
+    транзакции не переписывает файл целиком. Изменения копятся в памяти
+    и записываются в save() одной транзакцией, по одному executemany на
+    таблицу. Для статусов пишутся только домашки, которые изменились со
+    времени прошлой записи индекса. Курсоры всех пользователей
+    читаются один раз при открытии базы.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+        self._cursors: Dict[str, int] = dict(self.connection.execute(
+            'SELECT key, cursor FROM tenants WHERE cursor IS NOT NULL'))
+        self._saved: Optional[
+            Dict[str, Dict[str, Tuple[str, Optional[str]]]]] = None
+        self._pending_cursors: Dict[str, int] = {}
+        self._pending_due: Dict[str, float] = {}
+        self._pending_statuses: List[tuple] = []
+        self._pending_outbox: Optional[dict] = None
+
+    def cursor(self, key: str, default: int) -> int:
+        """Курсор from_date пользователя или default, если его нет."""
+        return self._cursors.get(key, default)
+
+    def set_cursor(self, key: str, value: int) -> bool:
+        """Запомнить курсор. Вернуть True, если он изменился."""
+        if self._cursors.get(key) == value:
+            return False
+        self._cursors[key] = value
+        self._pending_cursors[key] = value
+        return True
+
+    def _load_statuses(self) -> None:
+        saved = self._saved = {}
+        rows = self.connection.execute(
+            'SELECT tenant, homework, status, date_updated FROM statuses')
+        for tenant, homework, status, date in rows:
+            tenant_saved = saved.get(tenant)
+            if tenant_saved is None:
+                tenant_saved = saved[tenant] = {}
+            tenant_saved[homework] = (status, date)
+
+    def index(self, key: str) -> StatusIndex:
+        """Сохранённый индекс статусов пользователя.
+
+        Статусы всех пользователей читаются одним запросом при первом
+        обращении: при запуске индексы нужны сразу всем.
+        """
+        if self._saved is None:
+            self._load_statuses()
+        return StatusIndex(self._saved.get(key))
+
+    def set_index(self, key: str, index: StatusIndex) -> bool:
+        """Запомнить изменившиеся статусы. Вернуть True, если они есть."""
+        if self._saved is None:
+            self._load_statuses()
+        saved = self._saved.setdefault(key, {})
+        items = index.items()
+        if saved.items() == items:
+            return False
+        changed = False
+        for homework, state in items:
+            if saved.get(homework) != state:
+                saved[homework] = state
+                self._pending_statuses.append((key, homework) + state)
+                changed = True
+        return changed
+
+    def set_next_due(self, key: str, when: float) -> None:
+        """Запомнить время следующего опроса пользователя (unix time)."""
+        self._pending_due[key] = when
+
+    def due(self, until: float,
+            limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Пользователи со временем опроса не позже until, ранние первыми.
+
+        Выборка идёт по индексу next_due и видит только записанное
+        в save() расписание.
+        """
+        return self.connection.execute(
+            SELECT_DUE, (until, -1 if limit is None else limit)).fetchall()
+
+    def outbox(self) -> dict:
+        """Сохранённые при остановке сообщения очереди отправки."""
+        snapshot: dict = {'pending': [], 'dead': []}
+        rows = self.connection.execute(
+            'SELECT chat_id, text, key, attempts, dead FROM outbox '
+            'ORDER BY position')
+        for chat_id, text, key, attempts, dead in rows:
+            snapshot['dead' if dead else 'pending'].append({
+                'chat_id': chat_id, 'text': text, 'key': key,
+                'attempts': attempts,
+            })
+        return snapshot
+
+    def set_outbox(self, snapshot: dict) -> None:
+        """Запомнить сообщения очереди отправки до следующей записи."""
+        self._pending_outbox = snapshot
+
+    def _outbox_rows(self) -> List[dict]:
+        return [
+            dict(data, dead=int(dead))
+            for dead, name in ((False, 'pending'), (True, 'dead'))
+            for data in self._pending_outbox.get(name, ())
+        ]
+
+    def advance(self, key: str, value: int) -> None:
+        """Сдвинуть курсор пользователя и сразу записать состояние."""
+        if self.set_cursor(key, value):
+            self.save()
+
+    def save(self) -> None:
+        """Записать накопленные изменения одной транзакцией."""
+        if not (self._pending_cursors or self._pending_due
+                or self._pending_statuses
+                or self._pending_outbox is not None):
+            return
+        with self.connection:
+            self.connection.execute('BEGIN')
+            self.connection.executemany(
+                UPSERT_CURSOR, self._pending_cursors.items())
+            self.connection.executemany(
+                UPSERT_DUE, self._pending_due.items())
+            self.connection.executemany(
+                UPSERT_STATUS, self._pending_statuses)
+            if self._pending_outbox is not None:
+                self.connection.execute('DELETE FROM outbox')
+                self.connection.executemany(
+                    INSERT_OUTBOX, self._outbox_rows())
+        self._pending_cursors.clear()
+        self._pending_due.clear()
+        self._pending_statuses.clear()
+        self._pending_outbox = None
+
+    def close(self) -> None:
+        """Записать накопленные изменения и закрыть базу."""
+        self.save()
+        self.connection.close()
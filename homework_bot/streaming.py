@@ -0,0 +1,141 @@
+"""Потоковый разбор ответа API с длинной историей домашек."""
+import codecs
+import json
+from typing import Iterable, Iterator, Optional, Union
+
+from homework_bot.validator import (SchemaKeyError, SchemaTypeError,
+                                    ValidationError, validate_homework)
+
+WHITESPACE = ' \t\n\r'
+
+
+class HomeworkStream:
+    """Отдаёт домашки из тела ответа по мере его чтения.
+
+    В памяти держится только непрочитанный хвост буфера и текущая
+    домашка, поэтому пик памяти не зависит от длины истории. Остальные
+    ключи ответа, например current_date, доступны после того, как
+    итератор исчерпан. Каждая домашка проверяется по схеме.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+        self.envelope: dict = {}
+        self.count = 0
+
+    @property
+    def current_date(self) -> Optional[int]:
+        """Значение current_date из ответа."""
+        return self.envelope.get('current_date')
+
+    def _read(self) -> bool:
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._decoder.decode(chunk)
+            if chunk:
+                self._buffer = self._buffer[self._position:] + chunk
+                self._position = 0
+                return True
+        self._buffer = self._buffer[self._position:] + self._decoder.decode(
+            b'', final=True)
+        self._position = 0
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        while True:
+            buffer = self._buffer
+            position = self._position
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            self._position = position
+            if position < len(buffer):
+                return buffer[position]
+            if not self._read():
+                raise ValueError('Ответ API оборвался')
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(
+                f'Ожидался символ {char!r} на позиции {self._position}')
+        self._position += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(
+                    self._buffer, self._position)
+            except ValueError:
+                if not self._read():
+                    raise
+                continue
+            if end < len(self._buffer) or self._eof:
+                self._position = end
+                return value
+            self._read()
+
+    def _homeworks(self) -> Iterator[dict]:
+        if self._peek() != '[':
+            error = SchemaTypeError(
+                f'ожидался list, получен {type(self._value()).__name__}')
+            error.path.append('homeworks')
+            raise error
+        self._position += 1
+        if self._peek() == ']':
+            self._position += 1
+            return
+        while True:
+            homework = self._value()
+            try:
+                validate_homework(homework)
+            except ValidationError as error:
+                error.path[:0] = ['homeworks', self.count]
+                raise
+            self.count += 1
+            yield homework
+            char = self._peek()
+            self._position += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError('Ожидался символ "," или "]"')
+
+    def __iter__(self) -> Iterator[dict]:
+        """Отдавать домашки по мере чтения ответа."""
+        if self._peek() != '{':
+            raise SchemaTypeError('ожидался dict')
+        self._position += 1
+        char = self._peek()
+        while char != '}':
+            key = self._value()
+            self._expect(':')
+            if key == 'homeworks':
+                self.envelope['homeworks'] = None
+                yield from self._homeworks()
+            else:
+                self.envelope[key] = self._value()
+            char = self._peek()
+            self._position += 1
+            if char not in ',}':
+                raise ValueError('Ожидался символ "," или "}"')
+        self._check_envelope()
+
+    def _check_envelope(self) -> None:
+        for key in ('homeworks', 'current_date'):
+            if key not in self.envelope:
+                error = SchemaKeyError('нет обязательного ключа')
+                error.path.append(key)
+                raise error
+        if not isinstance(self.current_date, int):
+            error = SchemaTypeError(
+                f'ожидался int, получен {type(self.current_date).__name__}')
+            error.path.append('current_date')
+            raise error
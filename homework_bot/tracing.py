@@ -0,0 +1,194 @@
+"""Замеры стадий цикла опроса и профилирование медленных циклов."""
+import contextlib
+import cProfile
+import functools
+import json
+import logging
+import os
+import random
+import signal
+import threading
+import time
+from typing import Callable, List, Optional
+
+NULL_SPAN = contextlib.nullcontext()
+
+
+class _Local(threading.local):
+    spans: Optional[list] = None
+    profiling = False
+
+
+class Span:
+    """Замер одной стадии внутри цикла."""
+
+    __slots__ = ('tracer', 'name', 'spans', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, spans: list) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.spans = spans
+
+    def __enter__(self) -> 'Span':
+        """Засечь начало стадии."""
+        self.start = self.tracer.clock()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Записать стадию и её длительность."""
+        self.spans.append((self.name, self.start,
+                           self.tracer.clock() - self.start))
+
+
+class Tracer:
+    """Пишет длительности стадий каждого цикла в файл трассировки.
+
+    Каждый цикл записывается одной json-строкой со списком стадий и их
+    смещений от начала цикла. Стадии, которые выполняются вне цикла или
+    в чужом потоке, не записываются. Профиль cProfile снимается, если
+    его заказал сигнал или предыдущий цикл оказался медленнее
+    slow_threshold, а также в доле sample_rate случайных циклов; такие
+    случайные профили сохраняются, только если цикл оказался медленным.
+
+    cProfile видит только поток цикла. Пока профиль снимается, profiling
+    в этом потоке равен True, и код, который обычно уходит в пул
+    потоков, например запросы Transport с дедлайном, должен выполняться
+    на месте, чтобы DNS, соединение и TLS попали в профиль.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 profile_dir: Optional[str] = None,
+                 slow_threshold: Optional[float] = None,
+                 sample_rate: float = 0.0,
+                 clock: Callable[[], float] = time.perf_counter,
+                 rng: Callable[[], float] = random.random) -> None:
+        self.path = path
+        self.profile_dir = profile_dir
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+        self.clock = clock
+        self.rng = rng
+        self.enabled = bool(path or profile_dir)
+        self.cycles = 0
+        self.profiles: List[str] = []
+        self._armed = False
+        self._local = _Local()
+
+    def arm(self, *args) -> None:
+        """Снять профиль следующего цикла. Подходит как обработчик сигнала."""
+        self._armed = True
+
+    def install_signal(self, signum: Optional[int] = None) -> bool:
+        """Профилировать следующий цикл по сигналу, по умолчанию SIGUSR1."""
+        if signum is None:
+            signum = getattr(signal, 'SIGUSR1', None)
+        if not self.enabled or not self.profile_dir or signum is None:
+            return False
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, self.arm)
+        return True
+
+    @property
+    def profiling(self) -> bool:
+        """Снимается ли сейчас профиль цикла в текущем потоке."""
+        return self._local.profiling
+
+    def span(self, name: str):
+        """Контекст для замера стадии текущего цикла."""
+        spans = self._local.spans
+        if spans is None:
+            return NULL_SPAN
+        return Span(self, name, spans)
+
+    def traced(self, name: str) -> Callable:
+        """Декоратор: замерять вызовы функции как стадию name."""
+        local = self._local
+
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                spans = local.spans
+                if spans is None:
+                    return func(*args, **kwargs)
+                with Span(self, name, spans):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _start_profiler(self, armed: bool) -> Optional[cProfile.Profile]:
+        if not self.profile_dir:
+            return None
+        if not armed and not (self.sample_rate
+                              and self.rng() < self.sample_rate):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    @contextlib.contextmanager
+    def cycle(self):
+        """Контекст одного цикла опроса."""
+        if not self.enabled:
+            yield
+            return
+        armed, self._armed = self._armed, False
+        started_at = time.time()
+        spans: list = []
+        self._local.spans = spans
+        profiler = self._start_profiler(armed)
+        self._local.profiling = profiler is not None
+        start = self.clock()
+        try:
+            yield
+        finally:
+            duration = self.clock() - start
+            if profiler is not None:
+                profiler.disable()
+            self._local.spans = None
+            self._local.profiling = False
+            self.cycles += 1
+            self._finish(started_at, start, duration, spans, profiler, armed)
+
+    def _finish(self, started_at: float, start: float, duration: float,
+                spans: list, profiler: Optional[cProfile.Profile],
+                armed: bool) -> None:
+        slow = (self.slow_threshold is not None
+                and duration >= self.slow_threshold)
+        if slow:
+            logging.warning('Медленный цикл опроса: %.3f с', duration)
+        if profiler is not None and (armed or slow):
+            self._dump(profiler, started_at)
+        elif slow and self.profile_dir:
+            self._armed = True
+        if self.path:
+            self._write({
+                'cycle': self.cycles,
+                'time': started_at,
+                'duration': duration,
+                'slow': slow,
+                'spans': [
+                    {'name': name, 'offset': offset - start,
+                     'duration': length}
+                    for name, offset, length in spans
+                ],
+            })
+
+    def _dump(self, profiler: cProfile.Profile, started_at: float) -> None:
+        path = os.path.join(
+            self.profile_dir, f'cycle-{self.cycles}-{int(started_at)}.prof')
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError as error:
+            logging.error('Не удалось сохранить профиль %s: %s', path, error)
+            return
+        self.profiles.append(path)
+        logging.info('Профиль цикла сохранён в %s', path)
+
+    def _write(self, record: dict) -> None:
+        try:
+            with open(self.path, 'a', encoding='UTF-8') as file:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as error:
+            logging.error('Не удалось записать трассировку: %s', error)
@@ -0,0 +1,230 @@
+"""HTTP-транспорт для запросов к API Практикума."""
+import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Callable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class TransportStats:
+    """Время ответа на запросы, прошедшие через транспорт.
+
+    Кроме среднего хранится окно последних window замеров, по которому
+    считаются квантили для хеджирования. Счётчики hedged и hedge_wins
+    показывают, сколько раз отправлялся второй запрос и сколько раз он
+    ответил первым, deadline_exceeded — сколько запросов не уложились
+    в общий дедлайн.
+    """
+
+    def __init__(self, window: int = 256) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+        self._recent: deque = deque(maxlen=window)
+        self._sorted: List[float] = []
+        self._stale = 0
+
+    def record(self, elapsed: float) -> None:
+        """Учесть время одного запроса."""
+        if self.first is None:
+            self.first = elapsed
+        self.count += 1
+        self.total += elapsed
+        self.last = elapsed
+        self._recent.append(elapsed)
+        self._stale += 1
+
+    @property
+    def mean(self) -> float:
+        """Среднее время запроса в секундах."""
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """Квантиль q времени ответа по окну или None, если замеров мало.
+
+        Окно сортируется заново не чаще раза в 16 замеров.
+        """
+        if len(self._recent) < min_samples:
+            return None
+        if self._stale >= 16 or not self._sorted:
+            self._sorted = sorted(self._recent)
+            self._stale = 0
+        index = min(len(self._sorted) - 1, int(q * len(self._sorted)))
+        return self._sorted[index]
+
+
+def _close_response(future: Future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    future.result().close()
+
+
+class Transport:
+    """Выполняет GET-запросы с таймаутами, сжатием и пулом соединений.
+
+    Без пула каждый запрос идёт через `requests.get` и открывает новое
+    соединение. С пулом запросы переиспользуют keep-alive соединения
+    общей сессии, и TCP/TLS рукопожатие платится один раз на соединение.
+
+    Таймауты соединения и чтения ограничивают каждую операцию с сокетом,
+    а deadline — весь запрос до получения заголовков: по его истечении
+    вызывающий получает requests.Timeout, не дожидаясь зависшего сокета.
+    С hedge=True, если ответа нет дольше квантиля hedge_quantile
+    последних запросов (или hedge_after секунд), отправляется второй
+    такой же запрос, и берётся тот ответ, что пришёл первым. Если задан
+    allow_hedge, второй запрос отправляется, только когда
+    allow_hedge(headers) разрешает его, например бюджет запросов токена.
+
+    Запросы с дедлайном или хеджированием выполняются в пуле потоков.
+    Если inline() возвращает True, запрос идёт в вызывающем потоке без
+    дедлайна и второго запроса: так профилировщик, который видит только
+    свой поток, получает DNS, соединение и TLS.
+    """
+
+    def __init__(self, pool_size: int = 0, keepalive: bool = True,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 compression: bool = True,
+                 deadline: Optional[float] = None,
+                 hedge: bool = False,
+                 hedge_after: Optional[float] = None,
+                 hedge_quantile: float = 0.95,
+                 workers: int = 32,
+                 allow_hedge: Optional[Callable[[dict], bool]] = None,
+                 inline: Optional[Callable[[], bool]] = None) -> None:
+        self.keepalive = keepalive
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.workers = workers
+        self.allow_hedge = allow_hedge
+        self.inline = inline
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.headers = {
+            'Accept-Encoding': 'gzip, deflate' if compression else 'identity',
+        }
+        if not keepalive:
+            self.headers['Connection'] = 'close'
+        self.session: Optional[requests.Session] = None
+        self.stats = TransportStats()
+        if pool_size:
+            self.open_pool(pool_size)
+
+    def open_pool(self, pool_size: int) -> None:
+        """Создать общую сессию с пулом на pool_size соединений."""
+        self.close()
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self.headers)
+        self.session = session
+
+    def get(self, url: str, headers: dict, params: dict,
+            stream: bool = False):
+        """Выполнить GET-запрос и учесть его время.
+
+        При stream=True тело не скачивается сразу, а читается через
+        iter_content, и учитывается время до получения заголовков.
+        """
+        if ((self.deadline is None and not self.hedge)
+                or (self.inline is not None and self.inline())):
+            return self._attempt(url, headers, params, stream)
+        return self._bounded(url, headers, params, stream)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Через сколько секунд отправлять второй запрос, None — не слать."""
+        if not self.hedge:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        return self.stats.quantile(self.hedge_quantile)
+
+    def _submit(self, *args) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='transport')
+        return self._executor.submit(self._attempt, *args)
+
+    def _bounded(self, url: str, headers: dict, params: dict, stream: bool):
+        started = time.monotonic()
+        deadline = started + self.deadline if self.deadline else None
+        hedge_at = self.hedge_delay()
+        if hedge_at is not None:
+            hedge_at += started
+        attempts = [self._submit(url, headers, params, stream)]
+        hedge: Optional[Future] = None
+        error: Optional[BaseException] = None
+        while attempts:
+            wake = deadline
+            if hedge is None and hedge_at is not None:
+                wake = hedge_at if wake is None else min(wake, hedge_at)
+            timeout = None if wake is None else max(
+                0.0, wake - time.monotonic())
+            done, _ = wait_futures(
+                attempts, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                attempts.remove(future)
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is hedge:
+                    self.stats.hedge_wins += 1
+                self._abandon(attempts)
+                return future.result()
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                self._abandon(attempts)
+                self.stats.deadline_exceeded += 1
+                raise requests.exceptions.Timeout(
+                    f'Запрос не уложился в {self.deadline:.0f} с')
+            if (attempts and hedge is None and hedge_at is not None
+                    and now >= hedge_at):
+                if (self.allow_hedge is not None
+                        and not self.allow_hedge(headers)):
+                    hedge_at = None
+                    continue
+                self.stats.hedged += 1
+                hedge = self._submit(url, headers, params, stream)
+                attempts.append(hedge)
+        raise error
+
+    @staticmethod
+    def _abandon(attempts: List[Future]) -> None:
+        for future in attempts:
+            future.add_done_callback(_close_response)
+
+    def _attempt(self, url: str, headers: dict, params: dict,
+                 stream: bool = False):
+        getter = self.session.get if self.session else requests.get
+        started = time.perf_counter()
+        try:
+            return getter(
+                url,
+                headers={**self.headers, **headers},
+                params=params,
+                timeout=self.timeout,
+                stream=stream,
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.record(elapsed)
+            logging.debug('Ответ API получен за %.1f мс', elapsed * 1000)
+
+    def close(self) -> None:
+        """Закрыть соединения пула и потоки отложенных запросов."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
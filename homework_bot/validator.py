@@ -0,0 +1,159 @@
+"""Проверка ответов API по схеме, скомпилированной один раз."""
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+class ValidationError(Exception):
+    """Ответ API не соответствует схеме."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.path: List[Any] = []
+
+    @property
+    def location(self) -> str:
+        """Путь до ошибки вида homeworks[3].status."""
+        location = ''
+        for part in self.path:
+            if isinstance(part, int):
+                location += f'[{part}]'
+            else:
+                location += f'.{part}' if location else str(part)
+        return location or '<ответ>'
+
+    def __str__(self) -> str:
+        """Путь до ошибки и её причина."""
+        return f'{self.location}: {self.reason}'
+
+
+class SchemaTypeError(ValidationError, TypeError):
+    """Значение неожиданного типа."""
+
+
+class SchemaKeyError(ValidationError, KeyError):
+    """Нет обязательного ключа."""
+
+    __str__ = ValidationError.__str__
+
+
+def _type_checker(expected: type) -> Callable[[Any], Any]:
+    type_name = expected.__name__
+
+    def check_type(value):
+        if not isinstance(value, expected):
+            raise SchemaTypeError(
+                f'ожидался {type_name}, получен {type(value).__name__}')
+        return value
+
+    return check_type
+
+
+def _mapping_checker(check_type: Callable, required: tuple,
+                     optional: tuple) -> Callable[[Any], Any]:
+    def check_mapping(value):
+        check_type(value)
+        for key, check in required:
+            if key not in value:
+                error = SchemaKeyError('нет обязательного ключа')
+                error.path.append(key)
+                raise error
+            try:
+                check(value[key])
+            except ValidationError as error:
+                error.path.insert(0, key)
+                raise
+        for key, check in optional:
+            if value.get(key) is None:
+                continue
+            try:
+                check(value[key])
+            except ValidationError as error:
+                error.path.insert(0, key)
+                raise
+        return value
+
+    return check_mapping
+
+
+def _list_checker(check_type: Callable,
+                  items: Callable) -> Callable[[Any], Any]:
+    def check_list(value):
+        check_type(value)
+        for position, item in enumerate(value):
+            try:
+                items(item)
+            except ValidationError as error:
+                error.path.insert(0, position)
+                raise
+        return value
+
+    return check_list
+
+
+def compile_schema(schema: dict) -> Callable[[Any], Any]:
+    """Собрать функцию проверки по описанию схемы.
+
+    Схема - словарь с ключами type, required и optional (словари
+    ключ -> схема) и items (схема элементов списка). Необязательный
+    ключ может отсутствовать или быть равен None. Вся работа со
+    схемой делается здесь, а проверка только обходит значение.
+    """
+    check_type = _type_checker(schema['type'])
+    required = tuple(
+        (key, compile_schema(sub))
+        for key, sub in schema.get('required', {}).items()
+    )
+    optional = tuple(
+        (key, compile_schema(sub))
+        for key, sub in schema.get('optional', {}).items()
+    )
+    if required or optional:
+        return _mapping_checker(check_type, required, optional)
+    if 'items' in schema:
+        return _list_checker(check_type, compile_schema(schema['items']))
+    return check_type
+
+
+HOMEWORK_SCHEMA = {
+    'type': dict,
+    'required': {
+        'homework_name': {'type': str},
+        'status': {'type': str},
+    },
+    'optional': {
+        'id': {'type': int},
+        'date_updated': {'type': str},
+    },
+}
+RESPONSE_SCHEMA = {
+    'type': dict,
+    'required': {
+        'homeworks': {'type': list, 'items': HOMEWORK_SCHEMA},
+        'current_date': {'type': int},
+    },
+}
+
+validate_homework = compile_schema(HOMEWORK_SCHEMA)
+_validate_response = compile_schema(RESPONSE_SCHEMA)
+
+
+def validate_response(response: Any) -> list:
+    """Проверить ответ целиком за один проход. Вернуть список домашек."""
+    return _validate_response(response)['homeworks']
+
+
+def validate_many(
+    responses: Iterable[Any],
+) -> List[Tuple[Optional[list], Optional[ValidationError]]]:
+    """Проверить пачку ответов разных пользователей.
+
+    Ошибка одного ответа не прерывает проверку остальных: для каждого
+    возвращается пара (домашки, None) или (None, ошибка).
+    """
+    results = []
+    for response in responses:
+        try:
+            results.append((validate_response(response), None))
+        except ValidationError as error:
+            results.append((None, error))
+    return results
@@ -0,0 +1,110 @@
+"""Шаблоны сообщений о смене статуса домашки для разных языков."""
+import functools
+from typing import Dict, Iterable, List, Optional, Tuple
+
+NAME = '{name}'
+VERDICT = '{verdict}'
+STATUS = '{status}'
+
+
+class UnknownStatusError(KeyError):
+    """Для статуса нет вердикта, и запасной вердикт не задан."""
+
+    def __str__(self) -> str:
+        """Сообщение с неизвестным статусом."""
+        return f'Неизвестный статус работы: {self.args[0]}'
+
+
+def compile_template(template: str, status: str,
+                     verdict: str) -> Tuple[str, str]:
+    """Разбить шаблон на текст до и после названия домашки.
+
+    Вердикт и статус подставляются один раз, при рендере остаётся
+    склеить три строки. Фигурные скобки в названии домашки не
+    разбираются как поля шаблона.
+    """
+    head, _, tail = template.partition(NAME)
+    verdict = verdict.replace(STATUS, status)
+    return (
+        head.replace(VERDICT, verdict).replace(STATUS, status),
+        tail.replace(VERDICT, verdict).replace(STATUS, status),
+    )
+
+
+class VerdictRegistry:
+    """Скомпилированные шаблоны вердиктов по языкам.
+
+    Шаблон каждого языка разбирается при регистрации, готовые сообщения
+    запоминаются по (название, статус, язык). Для неизвестного статуса
+    используется fallback, если он задан, иначе UnknownStatusError.
+    """
+
+    def __init__(self, default_locale: str = 'ru',
+                 fallback: Optional[str] = None,
+                 cache_size: int = 4096) -> None:
+        self.default_locale = default_locale
+        self.fallback = fallback
+        self._templates: Dict[str, str] = {}
+        self._compiled: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self.render = functools.lru_cache(maxsize=cache_size)(self._render)
+
+    def register(self, locale: str, template: str,
+                 verdicts: Dict[str, str]) -> None:
+        """Добавить или заменить шаблон и вердикты языка."""
+        self._templates[locale] = template
+        self._compiled[locale] = {
+            status: compile_template(template, status, verdict)
+            for status, verdict in verdicts.items()
+        }
+        self.render.cache_clear()
+
+    def locales(self) -> List[str]:
+        """Зарегистрированные языки."""
+        return list(self._compiled)
+
+    def statuses(self, locale: Optional[str] = None) -> List[str]:
+        """Статусы, для которых у языка есть вердикт."""
+        return list(self._compiled[self._locale(locale)])
+
+    def _locale(self, locale: Optional[str]) -> str:
+        if locale in self._compiled:
+            return locale
+        return self.default_locale
+
+    def _parts(self, status: str, locale: str) -> Tuple[str, str]:
+        parts = self._compiled[locale].get(status)
+        if parts is not None:
+            return parts
+        if self.fallback is None:
+            raise UnknownStatusError(status)
+        return compile_template(self._templates[locale], status,
+                                self.fallback)
+
+    def _render(self, name: str, status: str,
+                locale: Optional[str] = None) -> str:
+        compiled = self._compiled.get(locale)
+        if compiled is None:
+            locale = self.default_locale
+            compiled = self._compiled[locale]
+        parts = compiled.get(status)
+        if parts is None:
+            parts = self._parts(status, locale)
+        return parts[0] + name + parts[1]
+
+    def render_many(self, homeworks: Iterable[dict],
+                    locale: Optional[str] = None) -> List[str]:
+        """Отрисовать сообщения для пачки домашек одного языка.
+
+        Язык и шаблоны статусов ищутся один раз на пачку, а не на каждую
+        домашку. Домашка без названия или статуса вызывает KeyError.
+        """
+        locale = self._locale(locale)
+        parts: Dict[str, Tuple[str, str]] = {}
+        messages = []
+        for homework in homeworks:
+            status = homework['status']
+            if status not in parts:
+                parts[status] = self._parts(status, locale)
+            head, tail = parts[status]
+            messages.append(head + homework['homework_name'] + tail)
+        return messages
@@ -29,3 +29,30 @@ def random_message():
         letters = string.ascii_letters
         return ''.join(random.choice(letters) for _ in range(string_length))
     return random_string()
+
+
+@pytest.fixture(autouse=True)
+def state_file(tmp_path, monkeypatch):
+    import homework
+    path = str(tmp_path / 'homework_state.json')
+    monkeypatch.setattr(homework, 'STATE_FILE', path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def breaker(monkeypatch):
+    import homework
+    from homework_bot.breaker import CircuitBreaker
+    fresh = CircuitBreaker(failure_threshold=homework.BREAKER_THRESHOLD)
+    monkeypatch.setattr(homework, 'BREAKER', fresh)
+    return fresh
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch):
+    import homework
+    from homework_bot.ratelimit import RequestBudget
+    fresh = RequestBudget(global_rate=1e6, global_burst=1e6,
+                          token_rate=1e6, token_burst=1e6)
+    monkeypatch.setattr(homework, 'BUDGET', fresh)
+    return fresh
@@ -0,0 +1,51 @@
+from homework_bot.adaptive import AdaptiveInterval
+from homework_bot.status_index import StatusIndex
+
+
+class TestAdaptiveInterval:
+    def make_policy(self, **kwargs):
+        return AdaptiveInterval(base=600, fast=60, max_interval=3600,
+                                **kwargs)
+
+    def test_idle_backs_off_exponentially(self):
+        policy = self.make_policy()
+        intervals = [policy.next_interval(False, False) for _ in range(5)]
+        assert intervals == [600, 1200, 2400, 3600, 3600], (
+            'В простое интервал должен расти до максимального.'
+        )
+
+    def test_long_idle_does_not_overflow(self):
+        policy = self.make_policy()
+        for _ in range(2000):
+            interval = policy.next_interval(False, False)
+        assert interval == 3600, (
+            'После долгого простоя интервал должен оставаться максимальным.'
+        )
+
+    def test_reviewing_polls_fast_and_resets_backoff(self):
+        policy = self.make_policy()
+        policy.next_interval(False, False)
+        policy.next_interval(False, False)
+        assert policy.next_interval(True, True) == 60
+        assert policy.next_interval(False, True) == 600
+        assert policy.next_interval(False, False) == 600
+
+    def test_daily_budget_limits_interval(self):
+        policy = self.make_policy(daily_budget=240)
+        assert policy.next_interval(True, False) == 360
+
+    def test_saved_calls(self):
+        policy = self.make_policy()
+        for _ in range(4):
+            policy.next_interval(False, False)
+        assert policy.saved_calls(600) == (600 + 1200 + 2400 + 3600) / 600 - 4
+
+    def test_index_counts_statuses(self):
+        index = StatusIndex()
+        list(index.diff([{'id': 1, 'homework_name': 'a',
+                          'status': 'reviewing'}]))
+        assert index.count('reviewing') == 1
+        list(index.diff([{'id': 1, 'homework_name': 'a',
+                          'status': 'approved'}]))
+        assert index.count('reviewing') == 0
+        assert index.count('approved') == 1
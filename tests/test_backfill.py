@@ -0,0 +1,113 @@
+import json
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.checkpoint import Checkpoint
+from homework_bot.engine import Tenant
+from homework_bot.ratelimit import RequestBudget, RequestDeferred
+
+
+def history(token):
+    return {
+        'homeworks': [
+            {'id': 1, 'homework_name': f'{token} hw1', 'status': 'approved'},
+            {'id': 2, 'homework_name': f'{token} hw2', 'status': 'rejected'},
+        ],
+        'current_date': 5000,
+    }
+
+
+class StreamedResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.raw = json.dumps(data).encode()
+
+    def iter_content(self, chunk_size):
+        return (self.raw[index:index + 16]
+                for index in range(0, len(self.raw), 16))
+
+    def json(self):
+        return json.loads(self.raw)
+
+
+@pytest.fixture
+def practicum(monkeypatch):
+    def mock_get(url, **kwargs):
+        token = kwargs['headers']['Authorization'].split()[1]
+        if token == 'broken':
+            return utils.MockResponseGET(http_status=500)
+        return StreamedResponse(history(token))
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    monkeypatch.setattr(requests.Session, 'get',
+                        lambda session, url, **kwargs: mock_get(url, **kwargs))
+
+
+class TestBackfill:
+    def test_backfill_writes_indexes_and_cursors(
+            self, monkeypatch, tmp_path, state_file, practicum,
+            homework_module):
+        tenants_file = tmp_path / 'tenants.json'
+        tenants_file.write_text(json.dumps([
+            {'token': f'token{index}', 'chat_id': index}
+            for index in range(5)
+        ] + [{'token': 'broken', 'chat_id': 99}]))
+        monkeypatch.setattr(homework_module, 'TENANTS_FILE',
+                            str(tenants_file))
+        monkeypatch.setattr(homework_module, 'BACKFILL_CHUNK', 2)
+
+        def no_bot(*args, **kwargs):
+            raise AssertionError('Выгрузка истории не должна писать в чаты.')
+
+        monkeypatch.setattr(telegram, 'Bot', no_bot)
+        homework_module.backfill()
+        checkpoint = Checkpoint(state_file)
+        for index in range(5):
+            key = Tenant(f'token{index}', []).key
+            assert checkpoint.cursor(key, 0) == 5000
+            assert checkpoint.index(key).status('2') == 'rejected'
+        assert checkpoint.cursor(Tenant('broken', []).key, 0) == 0, (
+            'Курсор пользователя с ошибкой выгрузки не должен меняться.'
+        )
+
+    def test_backfill_is_charged_to_budget(self, monkeypatch, practicum,
+                                           homework_module):
+        budget = RequestBudget(global_rate=1e6, global_burst=1e6,
+                               token_rate=1e-6, token_burst=1)
+        monkeypatch.setattr(homework_module, 'BUDGET', budget)
+        tenant = Tenant('token1', [])
+        homework_module.backfill_tenant(tenant)
+        assert tenant.index.status('2') == 'rejected'
+        with pytest.raises(RequestDeferred):
+            homework_module.stream_api_answer(tenant.headers, 0)
+        assert budget.deferred == 1, (
+            'Выгрузка истории должна тратить бюджет запросов токена.'
+        )
+
+    def test_main_does_not_resend_backfilled_history(
+            self, monkeypatch, practicum, homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        monkeypatch.setattr(homework_module, 'TENANTS_FILE', None)
+        homework_module.backfill()
+
+        def stop(secs):
+            raise utils.BreakInfiniteLoop('break')
+
+        sent = []
+        monkeypatch.setattr(time, 'sleep', stop)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        monkeypatch.setattr(homework_module, 'send_message',
+                            lambda bot, message: sent.append(message))
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert sent == [], (
+            'После выгрузки истории старые статусы не должны приходить '
+            'в чат.'
+        )
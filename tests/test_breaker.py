@@ -0,0 +1,127 @@
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.breaker import (CircuitBreaker, CircuitOpenError,
+                                  UpstreamUnavailable)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def failing():
+    raise UpstreamUnavailable('503')
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+        for _ in range(3):
+            with pytest.raises(UpstreamUnavailable):
+                breaker.call(failing)
+        assert breaker.state == breaker.OPEN
+        calls = []
+        with pytest.raises(CircuitOpenError):
+            breaker.call(calls.append, 1)
+        assert calls == [], 'Разомкнутый автомат не должен делать запрос.'
+        assert breaker.rejected == 1
+
+    def test_half_open_single_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10,
+                                 clock=clock)
+        with pytest.raises(UpstreamUnavailable):
+            breaker.call(failing)
+        clock.now = 10
+        assert breaker.allow()
+        assert breaker.state == breaker.HALF_OPEN
+        assert not breaker.allow(), 'Пробный запрос должен быть один.'
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.call(failing)
+        assert error.value.retry_after == 10, (
+            'Во время пробного запроса остальные должны ждать, а не '
+            'перепланироваться без паузы.'
+        )
+        breaker.record_success()
+        assert breaker.state == breaker.CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_backs_off(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10,
+                                 max_reset_timeout=25, clock=clock)
+        with pytest.raises(UpstreamUnavailable):
+            breaker.call(failing)
+        for expected in (20, 25, 25):
+            clock.now += breaker.retry_in()
+            with pytest.raises(UpstreamUnavailable):
+                breaker.call(failing)
+            assert breaker.retry_in() == expected
+
+    def test_other_errors_keep_circuit_closed(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        def unauthorized():
+            raise RuntimeError('401')
+
+        for _ in range(5):
+            with pytest.raises(UpstreamUnavailable):
+                breaker.call(failing)
+            with pytest.raises(RuntimeError):
+                breaker.call(unauthorized)
+        assert breaker.state == breaker.CLOSED
+
+    def test_main_stops_calling_api_when_open(self, monkeypatch, breaker,
+                                              homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        calls = []
+        cycles = []
+
+        def mock_get(*args, **kwargs):
+            calls.append(1)
+            return utils.MockResponseGET(random_timestamp=1000,
+                                         http_status=503)
+
+        def sleep(secs):
+            cycles.append(secs)
+            if len(cycles) == 10:
+                raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(time, 'sleep', sleep)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        monkeypatch.setattr(homework_module, 'send_message',
+                            lambda bot, message: None)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert len(calls) == breaker.failure_threshold
+        assert breaker.state == breaker.OPEN
+
+    def test_engine_skips_polls_while_open(self):
+        import asyncio
+
+        from homework_bot.engine import PollingEngine, Tenant
+        from homework_bot.errorstorm import ErrorStorm
+
+        def fetch(headers, timestamp):
+            raise CircuitOpenError('open', 30)
+
+        errors = ErrorStorm()
+        engine = PollingEngine(fetch=fetch, check=lambda r: r,
+                               render=str, errors=errors)
+        try:
+            asyncio.run(engine.poll_all([Tenant('t1', ['1'])]))
+        finally:
+            engine.close()
+        assert (engine.skipped, engine.failed) == (1, 0)
+        assert errors.active() == {}
@@ -0,0 +1,62 @@
+import os
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.checkpoint import Checkpoint, tenant_key
+
+
+class TestCheckpoint:
+    def test_cursor_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'state.json')
+        checkpoint = Checkpoint(path)
+        assert checkpoint.cursor('key', 42) == 42
+        checkpoint.advance('key', 100)
+        assert Checkpoint(path).cursor('key', 42) == 100, (
+            'Курсор должен восстанавливаться после перезапуска.'
+        )
+        assert os.listdir(tmp_path) == ['state.json'], (
+            'После записи не должно оставаться временных файлов.'
+        )
+
+    def test_broken_file_is_ignored(self, tmp_path):
+        path = tmp_path / 'state.json'
+        path.write_text('{not json')
+        assert Checkpoint(str(path)).state == {}
+
+    def test_tenant_key_hides_token(self):
+        key = tenant_key('secret-token')
+        assert 'secret' not in key
+        assert key == tenant_key('secret-token')
+
+    def test_main_resumes_from_saved_cursor(self, monkeypatch, state_file,
+                                            homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        Checkpoint(state_file).advance(tenant_key('sometoken'), 1000)
+        requested = []
+
+        def mock_get(url, **kwargs):
+            requested.append(kwargs['params']['from_date'])
+            return utils.MockResponseGET(random_timestamp=2000)
+
+        def stop(secs):
+            raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(time, 'sleep', stop)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert requested == [1000], (
+            'После перезапуска запрос должен начинаться с сохранённого '
+            'курсора.'
+        )
+        assert Checkpoint(state_file).cursor(
+            tenant_key('sometoken'), 0) == 2000, (
+            'Курсор должен сдвигаться на `current_date` из ответа.'
+        )
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.coalesce import Coalescer, join_messages
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCoalesce:
+    def test_join_respects_limit(self):
+        texts = ['a' * 40, 'b' * 40, 'c' * 40]
+        messages = join_messages(texts, limit=100)
+        assert messages == ['a' * 40 + '\n\n' + 'b' * 40, 'c' * 40]
+        assert all(len(message) <= 100 for message in messages)
+
+    def test_join_splits_oversized_text(self):
+        messages = join_messages(['x' * 250], limit=100)
+        assert [len(message) for message in messages] == [100, 100, 50]
+
+    def test_window_merges_messages_per_chat(self):
+        clock = FakeClock()
+        sent = []
+        coalescer = Coalescer(
+            lambda chat_id, text, key: sent.append((chat_id, text)),
+            window=2, clock=clock)
+        coalescer.add('1', 'first')
+        coalescer.add('2', 'other chat')
+        clock.now = 1
+        coalescer.add('1', 'second')
+        coalescer.flush_due()
+        assert sent == [], 'До закрытия окна сообщения не отправляются.'
+        clock.now = 2
+        coalescer.flush_due()
+        assert sorted(sent) == [
+            ('1', 'first\n\nsecond'),
+            ('2', 'other chat'),
+        ], 'Уведомления одного чата должны уйти одним сообщением.'
+        assert coalescer.merged == 1
+
+    def test_same_batch_gets_same_key(self):
+        keys = []
+        coalescer = Coalescer(lambda chat_id, text, key: keys.append(key))
+        for _ in range(2):
+            coalescer.add('1', 'first', key='a')
+            coalescer.add('1', 'second', key='b')
+            coalescer.flush_all()
+        assert keys[0] == keys[1], (
+            'Повтор той же пачки должен иметь тот же ключ идемпотентности.'
+        )
+
+    def test_main_sends_one_message_per_cycle(self, monkeypatch,
+                                              homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        data = {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+                {'id': 2, 'homework_name': 'hw2', 'status': 'rejected'},
+            ],
+            'current_date': 1000,
+        }
+
+        def mock_get(*args, **kwargs):
+            response = utils.MockResponseGET(random_timestamp=1000)
+            response.json = lambda: data
+            return response
+
+        def stop(secs):
+            raise utils.BreakInfiniteLoop('break')
+
+        sent = []
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(time, 'sleep', stop)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        monkeypatch.setattr(homework_module, 'send_message',
+                            lambda bot, message: sent.append(message))
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert len(sent) == 1
+        assert '"hw1"' in sent[0] and '"hw2"' in sent[0]
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from homework_bot.checkpoint import Checkpoint
+from homework_bot.engine import PollingEngine, Tenant
+
+
+def make_engine(responses, sent, concurrency=10):
+    def fetch(headers, timestamp):
+        token = headers['Authorization'].split()[1]
+        response = responses[token]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def check(response):
+        return response['homeworks']
+
+    def render(homework):
+        return f'{homework["homework_name"]}: {homework["status"]}'
+
+    def notify(chat_id, message, key=None):
+        sent.append((chat_id, message))
+
+    return PollingEngine(fetch, check, render, notify, concurrency)
+
+
+class TestPollingEngine:
+    HOMEWORK = {'homework_name': 'hw123', 'status': 'approved'}
+
+    def test_poll_all_notifies_each_tenant(self):
+        responses = {
+            'first': {'homeworks': [self.HOMEWORK], 'current_date': 1},
+            'second': {'homeworks': [], 'current_date': 1},
+        }
+        sent = []
+        engine = make_engine(responses, sent)
+        tenants = [Tenant('first', ['1']), Tenant('second', ['2'])]
+        count = asyncio.run(engine.poll_all(tenants))
+        engine.close()
+        assert count == 1
+        assert sent == [('1', 'hw123: approved')], (
+            'Сообщение должно уйти только в чат пользователя с изменениями.'
+        )
+        assert engine.polled == 2
+
+    def test_unchanged_homework_is_not_sent_twice(self):
+        responses = {
+            'first': {'homeworks': [self.HOMEWORK], 'current_date': 1},
+        }
+        sent = []
+        engine = make_engine(responses, sent)
+        tenants = [Tenant('first', ['1'])]
+        asyncio.run(engine.poll_all(tenants))
+        asyncio.run(engine.poll_all(tenants))
+        engine.close()
+        assert len(sent) == 1
+
+    def test_render_error_keeps_earlier_messages(self):
+        first = {'id': 1, 'homework_name': 'first', 'status': 'approved'}
+        second = {'id': 2, 'homework_name': 'second', 'status': 'weird'}
+        responses = {
+            'first': {'homeworks': [first, second], 'current_date': 500},
+        }
+        sent = []
+
+        def render(homework):
+            if homework['status'] == 'weird':
+                raise KeyError(homework['status'])
+            return f'{homework["homework_name"]}: {homework["status"]}'
+
+        engine = make_engine(responses, sent)
+        engine.render = render
+        tenant = Tenant('first', ['1'], timestamp=100)
+        asyncio.run(engine.poll_all([tenant]))
+        assert sent == [('1', 'first: approved')], (
+            'Сообщения, готовые до сбоя рендера, должны уйти.'
+        )
+        assert (engine.failed, tenant.timestamp) == (1, 100)
+        responses['first']['homeworks'][1] = dict(second, status='approved')
+        asyncio.run(engine.poll_all([tenant]))
+        engine.close()
+        assert sent == [('1', 'first: approved'), ('1', 'second: approved')]
+
+    def test_failed_tenant_does_not_stop_others(self):
+        responses = {
+            'broken': RuntimeError('500'),
+            'first': {'homeworks': [self.HOMEWORK], 'current_date': 1},
+        }
+        sent = []
+        engine = make_engine(responses, sent)
+        tenants = [Tenant('broken', ['0']), Tenant('first', ['1'])]
+        asyncio.run(engine.poll_all(tenants))
+        engine.close()
+        assert engine.failed == 1
+        assert sent == [('1', 'hw123: approved')]
+
+    def test_concurrency_is_bounded(self):
+        active = []
+        peak = []
+
+        def fetch(headers, timestamp):
+            active.append(1)
+            peak.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+            return {'homeworks': [], 'current_date': 1}
+
+        engine = PollingEngine(
+            fetch, lambda r: r['homeworks'], str, concurrency=3)
+        tenants = [Tenant(str(index), [str(index)]) for index in range(12)]
+        asyncio.run(engine.poll_all(tenants))
+        engine.close()
+        assert max(peak) <= 3, (
+            'Число одновременных запросов должно быть ограничено.'
+        )
+
+    def test_cursors_are_advanced_and_saved(self, tmp_path):
+        responses = {
+            'first': {'homeworks': [], 'current_date': 500},
+        }
+        checkpoint = Checkpoint(str(tmp_path / 'state.json'))
+        engine = make_engine(responses, [])
+        engine.checkpoint = checkpoint
+        tenant = Tenant('first', ['1'], timestamp=100)
+        asyncio.run(engine.poll_all([tenant]))
+        engine.close()
+        assert tenant.timestamp == 500
+        restored = Checkpoint(str(tmp_path / 'state.json'))
+        assert restored.cursor(tenant.key, 0) == 500
+
+    def test_fan_out_renders_once(self):
+        responses = {
+            'first': {'homeworks': [self.HOMEWORK], 'current_date': 1},
+        }
+        sent = []
+        rendered = []
+        engine = make_engine(responses, sent)
+        render = engine.render
+        engine.render = lambda homework: rendered.append(1) or render(
+            homework)
+        tenant = Tenant('first', ['1', '2', '3'])
+        asyncio.run(engine.poll_all([tenant]))
+        engine.close()
+        assert len(rendered) == 1, 'Сообщение должно рендериться один раз.'
+        assert sorted(sent) == [
+            ('1', 'hw123: approved'),
+            ('2', 'hw123: approved'),
+            ('3', 'hw123: approved'),
+        ], 'Сообщение должно уйти во все чаты подписки.'
+
+    def test_slow_save_is_done_less_often(self, tmp_path):
+        saves = []
+
+        class SlowCheckpoint(Checkpoint):
+            def save(self):
+                saves.append(time.monotonic())
+                time.sleep(0.05)
+
+        responses = {'first': {'homeworks': [], 'current_date': 500}}
+        engine = make_engine(responses, [])
+        engine.checkpoint = SlowCheckpoint(str(tmp_path / 'state.json'))
+        engine.tick = 0.01
+        engine.flush_interval = 0.01
+        engine.flush_share = 0.1
+
+        async def scenario():
+            asyncio.get_running_loop().call_later(0.4, engine.stop)
+            await asyncio.wait_for(engine.run(
+                [Tenant('first', ['1'], timestamp=100)], 0.02), 5)
+
+        asyncio.run(scenario())
+        engine.close()
+        assert 1 <= len(saves) <= 2, (
+            'Пауза между записями должна расти вместе со временем записи.'
+        )
+
+
+class TestLoadTenants:
+    def test_chat_id_and_chat_ids(self, tmp_path, homework_module):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'token': 'first', 'chat_id': 1},
+            {'token': 'second', 'chat_ids': [2, '3']},
+        ]))
+        tenants = homework_module.load_tenants(str(path))
+        assert [list(tenant.chat_ids) for tenant in tenants] == [
+            ['1'], ['2', '3']]
+
+    def test_same_token_is_merged(self, tmp_path, homework_module):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'token': 'same', 'chat_id': 1},
+            {'token': 'other', 'chat_id': 3},
+            {'token': 'same', 'chat_ids': [2, 1]},
+        ]))
+        tenants = homework_module.load_tenants(str(path))
+        assert [(tenant.token, list(tenant.chat_ids))
+                for tenant in tenants] == [
+            ('same', ['1', '2']), ('other', ['3'])], (
+            'Чаты записей с одним токеном должны объединяться.'
+        )
+
+    @pytest.mark.parametrize('item', [
+        {'token': 'first'},
+        {'token': 'first', 'chat_id': None},
+        {'token': 'first', 'chat_ids': []},
+        {'token': 'first', 'chat_ids': '12345'},
+        {'token': 'first', 'chat_ids': 12345},
+    ])
+    def test_tenant_without_chat_is_rejected(self, tmp_path, item,
+                                             homework_module):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([{'token': 'ok', 'chat_id': 1}, item]))
+        with pytest.raises(ValueError, match='№1'):
+            homework_module.load_tenants(str(path))
@@ -0,0 +1,116 @@
+import logging
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.errorstorm import ErrorStorm
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestErrorStorm:
+    def test_repeats_are_counted_not_logged(self, caplog):
+        clock = FakeClock()
+        alerts = []
+        storm = ErrorStorm(alert=lambda text, key: alerts.append(text),
+                           window=60, clock=clock)
+        with caplog.at_level(logging.ERROR):
+            assert storm.failure(RuntimeError('down'))
+            for _ in range(9):
+                clock.now += 10
+                assert not storm.failure(RuntimeError('down'))
+        errors = [record for record in caplog.records
+                  if record.levelno == logging.ERROR]
+        assert len(errors) == 2, (
+            'Повторы сбоя должны попадать в лог раз в окно.'
+        )
+        assert 'повторов за 60 с: 6' in errors[1].getMessage()
+        assert alerts == ['Сбой в работе программы: down']
+        assert storm.active() == {'RuntimeError: down': 10}
+
+    def test_recovery_notice(self):
+        clock = FakeClock()
+        alerts = []
+        storm = ErrorStorm(alert=lambda text, key: alerts.append((text, key)),
+                           clock=clock)
+        assert not storm.success()
+        storm.failure(RuntimeError('down'))
+        clock.now = 600
+        storm.failure(RuntimeError('down'))
+        assert storm.success()
+        assert len(alerts) == 2
+        text, key = alerts[1]
+        assert 'восстановлена' in text and '2 раз за 10 мин' in text
+        assert key == alerts[0][1] + ':recovered'
+        assert storm.active() == {}
+        assert not storm.success()
+
+    def test_outage_ends_when_all_sources_recover(self):
+        storm = ErrorStorm()
+        storm.failure(ConnectionError('refused'), source='a')
+        storm.failure(ConnectionError('refused'), source='b')
+        assert not storm.success('a')
+        assert storm.failure(ValueError('bad'), source='c')
+        assert storm.success('b')
+        assert list(storm.active()) == ['ValueError: bad']
+
+    def test_alternating_errors_do_not_recover(self):
+        alerts = []
+        storm = ErrorStorm(alert=lambda text, key: alerts.append(text))
+        for _ in range(3):
+            storm.failure(RuntimeError('ReadTimeout'))
+            storm.failure(RuntimeError('Ошибка статуса 502'))
+        assert len(alerts) == 2, (
+            'Смена ошибки во время сбоя не должна давать новых сообщений '
+            'о восстановлении.'
+        )
+        assert not any('восстановлена' in text for text in alerts)
+        assert storm.success()
+        assert len(alerts) == 4
+        assert storm.active() == {}
+
+    def test_alert_errors_do_not_propagate(self):
+        def broken(text, key):
+            raise telegram.TelegramError('no network')
+
+        storm = ErrorStorm(alert=broken)
+        assert storm.failure(RuntimeError('down'))
+        assert storm.alerts == 0
+
+    def test_main_sends_one_alert_and_recovery(self, monkeypatch,
+                                               homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        calls = []
+
+        def mock_get(*args, **kwargs):
+            calls.append(1)
+            status = 500 if len(calls) <= 3 else 200
+            return utils.MockResponseGET(random_timestamp=1000,
+                                         http_status=status)
+
+        def sleep(secs):
+            if len(calls) >= 5:
+                raise utils.BreakInfiniteLoop('break')
+
+        sent = []
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(time, 'sleep', sleep)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        monkeypatch.setattr(homework_module, 'send_message',
+                            lambda bot, message: sent.append(message))
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert len(sent) == 2, sent
+        assert sent[0].startswith('Сбой в работе программы')
+        assert 'повторился 3 раз' in sent[1]
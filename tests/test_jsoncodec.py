@@ -0,0 +1,51 @@
+import pytest
+import requests
+
+from homework_bot import jsoncodec
+
+
+class CountingResponse:
+    status_code = 200
+
+    def __init__(self, content, data=None):
+        self.content = content
+        self.data = data or {}
+        self.json_calls = 0
+
+    def json(self):
+        self.json_calls += 1
+        return self.data
+
+
+class TestJsonCodec:
+    def test_body_is_decoded_once_from_content(self):
+        response = CountingResponse(b'{"homeworks": [], "current_date": 1}')
+        assert jsoncodec.decode_response(response) == {
+            'homeworks': [], 'current_date': 1}
+        assert response.json_calls == 0
+
+    def test_falls_back_to_json_method(self):
+        response = CountingResponse(None)
+        assert jsoncodec.decode_response(response) == {}
+        assert response.json_calls == 1
+
+    def test_stdlib_backend(self, monkeypatch):
+        monkeypatch.setattr(jsoncodec, 'orjson', None)
+        assert jsoncodec.loads(b'[1, 2]') == [1, 2]
+        with pytest.raises(ValueError):
+            jsoncodec.loads(b'{broken')
+
+    def test_get_api_answer_decodes_once(self, monkeypatch, homework_module):
+        response = CountingResponse(
+            None, {'homeworks': [], 'current_date': 1})
+        monkeypatch.setattr(requests, 'get', lambda *a, **k: response)
+        homework_module.get_api_answer(0)
+        assert response.json_calls == 1, (
+            'Тело ответа должно разбираться один раз.'
+        )
+
+    def test_invalid_json_raises(self, monkeypatch, homework_module):
+        response = CountingResponse(b'<html>502</html>')
+        monkeypatch.setattr(requests, 'get', lambda *a, **k: response)
+        with pytest.raises(RuntimeError):
+            homework_module.get_api_answer(0)
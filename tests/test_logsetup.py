@@ -0,0 +1,61 @@
+import logging
+from logging.handlers import RotatingFileHandler
+
+import requests
+
+import utils
+from homework_bot.logsetup import RedactingFilter, make_log_queue
+
+BOT_TOKEN = '1234567:AAHdqTcvCH1vGWJxfSeofSAs0K5PALDsaw'
+
+
+class TestLogSetup:
+    def test_redacts_secrets(self):
+        redacting = RedactingFilter(['s3cr3t', None])
+        text = redacting.redact(
+            "headers {'Authorization': 'OAuth y0_AgAAAA'} s3cr3t "
+            f'bot{BOT_TOKEN}/sendMessage')
+        assert 'y0_AgAAAA' not in text
+        assert 's3cr3t' not in text
+        assert BOT_TOKEN not in text
+        assert "'OAuth ***'" in text
+
+    def test_queue_writes_rotated_redacted_file(self, tmp_path):
+        path = tmp_path / 'bot.log'
+        file_handler = RotatingFileHandler(
+            path, encoding='UTF-8', maxBytes=200, backupCount=2)
+        handler, listener = make_log_queue([file_handler], secrets=['tok'])
+        logger = logging.getLogger('test_logsetup')
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+        listener.start()
+        try:
+            for number in range(20):
+                logger.info('Запрос %s с токеном %s', number, 'tok')
+        finally:
+            listener.stop()
+            logger.removeHandler(handler)
+            file_handler.close()
+        files = sorted(tmp_path.iterdir())
+        assert len(files) == 3, 'Лог должен ротироваться по размеру.'
+        text = path.read_text(encoding='UTF-8')
+        assert 'Запрос 19 с токеном ***' in text
+        assert 'tok' not in text
+
+    def test_fetch_statuses_does_not_log_headers(self, monkeypatch, caplog,
+                                                 homework_module):
+        def mock_get(*args, **kwargs):
+            return utils.MockResponseGET(random_timestamp=1000,
+                                         http_status=500)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        headers = {'Authorization': 'OAuth very-secret-token'}
+        with caplog.at_level(logging.DEBUG):
+            try:
+                homework_module.fetch_statuses(headers, 0)
+            except RuntimeError:
+                pass
+        assert caplog.records
+        assert all('very-secret-token' not in record.getMessage()
+                   for record in caplog.records)
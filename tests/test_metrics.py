@@ -0,0 +1,140 @@
+import time
+import urllib.request
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.metrics import (Gauge, LagMeter, Registry, in_flight,
+                                  start_metrics_server, timed)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMetrics:
+    def test_histogram_render(self):
+        registry = Registry()
+        histogram = registry.histogram(
+            'calls_seconds', 'Время.', label='function', buckets=(0.1, 1))
+        histogram.observe(0.05, 'a')
+        histogram.observe(0.5, 'a')
+        histogram.observe(5, 'a')
+        text = registry.render()
+        assert '# TYPE calls_seconds histogram' in text
+        assert 'calls_seconds_bucket{function="a",le="0.1"} 1' in text
+        assert 'calls_seconds_bucket{function="a",le="1"} 2' in text
+        assert 'calls_seconds_bucket{function="a",le="+Inf"} 3' in text
+        assert 'calls_seconds_sum{function="a"} 5.55' in text
+        assert 'calls_seconds_count{function="a"} 3' in text
+
+    def test_timed_counts_errors_by_type(self):
+        registry = Registry()
+        histogram = registry.histogram('seconds', 'Время.', label='function')
+        errors = registry.counter('errors_total', 'Ошибки.', label='type')
+
+        @timed(histogram, 'work', errors)
+        def work(fail):
+            if fail:
+                raise ValueError('boom')
+            return 'ok'
+
+        assert work(False) == 'ok'
+        with pytest.raises(ValueError):
+            work(True)
+        assert histogram.count('work') == 2
+        assert errors.value('ValueError') == 1
+        assert 'errors_total{type="ValueError"} 1.0' in registry.render()
+
+    def test_public_functions_accept_keywords(self, homework_module):
+        homework = {'homework_name': 'hw', 'status': 'approved'}
+        assert 'hw' in homework_module.parse_status(homework=homework)
+        assert homework_module.check_response(
+            response={'homeworks': [homework], 'current_date': 1}
+        ) == [homework], (
+            'Декораторы метрик не должны ломать вызов по имени аргумента.'
+        )
+
+    def test_in_flight_gauge(self):
+        gauge = Gauge('in_flight', 'Сейчас.')
+        seen = []
+
+        @in_flight(gauge)
+        def work():
+            seen.append(gauge.value())
+
+        work()
+        assert seen == [1]
+        assert gauge.value() == 0
+
+    def test_lag_meter(self):
+        clock = FakeClock()
+        gauge = Gauge('lag', 'Опоздание.')
+        meter = LagMeter(gauge, clock=clock)
+        assert meter.wake() == 0
+        meter.expect(10)
+        clock.now = 12.5
+        assert meter.wake() == 2.5
+        assert gauge.value() == 2.5
+
+    def test_server_exports_metrics(self):
+        registry = Registry()
+        registry.counter('polls_total', 'Опросы.').inc()
+        server = start_metrics_server(registry, 0)
+        try:
+            port = server.server_address[1]
+            url = f'http://127.0.0.1:{port}/metrics'
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode()
+            assert 'polls_total 1.0' in body
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_main_records_calls(self, monkeypatch, homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        before = {
+            name: homework_module.CALL_SECONDS.count(name)
+            for name in ('get_api_answer', 'check_response', 'parse_status')
+        }
+
+        data = {
+            'homeworks': [{'id': 1, 'homework_name': 'hw',
+                           'status': 'approved'}],
+            'current_date': 1000,
+        }
+
+        def mock_response(*args, **kwargs):
+            response = utils.MockResponseGET(random_timestamp=1000)
+            response.json = lambda: data
+            return response
+
+        def stop(secs):
+            raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(requests, 'get', mock_response)
+        monkeypatch.setattr(time, 'sleep', stop)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        monkeypatch.setattr(homework_module, 'send_message',
+                            lambda bot, message: None)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        for name, count in before.items():
+            assert homework_module.CALL_SECONDS.count(name) == count + 1, (
+                f'Вызов `{name}` должен попадать в метрики.'
+            )
+        assert homework_module.TENANTS_IN_FLIGHT.value() == 0
+        text = homework_module.METRICS.render()
+        for name in ('homework_bot_outbox_depth',
+                     'homework_bot_outbox_latency_mean_seconds'):
+            assert f'\n{name} ' in text, (
+                'Глубина очереди и задержка доставки должны быть в метриках.'
+            )
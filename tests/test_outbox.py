@@ -0,0 +1,171 @@
+import threading
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.outbox import Delivery, Outbox
+
+
+class TestOutbox:
+    def test_inline_delivery(self):
+        sent = []
+        outbox = Outbox(lambda chat_id, text: sent.append((chat_id, text)),
+                        workers=0)
+        assert outbox.put('1', 'hello')
+        assert sent == [('1', 'hello')]
+        assert outbox.stats.delivered == 1
+
+    def test_same_key_is_sent_once(self):
+        sent = []
+        outbox = Outbox(lambda chat_id, text: sent.append(text), workers=0)
+        outbox.put('1', 'first', key='event')
+        assert not outbox.put('1', 'second', key='event'), (
+            'Сообщение с тем же ключом не должно отправляться повторно.'
+        )
+        assert sent == ['first']
+        assert outbox.stats.duplicates == 1
+
+    def test_failed_send_is_retried(self):
+        attempts = []
+
+        def flaky_send(chat_id, text):
+            attempts.append(text)
+            if len(attempts) < 3:
+                raise RuntimeError('timeout')
+
+        outbox = Outbox(flaky_send, workers=0, retries=3, backoff=0)
+        outbox.put('1', 'hello')
+        assert len(attempts) == 3
+        assert outbox.stats.delivered == 1
+        assert outbox.stats.retried == 2
+
+    def test_exhausted_retries_go_to_dead_letters(self):
+        def broken_send(chat_id, text):
+            raise RuntimeError('down')
+
+        outbox = Outbox(broken_send, workers=0, retries=1, backoff=0)
+        outbox.put('1', 'hello')
+        assert outbox.stats.failed == 1
+        assert [item.text for item in outbox.dead_letters] == ['hello']
+
+    def test_put_does_not_wait_for_slow_telegram(self):
+        release = threading.Event()
+        sent = []
+
+        def slow_send(chat_id, text):
+            release.wait(5)
+            sent.append(text)
+
+        outbox = Outbox(slow_send, workers=2)
+        outbox.start()
+        started = time.monotonic()
+        for number in range(5):
+            outbox.put('1', f'message {number}')
+        assert time.monotonic() - started < 0.5, (
+            'Постановка в очередь не должна ждать отправки в телеграм.'
+        )
+        release.set()
+        outbox.join()
+        outbox.close()
+        assert sorted(sent) == [f'message {number}' for number in range(5)]
+        assert outbox.stats.delivered == 5
+        assert outbox.depth == 0
+
+    def test_same_key_goes_to_every_chat(self):
+        sent = []
+        outbox = Outbox(lambda chat_id, text: sent.append(chat_id),
+                        workers=0)
+        for chat_id in ('1', '2'):
+            outbox.put(chat_id, 'hello', key='event')
+        assert sent == ['1', '2']
+        assert outbox.tracker.chats('event') == {
+            '1': 'delivered',
+            '2': 'delivered',
+        }
+
+    def test_tracker_records_failures_per_chat(self):
+        def send(chat_id, text):
+            if chat_id == '2':
+                raise RuntimeError('blocked by user')
+
+        outbox = Outbox(send, workers=0, retries=0)
+        outbox.put('1', 'hello', key='event')
+        outbox.put('2', 'hello', key='event')
+        assert outbox.tracker.status('2', 'event') == 'failed'
+        assert outbox.tracker.per_chat['1']['delivered'] == 1
+        assert outbox.tracker.per_chat['2']['failed'] == 1
+
+    def test_drain_returns_unsent_messages(self):
+        release = threading.Event()
+        sent = []
+
+        def slow_send(chat_id, text):
+            release.wait(5)
+            sent.append(text)
+
+        outbox = Outbox(slow_send, workers=1)
+        outbox.start()
+        for number in range(3):
+            outbox.put('1', f'message {number}')
+        started = time.monotonic()
+        unsent = outbox.drain(timeout=0.1)
+        assert time.monotonic() - started < 1, (
+            'Остановка не должна ждать дольше timeout.'
+        )
+        release.set()
+        assert [item.text for item in unsent] == ['message 1', 'message 2']
+
+    def test_snapshot_survives_restart(self):
+        def broken_send(chat_id, text):
+            raise RuntimeError('down')
+
+        outbox = Outbox(broken_send, workers=0, retries=0, backoff=0)
+        outbox.put('1', 'lost', key='dead')
+        snapshot = outbox.snapshot([Delivery('2', 'pending', 'event')])
+        sent = []
+        restored = Outbox(lambda chat_id, text: sent.append((chat_id, text)),
+                          workers=0)
+        assert restored.restore(snapshot) == 1
+        assert sent == [('2', 'pending')]
+        assert [item.key for item in restored.dead_letters] == ['dead']
+        assert not restored.put('2', 'pending', key='event'), (
+            'Восстановленное сообщение не должно отправляться повторно.'
+        )
+
+    def test_main_does_not_wait_for_telegram(self, monkeypatch,
+                                             homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        release = threading.Event()
+        sent = []
+
+        class SlowBot(utils.MockTelegramBot):
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                release.wait(5)
+                sent.append(text)
+
+        def mock_get(url, **kwargs):
+            response = utils.MockResponseGET(random_timestamp=1000)
+            response.json = lambda: {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 1000,
+            }
+            return response
+
+        def stop(secs):
+            assert sent == [], (
+                'Цикл опроса не должен ждать отправки в телеграм.'
+            )
+            release.set()
+            raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(telegram, 'Bot', SlowBot)
+        monkeypatch.setattr(time, 'sleep', stop)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert len(sent) == 1, 'Сообщение должно уйти при остановке.'
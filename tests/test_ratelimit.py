@@ -0,0 +1,197 @@
+import asyncio
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.outbox import Outbox
+from homework_bot.ratelimit import (RequestBudget, RequestDeferred,
+                                    SendRateLimiter, TokenBucket,
+                                    parse_retry_after, retry_after)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimit:
+    def test_bucket_refills_with_rate(self):
+        bucket = TokenBucket(rate=2, capacity=2, now=0)
+        bucket.consume(0)
+        bucket.consume(0)
+        assert bucket.delay(0) == 0.5
+        assert bucket.delay(0.5) == 0
+
+    def test_per_chat_limit(self):
+        clock = FakeClock()
+        limiter = SendRateLimiter(global_burst=10, chat_rate=1,
+                                  chat_burst=1, clock=clock,
+                                  sleep=clock.sleep)
+        limiter.acquire('1')
+        limiter.acquire('2')
+        assert clock.now == 0, 'Разные чаты не должны ждать друг друга.'
+        limiter.acquire('1')
+        assert clock.now == 1, (
+            'Второе сообщение в тот же чат должно ждать пополнения корзины.'
+        )
+
+    def test_global_limit(self):
+        clock = FakeClock()
+        limiter = SendRateLimiter(global_rate=10, global_burst=1,
+                                  clock=clock, sleep=clock.sleep)
+        for chat_id in range(11):
+            limiter.acquire(chat_id)
+        assert abs(clock.now - 1.0) < 1e-9
+
+    def test_pause_holds_all_chats(self):
+        clock = FakeClock()
+        limiter = SendRateLimiter(clock=clock, sleep=clock.sleep)
+        limiter.pause(7)
+        limiter.acquire('1')
+        assert clock.now == 7
+        assert limiter.throttled == 1
+
+    def test_retry_after_is_found_in_cause(self):
+        try:
+            try:
+                raise telegram.error.RetryAfter(5)
+            except telegram.error.TelegramError as error:
+                raise RuntimeError('not sent') from error
+        except RuntimeError as error:
+            assert retry_after(error) == 5
+        assert retry_after(RuntimeError()) is None
+
+    def test_outbox_honours_retry_after(self):
+        clock = FakeClock()
+        limiter = SendRateLimiter(clock=clock, sleep=clock.sleep)
+        sent = []
+
+        def send(chat_id, text):
+            if not sent:
+                sent.append(None)
+                raise telegram.error.RetryAfter(3)
+            sent.append(text)
+
+        outbox = Outbox(send, workers=0, retries=0, limiter=limiter)
+        outbox.put('1', 'hello')
+        assert sent == [None, 'hello'], (
+            'После 429 сообщение должно быть отправлено повторно.'
+        )
+        assert clock.now >= 3
+        assert outbox.stats.failed == 0
+
+
+class TestRequestBudget:
+    def test_token_and_global_ceilings(self):
+        clock = FakeClock()
+        budget = RequestBudget(global_rate=1, global_burst=3,
+                               token_rate=0.1, token_burst=1, clock=clock)
+        assert budget.reserve('a') == 0
+        assert budget.reserve('a') == 10, (
+            'Второй запрос того же токена должен ждать пополнения корзины.'
+        )
+        assert budget.reserve('b') == 0
+        assert budget.reserve('c') == 0
+        assert budget.reserve('d') == 1, 'Общий бюджет исчерпан.'
+        assert budget.deferred == 2
+
+    def test_pause_defers_everyone(self):
+        clock = FakeClock()
+        budget = RequestBudget(clock=clock)
+        budget.pause(120)
+        assert budget.reserve('a') == 120
+        clock.now = 120
+        assert budget.reserve('a') == 0
+
+    def test_open_breaker_does_not_spend_budget(self, monkeypatch, breaker,
+                                                homework_module):
+        clock = FakeClock()
+        budget = RequestBudget(global_rate=1, global_burst=1,
+                               token_rate=0.1, token_burst=1, clock=clock)
+        monkeypatch.setattr(homework_module, 'BUDGET', budget)
+        for _ in range(homework_module.BREAKER_THRESHOLD):
+            breaker.record_failure()
+        with pytest.raises(RequestDeferred):
+            homework_module.budgeted_fetch({'Authorization': 'OAuth a'}, 0)
+        assert budget.reserve('OAuth a') == 0, (
+            'Запрос, не пропущенный автоматом, не должен тратить бюджет.'
+        )
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('120') == 120
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(
+            'Wed, 21 Oct 2015 07:28:00 GMT', now=lambda: 1445412420
+        ) == 60
+
+    def test_engine_reorders_deferred_polls(self):
+        clock = FakeClock()
+        budget = RequestBudget(global_rate=100, global_burst=100,
+                               token_rate=0.01, token_burst=1, clock=clock)
+        polled = []
+
+        def fetch(headers, timestamp):
+            wait = budget.reserve(headers['Authorization'])
+            if wait:
+                raise RequestDeferred('budget', wait)
+            polled.append(headers['Authorization'])
+            return {'homeworks': [], 'current_date': 1}
+
+        engine = PollingEngine(fetch=fetch, check=lambda r: r['homeworks'],
+                               render=str, jitter=0)
+        engine.scheduler.clock = clock
+        tenants = [Tenant('a', ['1']), Tenant('b', ['2'])]
+        try:
+            asyncio.run(engine._poll_scheduled(tenants[0], 600))
+            asyncio.run(engine._poll_scheduled(tenants[0], 600))
+            asyncio.run(engine._poll_scheduled(tenants[1], 600))
+        finally:
+            engine.close()
+        assert polled == ['OAuth a', 'OAuth b']
+        assert engine.skipped == 1
+        assert engine.scheduler.next_due() == 100, (
+            'Отложенный опрос должен встать в расписание на время паузы.'
+        )
+
+    def test_main_honours_retry_after(self, monkeypatch, homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        budget = RequestBudget()
+        monkeypatch.setattr(homework_module, 'BUDGET', budget)
+
+        def mock_get(*args, **kwargs):
+            response = utils.MockResponseGET(random_timestamp=1000,
+                                             http_status=429)
+            response.headers = {'Retry-After': '1200'}
+            return response
+
+        sleeps = []
+
+        def sleep(secs):
+            sleeps.append(secs)
+            raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(time, 'sleep', sleep)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        monkeypatch.setattr(homework_module, 'send_message',
+                            lambda bot, message: None)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        assert sleeps == [1200]
+        assert budget.throttled == 1
+        assert budget.reserve('OAuth other') > 1000, (
+            '429 должен приостанавливать запросы всех пользователей.'
+        )
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestScheduler:
+    def test_pop_due_in_deadline_order(self):
+        clock = FakeClock()
+        scheduler = Scheduler(clock=clock)
+        scheduler.schedule('c', 30)
+        scheduler.schedule('a', 10)
+        scheduler.schedule('b', 20)
+        clock.now = 25
+        assert scheduler.pop_due() == ['a', 'b']
+        assert scheduler.next_due() == 30
+        assert len(scheduler) == 1
+
+    def test_reschedule_replaces_old_deadline(self):
+        clock = FakeClock()
+        scheduler = Scheduler(clock=clock)
+        scheduler.schedule('a', 10)
+        scheduler.schedule('a', 50)
+        clock.now = 20
+        assert scheduler.pop_due() == [], (
+            'Устаревший дедлайн не должен запускать опрос.'
+        )
+        clock.now = 50
+        assert scheduler.pop_due() == ['a']
+        assert scheduler.pop_due() == []
+
+    def test_removed_key_is_not_dispatched(self):
+        scheduler = Scheduler(clock=FakeClock())
+        scheduler.schedule('a', 0)
+        scheduler.remove('a')
+        assert scheduler.pop_due() == []
+        assert scheduler.next_due() is None
+
+    def test_spread_distributes_evenly(self):
+        scheduler = Scheduler(clock=FakeClock(), rng=lambda: 0.5)
+        scheduler.spread(range(10), period=100)
+        deadlines = []
+        while (due := scheduler.next_due()) is not None:
+            deadlines.append(due)
+            scheduler.pop_due(now=due, limit=1)
+        assert deadlines == [5 + 10 * index for index in range(10)]
+
+    def test_schedule_in_applies_jitter(self):
+        clock = FakeClock()
+        scheduler = Scheduler(jitter=0.1, clock=clock, rng=lambda: 1.0)
+        scheduler.schedule_in('a', 100)
+        assert scheduler.next_due() == pytest.approx(110)
+
+    def test_engine_reschedules_polled_tenant(self):
+        engine = PollingEngine(
+            lambda headers, timestamp: {'homeworks': [], 'current_date': 1},
+            lambda response: response['homeworks'],
+            str,
+        )
+        tenant = Tenant('token', ['1'], interval=60)
+        tenants = {tenant.key: tenant}
+
+        async def dispatch():
+            engine.scheduler.schedule(tenant.key, 0)
+            engine.dispatch_due(tenants, period=600)
+            await asyncio.gather(*engine._tasks)
+
+        asyncio.run(dispatch())
+        engine.close()
+        assert engine.polled == 1
+        assert tenant.key in engine.scheduler
+        assert engine.scheduler.next_due() > engine.scheduler.clock() + 50
@@ -0,0 +1,107 @@
+import asyncio
+import signal
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.checkpoint import Checkpoint, tenant_key
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.shutdown import GracefulExit, Shutdown
+
+
+class TestShutdown:
+    def test_signal_interrupts_wait(self):
+        shutdown = Shutdown()
+        stopped = []
+        shutdown.subscribe(lambda: stopped.append(True))
+        assert shutdown.install([signal.SIGTERM])
+        try:
+            with pytest.raises(GracefulExit):
+                with shutdown.interruptible():
+                    signal.raise_signal(signal.SIGTERM)
+                    time.sleep(5)
+        finally:
+            shutdown.uninstall()
+        assert shutdown.requested
+        assert shutdown.signum == signal.SIGTERM
+        assert stopped == [True]
+        assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL, (
+            'После остановки должен вернуться прежний обработчик.'
+        )
+
+    def test_signal_does_not_interrupt_work(self):
+        shutdown = Shutdown()
+        shutdown.request(signal.SIGTERM)
+        assert shutdown.requested, (
+            'Первый сигнал вне ожидания только выставляет флаг.'
+        )
+        with pytest.raises(GracefulExit):
+            with shutdown.interruptible():
+                pass
+        with pytest.raises(GracefulExit):
+            shutdown.request(signal.SIGTERM)
+
+
+class TestGracefulStop:
+    HOMEWORK = {'id': 7, 'homework_name': 'hw', 'status': 'approved'}
+
+    def test_engine_saves_state_on_stop(self, tmp_path):
+        checkpoint = Checkpoint(str(tmp_path / 'state.json'))
+        engine = PollingEngine(
+            fetch=lambda headers, timestamp: {
+                'homeworks': [self.HOMEWORK], 'current_date': 500},
+            check=lambda response: response['homeworks'],
+            render=str,
+            checkpoint=checkpoint,
+        )
+        engine.tick = 0.01
+        tenant = Tenant('first', ['1'], timestamp=100)
+
+        async def scenario():
+            asyncio.get_running_loop().call_later(0.2, engine.stop)
+            await asyncio.wait_for(engine.run([tenant], 0.05), 5)
+
+        asyncio.run(scenario())
+        engine.close()
+        restored = Checkpoint(checkpoint.path)
+        assert restored.cursor(tenant.key, 0) == 500
+        assert restored.index(tenant.key).status('7') == 'approved'
+        assert restored.due(time.time() + 1), (
+            'Время следующего опроса должно сохраняться.'
+        )
+
+    def test_main_stops_on_sigterm_and_restores_outbox(
+            self, monkeypatch, state_file, homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        saved = Checkpoint(state_file)
+        saved.set_outbox({'pending': [
+            {'chat_id': '12345', 'text': 'unsent', 'key': 'event'}]})
+        saved.save()
+        sent = []
+
+        class Bot(utils.MockTelegramBot):
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                sent.append(text)
+
+        def mock_get(url, **kwargs):
+            return utils.MockResponseGET(random_timestamp=2000)
+
+        def sleep(secs):
+            signal.raise_signal(signal.SIGTERM)
+            raise AssertionError('SIGTERM должен прервать ожидание.')
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(telegram, 'Bot', Bot)
+        monkeypatch.setattr(time, 'sleep', sleep)
+        homework_module.main()
+        assert sent == ['unsent'], (
+            'Сохранённые сообщения должны отправляться после запуска.'
+        )
+        restored = Checkpoint(state_file)
+        assert restored.cursor(tenant_key('sometoken'), 0) == 2000
+        assert restored.outbox() == {'pending': [], 'dead': []}
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import requests
+
+import utils
+from homework_bot.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    def run_concurrently(self, flight, key, func, count=5):
+        results = []
+        errors = []
+
+        def call():
+            try:
+                results.append(flight.do(key, func))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_share_one_request(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'homeworks': []}
+
+        flight = SingleFlight()
+        results, _ = self.run_concurrently(flight, 'key', fetch)
+        assert len(calls) == 1, (
+            'Одновременные одинаковые запросы должны выполняться один раз.'
+        )
+        assert len(results) == 5
+        assert all(result is results[0] for result in results)
+        assert flight.shared == 4
+
+    def test_error_is_shared(self):
+        def fetch():
+            time.sleep(0.1)
+            raise RuntimeError('down')
+
+        results, errors = self.run_concurrently(
+            SingleFlight(), 'key', fetch, count=3)
+        assert results == []
+        assert len(errors) == 3
+
+    def test_sequential_calls_are_not_cached(self):
+        calls = []
+        flight = SingleFlight()
+        flight.do('key', calls.append, 1)
+        flight.do('key', calls.append, 2)
+        assert calls == [1, 2]
+
+    def test_get_api_answer_goes_through_single_flight(
+            self, monkeypatch, homework_module):
+        calls = []
+
+        def slow_get(*args, **kwargs):
+            calls.append(kwargs['params'])
+            time.sleep(0.1)
+            return utils.MockResponseGET(random_timestamp=1)
+
+        monkeypatch.setattr(requests, 'get', slow_get)
+        monkeypatch.setattr(homework_module, 'FLIGHTS', SingleFlight())
+        threads = [
+            threading.Thread(target=homework_module.get_api_answer,
+                             args=(0,))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert calls == [{'from_date': 0}], (
+            'Одновременные вызовы get_api_answer с одним from_date должны '
+            'делать один запрос к API.'
+        )
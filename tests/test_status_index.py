@@ -0,0 +1,55 @@
+from homework_bot.status_index import StatusIndex
+
+
+def homework(id, status, date='2020-02-13T14:40:57Z'):
+    return {'id': id, 'homework_name': f'hw{id}', 'status': status,
+            'date_updated': date}
+
+
+class TestStatusIndex:
+    def test_every_transition_is_emitted(self):
+        index = StatusIndex()
+        first = [homework(1, 'reviewing'), homework(2, 'reviewing')]
+        assert list(index.diff(first)) == first
+        second = [homework(1, 'approved'), homework(2, 'rejected'),
+                  homework(3, 'reviewing')]
+        assert list(index.diff(second)) == second, (
+            'Должны приходить все изменения из ответа, а не только первое.'
+        )
+
+    def test_unchanged_homeworks_are_skipped(self):
+        index = StatusIndex()
+        homeworks = [homework(1, 'approved'), homework(2, 'reviewing')]
+        list(index.diff(homeworks))
+        assert list(index.diff(homeworks)) == []
+        resubmitted = [homework(1, 'approved', '2020-03-01T10:00:00Z')]
+        assert list(index.diff(resubmitted)) == resubmitted
+
+    def test_failed_event_is_emitted_again(self):
+        index = StatusIndex()
+        homeworks = [homework(1, 'approved'), homework(2, 'rejected')]
+        events = index.diff(homeworks)
+        assert next(events) == homeworks[0]
+        assert list(index.diff(homeworks)) == homeworks, (
+            'Событие, на котором прервали проход, должно повториться.'
+        )
+
+    def test_index_is_serializable(self):
+        index = StatusIndex()
+        list(index.diff([homework(1, 'approved'),
+                         {'homework_name': 'hw', 'status': 'reviewing'}]))
+        restored = StatusIndex.from_dict(index.to_dict())
+        assert restored.status('1') == 'approved'
+        assert restored.status('hw') == 'reviewing'
+        assert len(restored) == 2
+
+    def test_null_id_falls_back_to_name(self):
+        index = StatusIndex()
+        index.seed([
+            {'id': None, 'homework_name': 'first', 'status': 'approved'},
+            {'id': None, 'homework_name': 'second', 'status': 'rejected'},
+        ])
+        assert (index.status('first'), index.status('second')) == (
+            'approved', 'rejected'), (
+            'Домашки без id должны различаться по названию.'
+        )
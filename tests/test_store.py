@@ -0,0 +1,173 @@
+import asyncio
+import sqlite3
+import time
+
+from homework_bot.checkpoint import Checkpoint
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.status_index import StatusIndex
+from homework_bot.store import SqliteStore
+
+
+def rows(path, query):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(query).fetchall()
+    finally:
+        connection.close()
+
+
+class TestSqliteStore:
+    def test_state_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        store = SqliteStore(path)
+        assert store.cursor('key', 42) == 42
+        index = StatusIndex()
+        index.seed([{'id': 1, 'homework_name': 'hw', 'status': 'approved',
+                     'date_updated': '2022-01-01'}])
+        store.set_index('key', index)
+        store.advance('key', 100)
+        store.close()
+        restored = SqliteStore(path)
+        assert restored.cursor('key', 42) == 100, (
+            'Курсор должен восстанавливаться после перезапуска.'
+        )
+        assert restored.index('key').status('1') == 'approved'
+        restored.close()
+
+    def test_database_is_in_wal_mode(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        SqliteStore(path).close()
+        assert rows(path, 'PRAGMA journal_mode') == [('wal',)]
+
+    def test_writes_wait_for_save(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        store = SqliteStore(path)
+        assert store.set_cursor('key', 100)
+        assert not store.set_cursor('key', 100), (
+            'Повторная запись того же курсора не считается изменением.'
+        )
+        store.set_next_due('key', 10.0)
+        assert rows(path, 'SELECT * FROM tenants') == [], (
+            'До save() изменения не должны попадать в базу.'
+        )
+        store.save()
+        assert rows(path, 'SELECT * FROM tenants') == [('key', 100, 10.0)]
+        store.close()
+
+    def test_only_changed_statuses_are_written(self, tmp_path):
+        store = SqliteStore(str(tmp_path / 'state.db'))
+        index = StatusIndex()
+        index.seed([
+            {'id': 1, 'homework_name': 'first', 'status': 'reviewing'},
+            {'id': 2, 'homework_name': 'second', 'status': 'approved'},
+        ])
+        assert store.set_index('key', index)
+        store.save()
+        assert not store.set_index('key', index)
+        index.seed([{'id': 1, 'homework_name': 'first',
+                     'status': 'approved'}])
+        assert store.set_index('key', index)
+        assert store._pending_statuses == [('key', '1', 'approved', None)]
+        store.close()
+
+    def test_due_uses_saved_schedule(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        store = SqliteStore(path)
+        for key, when in (('late', 30.0), ('early', 10.0), ('next', 90.0)):
+            store.set_next_due(key, when)
+        store.set_cursor('no-schedule', 1)
+        store.save()
+        assert store.due(50.0) == [('early', 10.0), ('late', 30.0)]
+        assert store.due(50.0, limit=1) == [('early', 10.0)]
+        plan = ' '.join(str(row) for row in rows(
+            path, 'EXPLAIN QUERY PLAN SELECT key FROM tenants '
+                  'WHERE next_due IS NOT NULL AND next_due <= 1 '
+                  'ORDER BY next_due'))
+        assert 'tenants_next_due' in plan, (
+            'Выборка пользователей к опросу должна идти по индексу.'
+        )
+        store.close()
+
+    def test_checkpoint_has_same_schedule(self, tmp_path):
+        checkpoint = Checkpoint(str(tmp_path / 'state.json'))
+        checkpoint.set_next_due('late', 30.0)
+        checkpoint.set_next_due('early', 10.0)
+        checkpoint.set_next_due('next', 90.0)
+        assert checkpoint.due(50.0) == [('early', 10.0), ('late', 30.0)]
+        assert checkpoint.due(50.0, limit=1) == [('early', 10.0)]
+
+
+class TestEngineWithStore:
+    HOMEWORK = {'id': 7, 'homework_name': 'hw', 'status': 'approved'}
+
+    def test_poll_all_saves_cursor_and_index(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        engine = PollingEngine(
+            fetch=lambda headers, timestamp: {
+                'homeworks': [self.HOMEWORK], 'current_date': 500},
+            check=lambda response: response['homeworks'],
+            render=str,
+            checkpoint=SqliteStore(path),
+        )
+        tenant = Tenant('first', ['1'], timestamp=100)
+        asyncio.run(engine.poll_all([tenant]))
+        engine.close()
+        engine.checkpoint.close()
+        restored = SqliteStore(path)
+        assert restored.cursor(tenant.key, 0) == 500
+        assert restored.index(tenant.key).status('7') == 'approved', (
+            'Индекс статусов должен сохраняться вместе с курсором.'
+        )
+        restored.close()
+
+    def test_resume_restores_saved_schedule(self, tmp_path):
+        store = SqliteStore(str(tmp_path / 'state.db'))
+        tenants = {
+            tenant.key: tenant
+            for tenant in (Tenant('soon', ['1']), Tenant('overdue', ['2']),
+                           Tenant('new', ['3']))
+        }
+        keys = {tenant.token: key for key, tenant in tenants.items()}
+        store.set_next_due(keys['soon'], time.time() + 100)
+        store.set_next_due(keys['overdue'], time.time() - 100)
+        store.save()
+        engine = PollingEngine(fetch=None, check=None, render=None,
+                               checkpoint=store)
+        start = engine.scheduler.clock()
+        assert engine.resume(tenants, 600) == 1
+        engine.close()
+        store.close()
+        assert len(engine.scheduler) == 3, (
+            'Пользователи без сохранённого времени тоже должны опрашиваться.'
+        )
+        due = dict(
+            (key, when) for when, _, key in engine.scheduler._heap)
+        assert 99 < due[keys['soon']] - start <= 100
+
+    def test_state_db_selects_store(self, tmp_path, monkeypatch,
+                                    homework_module):
+        monkeypatch.setattr(homework_module, 'STATE_DB',
+                            str(tmp_path / 'state.db'))
+        state = homework_module.open_state()
+        state.close()
+        assert isinstance(state, SqliteStore)
+        monkeypatch.setattr(homework_module, 'STATE_DB', None)
+        assert isinstance(homework_module.open_state(), Checkpoint)
+
+    def test_outbox_snapshot_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        store = SqliteStore(path)
+        snapshot = {
+            'pending': [{'chat_id': '1', 'text': 'first', 'key': 'a',
+                         'attempts': 0}],
+            'dead': [{'chat_id': '2', 'text': 'second', 'key': 'b',
+                      'attempts': 3}],
+        }
+        store.set_outbox(snapshot)
+        store.close()
+        restored = SqliteStore(path)
+        assert restored.outbox() == snapshot
+        restored.set_outbox({})
+        restored.save()
+        assert restored.outbox() == {'pending': [], 'dead': []}
+        restored.close()
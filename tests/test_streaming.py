@@ -0,0 +1,109 @@
+import json
+
+import pytest
+import requests
+
+from homework_bot.breaker import UpstreamUnavailable
+from homework_bot.status_index import StatusIndex
+from homework_bot.streaming import HomeworkStream
+from homework_bot.validator import SchemaKeyError, SchemaTypeError
+
+
+def chunked(data, size):
+    raw = json.dumps(data, ensure_ascii=False).encode()
+    return [raw[index:index + size] for index in range(0, len(raw), size)]
+
+
+HOMEWORKS = [
+    {'id': index, 'homework_name': f'работа {index}', 'status': 'approved'}
+    for index in range(20)
+]
+
+
+class TestHomeworkStream:
+    @pytest.mark.parametrize('size', [1, 2, 5, 64, 100000])
+    def test_items_are_yielded_for_any_chunking(self, size):
+        data = {'current_date': 1234567, 'homeworks': HOMEWORKS}
+        stream = HomeworkStream(chunked(data, size))
+        assert list(stream) == HOMEWORKS
+        assert stream.current_date == 1234567
+        assert stream.count == len(HOMEWORKS)
+
+    def test_items_are_lazy(self):
+        chunks = iter(chunked(
+            {'homeworks': HOMEWORKS, 'current_date': 1}, 16))
+        stream = iter(HomeworkStream(chunks))
+        assert next(stream) == HOMEWORKS[0]
+        assert next(chunks, None) is not None, (
+            'Первая домашка должна отдаваться до чтения всего ответа.'
+        )
+
+    def test_diff_consumes_stream(self):
+        data = {'homeworks': HOMEWORKS, 'current_date': 1}
+        index = StatusIndex()
+        events = list(index.diff(HomeworkStream(chunked(data, 7))))
+        assert events == HOMEWORKS
+        assert len(index) == len(HOMEWORKS)
+
+    def test_bad_item_has_path(self):
+        data = {'homeworks': HOMEWORKS[:2] + [{'status': 'approved'}],
+                'current_date': 1}
+        with pytest.raises(SchemaKeyError) as info:
+            list(HomeworkStream(chunked(data, 10)))
+        assert info.value.location == 'homeworks[2].homework_name'
+
+    def test_homeworks_not_list(self):
+        data = {'homeworks': {'status': 'approved'}, 'current_date': 1}
+        with pytest.raises(SchemaTypeError):
+            list(HomeworkStream(chunked(data, 10)))
+
+    def test_missing_current_date(self):
+        with pytest.raises(SchemaKeyError):
+            list(HomeworkStream(chunked({'homeworks': []}, 10)))
+
+    def test_truncated_body(self):
+        raw = json.dumps({'homeworks': HOMEWORKS}).encode()[:-20]
+        with pytest.raises(ValueError):
+            list(HomeworkStream([raw]))
+
+    def test_stream_api_answer(self, monkeypatch, homework_module):
+        data = {'homeworks': HOMEWORKS, 'current_date': 1}
+
+        class StreamedResponse:
+            status_code = 200
+
+            def iter_content(self, chunk_size):
+                return iter(chunked(data, 50))
+
+        calls = []
+
+        def mock_get(url, **kwargs):
+            calls.append(kwargs)
+            return StreamedResponse()
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        stream = homework_module.stream_api_answer(
+            {'Authorization': 'OAuth token'}, 0)
+        assert list(stream) == HOMEWORKS
+        assert calls[0]['stream'] is True
+
+    def test_stream_errors_are_upstream_errors(self, monkeypatch,
+                                               homework_module):
+        class FailedResponse:
+            status_code = 503
+            headers = {}
+
+            def close(self):
+                pass
+
+        def reset(url, **kwargs):
+            raise requests.exceptions.ConnectionError('reset')
+
+        headers = {'Authorization': 'OAuth token'}
+        monkeypatch.setattr(requests, 'get',
+                            lambda url, **kwargs: FailedResponse())
+        with pytest.raises(UpstreamUnavailable, match='503'):
+            homework_module.stream_api_answer(headers, 0)
+        monkeypatch.setattr(requests, 'get', reset)
+        with pytest.raises(UpstreamUnavailable, match='ConnectionError'):
+            homework_module.stream_api_answer(headers, 0)
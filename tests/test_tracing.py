@@ -0,0 +1,160 @@
+import json
+import os
+import signal
+import time
+
+import pytest
+import requests
+import telegram
+
+import utils
+from homework_bot.tracing import Tracer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def read_trace(path):
+    with open(path, encoding='UTF-8') as file:
+        return [json.loads(line) for line in file]
+
+
+class TestTracer:
+    def test_cycle_writes_spans(self, tmp_path):
+        clock = FakeClock()
+        path = tmp_path / 'trace.jsonl'
+        tracer = Tracer(path=str(path), clock=clock)
+        with tracer.cycle():
+            with tracer.span('http'):
+                clock.now = 2
+            clock.now = 3
+            with tracer.span('decode'):
+                clock.now = 3.5
+        [record] = read_trace(path)
+        assert record['cycle'] == 1
+        assert record['duration'] == 3.5
+        assert record['spans'] == [
+            {'name': 'http', 'offset': 0, 'duration': 2},
+            {'name': 'decode', 'offset': 3, 'duration': 0.5},
+        ]
+
+    def test_disabled_and_outside_cycle(self, tmp_path):
+        tracer = Tracer()
+        with tracer.cycle():
+            with tracer.span('http'):
+                pass
+        assert tracer.cycles == 0
+        tracer = Tracer(path=str(tmp_path / 'trace.jsonl'))
+        with tracer.span('http'):
+            pass
+        assert not (tmp_path / 'trace.jsonl').exists(), (
+            'Стадии вне цикла не должны записываться.'
+        )
+
+    def test_traced_decorator(self, tmp_path):
+        path = tmp_path / 'trace.jsonl'
+        tracer = Tracer(path=str(path))
+
+        @tracer.traced('work')
+        def work(value):
+            return value * 2
+
+        with tracer.cycle():
+            assert work(2) == 4
+        [record] = read_trace(path)
+        assert [span['name'] for span in record['spans']] == ['work']
+
+    def test_slow_cycle_profiles_next_one(self, tmp_path):
+        clock = FakeClock()
+        tracer = Tracer(profile_dir=str(tmp_path), slow_threshold=1,
+                        clock=clock)
+        with tracer.cycle():
+            clock.now += 5
+        assert tracer.profiles == [], (
+            'Медленный цикл без профилировщика должен заказать профиль '
+            'следующего цикла.'
+        )
+        with tracer.cycle():
+            clock.now += 0.1
+        assert len(tracer.profiles) == 1
+        assert os.path.exists(tracer.profiles[0])
+        with tracer.cycle():
+            clock.now += 0.1
+        assert len(tracer.profiles) == 1
+
+    def test_profiling_flag_follows_profiled_cycle(self, tmp_path):
+        tracer = Tracer(profile_dir=str(tmp_path))
+        with tracer.cycle():
+            assert not tracer.profiling
+        tracer.arm()
+        with tracer.cycle():
+            assert tracer.profiling, (
+                'Во время профилируемого цикла profiling должен быть True.'
+            )
+        assert not tracer.profiling
+
+    def test_sampled_profile_kept_only_when_slow(self, tmp_path):
+        clock = FakeClock()
+        tracer = Tracer(profile_dir=str(tmp_path), slow_threshold=1,
+                        sample_rate=1.0, clock=clock, rng=lambda: 0.0)
+        with tracer.cycle():
+            clock.now += 0.1
+        assert tracer.profiles == []
+        with tracer.cycle():
+            clock.now += 2
+        assert len(tracer.profiles) == 1
+
+    @pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'),
+                        reason='нет SIGUSR1')
+    def test_signal_arms_profile(self, tmp_path):
+        tracer = Tracer(profile_dir=str(tmp_path))
+        previous = signal.getsignal(signal.SIGUSR1)
+        try:
+            assert tracer.install_signal()
+            os.kill(os.getpid(), signal.SIGUSR1)
+            with tracer.cycle():
+                pass
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+        assert len(tracer.profiles) == 1
+
+    def test_main_traces_cycle_stages(self, monkeypatch, tmp_path,
+                                      homework_module):
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        path = tmp_path / 'trace.jsonl'
+        monkeypatch.setattr(homework_module.TRACER, 'path', str(path))
+        monkeypatch.setattr(homework_module.TRACER, 'enabled', True)
+        data = {
+            'homeworks': [{'id': 1, 'homework_name': 'hw',
+                           'status': 'approved'}],
+            'current_date': 1000,
+        }
+
+        def mock_get(*args, **kwargs):
+            response = utils.MockResponseGET(random_timestamp=1000)
+            response.json = lambda: data
+            return response
+
+        def stop(secs):
+            raise utils.BreakInfiniteLoop('break')
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(time, 'sleep', stop)
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        with pytest.raises(utils.BreakInfiniteLoop):
+            homework_module.main()
+        [record] = read_trace(path)
+        names = [span['name'] for span in record['spans']]
+        for stage in ('http', 'decode', 'get_api_answer', 'check_response',
+                      'parse_status', 'flush', 'checkpoint'):
+            assert stage in names, f'Нет стадии `{stage}` в трассировке.'
+        assert 'send_message' not in names, (
+            'Отправка в телеграм идёт в потоке очереди, а не в цикле опроса.'
+        )
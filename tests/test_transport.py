@@ -0,0 +1,195 @@
+import threading
+
+import pytest
+import requests
+
+from homework_bot.transport import Transport, TransportStats
+
+
+class MockResponse:
+    status_code = 200
+
+    def __init__(self, name=''):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestTransport:
+    def test_without_pool_uses_requests_get(self, monkeypatch):
+        calls = []
+
+        def mock_get(url, **kwargs):
+            calls.append((url, kwargs))
+            return MockResponse()
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        transport = Transport(connect_timeout=1, read_timeout=2)
+        transport.get('http://example', {'Authorization': 'OAuth t'},
+                      {'from_date': 0})
+        url, kwargs = calls[0]
+        assert kwargs['timeout'] == (1, 2), (
+            'В запрос должны передаваться таймауты соединения и чтения.'
+        )
+        assert kwargs['headers']['Authorization'] == 'OAuth t'
+        assert kwargs['headers']['Accept-Encoding'] == 'gzip, deflate'
+        assert transport.stats.count == 1
+
+    def test_pool_reuses_session(self, monkeypatch):
+        calls = []
+
+        def mock_session_get(self, url, **kwargs):
+            calls.append(self)
+            return MockResponse()
+
+        monkeypatch.setattr(requests.Session, 'get', mock_session_get)
+        transport = Transport(pool_size=4)
+        for timestamp in range(3):
+            transport.get('http://example', {}, {'from_date': timestamp})
+        assert len(calls) == 3
+        assert all(session is transport.session for session in calls), (
+            'Запросы с пулом должны идти через одну общую сессию.'
+        )
+        transport.close()
+        assert transport.session is None
+
+    def test_keepalive_can_be_disabled(self):
+        transport = Transport(keepalive=False, compression=False)
+        assert transport.headers == {
+            'Accept-Encoding': 'identity',
+            'Connection': 'close',
+        }
+
+
+class TestDeadlineAndHedging:
+    def test_deadline_bounds_stuck_request(self, monkeypatch):
+        release = threading.Event()
+
+        def stuck_get(url, **kwargs):
+            release.wait(5)
+            return MockResponse()
+
+        monkeypatch.setattr(requests, 'get', stuck_get)
+        transport = Transport(deadline=0.05)
+        try:
+            with pytest.raises(requests.exceptions.Timeout):
+                transport.get('http://example', {}, {})
+            assert transport.stats.deadline_exceeded == 1
+        finally:
+            release.set()
+            transport.close()
+
+    def test_hedge_wins_when_first_attempt_stalls(self, monkeypatch):
+        release = threading.Event()
+        calls = []
+        responses = []
+
+        def get(url, **kwargs):
+            calls.append(1)
+            response = MockResponse(f'attempt {len(calls)}')
+            responses.append(response)
+            if len(calls) == 1:
+                release.wait(5)
+            return response
+
+        monkeypatch.setattr(requests, 'get', get)
+        transport = Transport(deadline=5, hedge=True, hedge_after=0.02)
+        try:
+            response = transport.get('http://example', {}, {})
+            assert response.name == 'attempt 2'
+            assert (transport.stats.hedged, transport.stats.hedge_wins) == (
+                1, 1)
+            release.set()
+            transport._executor.shutdown(wait=True)
+            assert responses[0].closed, (
+                'Проигравший ответ должен закрываться, чтобы вернуть '
+                'соединение в пул.'
+            )
+        finally:
+            release.set()
+            transport.close()
+
+    def test_hedge_needs_budget(self, monkeypatch):
+        release = threading.Event()
+        calls = []
+        asked = []
+
+        def get(url, **kwargs):
+            calls.append(1)
+            release.wait(0.2)
+            return MockResponse()
+
+        monkeypatch.setattr(requests, 'get', get)
+        transport = Transport(
+            deadline=5, hedge=True, hedge_after=0.02,
+            allow_hedge=lambda headers: asked.append(headers) or False)
+        try:
+            transport.get('http://example', {'Authorization': 'a'}, {})
+            assert len(calls) == 1, (
+                'Второй запрос не должен уходить без бюджета.'
+            )
+            assert asked == [{'Authorization': 'a'}]
+            assert transport.stats.hedged == 0
+        finally:
+            release.set()
+            transport.close()
+
+    def test_inline_runs_on_calling_thread(self, monkeypatch):
+        threads = []
+
+        def get(url, **kwargs):
+            threads.append(threading.current_thread())
+            return MockResponse()
+
+        monkeypatch.setattr(requests, 'get', get)
+        profiling = [True]
+        transport = Transport(deadline=5, hedge=True, hedge_after=1,
+                              inline=lambda: profiling[0])
+        try:
+            transport.get('http://example', {}, {})
+            profiling[0] = False
+            transport.get('http://example', {}, {})
+        finally:
+            transport.close()
+        assert threads[0] is threading.current_thread(), (
+            'Во время профилирования запрос должен идти в вызывающем '
+            'потоке.'
+        )
+        assert threads[1] is not threading.current_thread()
+
+    def test_no_hedge_for_fast_answer(self, monkeypatch):
+        monkeypatch.setattr(requests, 'get',
+                            lambda url, **kwargs: MockResponse())
+        transport = Transport(hedge=True, hedge_after=1)
+        try:
+            transport.get('http://example', {}, {})
+            assert transport.stats.hedged == 0
+        finally:
+            transport.close()
+
+    def test_error_is_raised_within_deadline(self, monkeypatch):
+        def get(url, **kwargs):
+            raise requests.exceptions.ConnectionError('reset')
+
+        monkeypatch.setattr(requests, 'get', get)
+        transport = Transport(deadline=1)
+        try:
+            with pytest.raises(requests.exceptions.ConnectionError):
+                transport.get('http://example', {}, {})
+            assert transport.stats.deadline_exceeded == 0
+        finally:
+            transport.close()
+
+    def test_quantile_needs_samples(self):
+        stats = TransportStats()
+        for value in range(19):
+            stats.record(value / 100)
+        assert stats.quantile(0.95) is None
+        for value in range(19, 100):
+            stats.record(value / 100)
+        assert stats.quantile(0.95) == 0.95
+        transport = Transport(hedge=True)
+        transport.stats = stats
+        assert transport.hedge_delay() == 0.95
@@ -0,0 +1,70 @@
+import pytest
+
+from homework_bot.validator import (SchemaKeyError, SchemaTypeError,
+                                    ValidationError, validate_many,
+                                    validate_response)
+
+
+def make_response(*homeworks):
+    return {'homeworks': list(homeworks), 'current_date': 1}
+
+
+class TestValidator:
+    HOMEWORK = {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+
+    def test_valid_response(self):
+        response = make_response(self.HOMEWORK)
+        assert validate_response(response) == [self.HOMEWORK]
+
+    @pytest.mark.parametrize('response, error_type, location', [
+        ([], SchemaTypeError, '<ответ>'),
+        ({'current_date': 1}, SchemaKeyError, 'homeworks'),
+        ({'homeworks': {}, 'current_date': 1}, SchemaTypeError, 'homeworks'),
+        ({'homeworks': [], 'current_date': '1'}, SchemaTypeError,
+         'current_date'),
+    ])
+    def test_invalid_envelope(self, response, error_type, location):
+        with pytest.raises(error_type) as info:
+            validate_response(response)
+        assert info.value.location == location
+
+    def test_item_error_has_precise_path(self):
+        broken = {'id': 2, 'homework_name': 'hw2', 'status': None}
+        with pytest.raises(SchemaTypeError) as info:
+            validate_response(make_response(self.HOMEWORK, broken))
+        assert str(info.value) == (
+            'homeworks[1].status: ожидался str, получен NoneType'
+        ), 'Ошибка должна указывать на конкретную домашку и поле.'
+
+    def test_unused_and_null_fields_are_accepted(self):
+        homework = dict(self.HOMEWORK, reviewer_comment=None, lesson_name=5,
+                        date_updated=None)
+        assert validate_response(make_response(homework)) == [homework], (
+            'Поля, которые бот не читает, и пустые необязательные поля '
+            'не должны ломать проверку.'
+        )
+        with pytest.raises(SchemaTypeError) as info:
+            validate_response(make_response(dict(self.HOMEWORK, id='1')))
+        assert info.value.location == 'homeworks[0].id'
+
+    def test_missing_item_key(self):
+        with pytest.raises(SchemaKeyError) as info:
+            validate_response(make_response({'status': 'approved'}))
+        assert info.value.location == 'homeworks[0].homework_name'
+        assert isinstance(info.value, KeyError)
+
+    def test_validate_many_collects_errors(self):
+        results = validate_many([
+            make_response(self.HOMEWORK),
+            {'homeworks': 'oops', 'current_date': 1},
+            make_response(),
+        ])
+        assert results[0] == ([self.HOMEWORK], None)
+        assert results[1][0] is None
+        assert isinstance(results[1][1], ValidationError)
+        assert results[2] == ([], None)
+
+    def test_check_response_rejects_malformed_item(self, homework_module):
+        with pytest.raises(KeyError):
+            homework_module.check_response(
+                make_response({'status': 'approved'}))
@@ -0,0 +1,78 @@
+import pytest
+
+from homework_bot.verdicts import UnknownStatusError, VerdictRegistry
+
+VERDICTS = {'approved': 'Принято.', 'rejected': 'Есть замечания.'}
+
+
+def make_registry(**kwargs):
+    registry = VerdictRegistry(**kwargs)
+    registry.register('ru', 'Работа "{name}": {verdict}', VERDICTS)
+    registry.register('en', 'Work "{name}" is {status}. {verdict}',
+                      {'approved': 'Great!'})
+    return registry
+
+
+class TestVerdictRegistry:
+    def test_render_by_locale(self):
+        registry = make_registry()
+        assert registry.render('hw', 'approved') == 'Работа "hw": Принято.'
+        assert registry.render('hw', 'approved', 'en') == (
+            'Work "hw" is approved. Great!'
+        )
+        assert registry.render('hw', 'rejected', 'de') == (
+            'Работа "hw": Есть замечания.'
+        ), 'Неизвестный язык должен отрисовываться языком по умолчанию.'
+
+    def test_braces_in_name_are_not_formatted(self):
+        registry = make_registry()
+        assert registry.render('{verdict} {0}', 'approved') == (
+            'Работа "{verdict} {0}": Принято.'
+        )
+
+    def test_render_is_memoized(self):
+        registry = make_registry()
+        for _ in range(3):
+            registry.render('hw', 'approved')
+        info = registry.render.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+        registry.register('ru', '{name} - {verdict}', VERDICTS)
+        assert registry.render('hw', 'approved') == 'hw - Принято.', (
+            'После замены шаблона старые сообщения не должны браться из кэша.'
+        )
+
+    def test_unknown_status_without_fallback(self):
+        registry = make_registry()
+        with pytest.raises(UnknownStatusError) as error:
+            registry.render('hw', 'unknown')
+        assert isinstance(error.value, KeyError)
+        assert repr(error.value) != "KeyError('unknown')"
+
+    def test_unknown_status_with_fallback(self):
+        registry = make_registry(fallback='Новый статус: {status}.')
+        assert registry.render('hw', 'unknown') == (
+            'Работа "hw": Новый статус: unknown.'
+        )
+
+    def test_render_many(self):
+        registry = make_registry()
+        homeworks = [
+            {'homework_name': 'a', 'status': 'approved'},
+            {'homework_name': 'b', 'status': 'rejected'},
+            {'homework_name': 'c', 'status': 'approved'},
+        ]
+        assert registry.render_many(homeworks) == [
+            registry.render(homework['homework_name'], homework['status'])
+            for homework in homeworks
+        ]
+        with pytest.raises(KeyError):
+            registry.render_many([{'status': 'approved'}])
+
+    def test_parse_status_uses_locale(self, monkeypatch, homework_module):
+        monkeypatch.setattr(homework_module, 'VERDICT_LOCALE', 'en')
+        message = homework_module.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'})
+        assert message == (
+            'The review status of "hw" has changed. '
+            + homework_module.HOMEWORK_VERDICTS_EN['approved']
+        )